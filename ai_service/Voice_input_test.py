@@ -3,59 +3,54 @@
 Test script for USB microphone speech recognition
 """
 
-import speech_recognition as sr
-import time
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service.voice_recognition import VoiceRecognition
 
 def test_microphone():
     """Test microphone and speech recognition"""
-    
-    # Initialize recognizer
-    recognizer = sr.Recognizer()
-    
+
+    # Same capture path as the assistant: one stream feeding the shared ring buffer
+    recognition = VoiceRecognition()
+
     try:
-        # Create microphone instance
-        microphone = sr.Microphone()
-        
         print("Initializing microphone...")
-        
-        # Adjust for ambient noise
-        with microphone as source:
-            print("Adjusting for ambient noise... Please be quiet for 2 seconds.")
-            recognizer.adjust_for_ambient_noise(source, duration=2)
-            print("Microphone ready!")
-        
+        if not recognition.initialize_microphone():
+            print("Could not open the microphone")
+            return None
+        print("Microphone ready!")
+
         # Listen for speech
         print("\nSpeak something now...")
-        with microphone as source:
-            print("Listening...")
-            audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
-        
-        print("Processing speech...")
-        
-        # Convert to text
-        text = recognizer.recognize_google(audio)
+        text = recognition.listen_once()
+
+        stats = recognition.get_stats()
+        print(f"Audio ring: {stats['audio_ring']['consumers']}, device overruns: {stats['mic_overruns']}")
+
+        if not text:
+            print("Could not understand audio")
+            return None
         print(f"You said: {text}")
-        
+
         return text
-        
-    except sr.UnknownValueError:
-        print("Could not understand audio")
-        return None
-    except sr.RequestError as e:
-        print(f"Could not request results: {e}")
-        return None
+
     except Exception as e:
         print(f"Error: {e}")
         return None
+    finally:
+        recognition.capture.stop()
 
 if __name__ == "__main__":
     print("=== USB Microphone Test ===")
     print("Make sure your USB microphone is connected!")
     print()
-    
+
     # Test microphone
     result = test_microphone()
-    
+
     if result:
         print(f"\n✅ Success! Recognized: '{result}'")
     else:
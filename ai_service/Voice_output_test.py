@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import subprocess
+import json
 import os
 
 def get_verified_voices():
@@ -55,6 +56,14 @@ def download_voice(voice):
     
     return True
 
+def get_sample_rate(voice):
+    """Read the output sample rate from the voice config"""
+    try:
+        with open(voice['config']) as f:
+            return json.load(f)['audio']['sample_rate']
+    except (OSError, KeyError, ValueError):
+        return 22050
+
 def test_voice(voice):
     """Test a specific voice"""
     if not os.path.exists(voice['model']):
@@ -65,34 +74,31 @@ def test_voice(voice):
     
     spiritual_message = "Peace be with you. God's love surrounds us all."
     
-    # Create temp file
-    with open('temp_spiritual.txt', 'w') as f:
-        f.write(spiritual_message)
-    
     try:
-        output_file = f"test_{voice['name'].replace(' ', '_').replace('(', '').replace(')', '')}.wav"
-        
-        subprocess.run([
-            'piper', '--model', voice['model'],
-            '--output_file', output_file,
-            '--input_file', 'temp_spiritual.txt'
-        ], check=True)
+        # Stream raw PCM from piper straight into aplay - no temp files
+        piper = subprocess.Popen(
+            ['piper', '--model', voice['model'], '--output_raw'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
         
         print("🔊 Playing audio...")
-        subprocess.run(['aplay', output_file], check=True)
+        player = subprocess.Popen(
+            ['aplay', '-r', str(get_sample_rate(voice)), '-f', 'S16_LE', '-t', 'raw', '-c', '1'],
+            stdin=piper.stdout
+        )
+        piper.stdout.close()
+        
+        piper.stdin.write(spiritual_message.encode() + b'\n')
+        piper.stdin.close()
         
-        # Clean up
-        os.remove('temp_spiritual.txt')
-        os.remove(output_file)
+        if piper.wait() != 0 or player.wait() != 0:
+            print("❌ Error: piper or aplay exited with an error")
+            return False
         
         return True
         
-    except subprocess.CalledProcessError as e:
+    except OSError as e:
         print(f"❌ Error: {e}")
-        # Clean up on error
-        for file in ['temp_spiritual.txt', output_file]:
-            if os.path.exists(file):
-                os.remove(file)
         return False
 
 def main():
@@ -3,84 +3,393 @@ AI Integration Module
 Handles communication with AI APIs (ChatGPT, Claude, etc.)
 """
 
-import openai
-import anthropic
 import os
-import json
-from typing import Optional, Dict, Any
-from dotenv import load_dotenv
+import re
+import time
+import logging
+import threading
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 
-# Load environment variables
-load_dotenv()
+from ai_service import instrumentation
+from ai_service.llm_client import LLMClient
+from ai_service.conversation_store import ConversationStore
+from ai_service.context_builder import ContextBuilder
+from ai_service.response_cache import ResponseCache
+from ai_service.intent_router import IntentRouter
+from ai_service.speculation import Speculation, SpeculativePrefetch
+from ai_service.session_manager import DEFAULT_USER, Preferences, SessionManager
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("openai", "anthropic")
+
+CHRISTIAN_CONTEXT = (
+    "You are Scripture Palpi, a warm and humble Christian voice assistant. "
+    "Answer from a Christian perspective grounded in the Bible, and cite "
+    "scripture references where they help. Your replies are spoken aloud, so "
+    "keep them short and conversational, without markdown, lists or emoji."
+)
+
+CHRISTIAN_CLOSING = "God bless you."
+
+SUMMARY_INSTRUCTIONS = (
+    "Summarize the conversation between a user and Scripture Palpi in at most three "
+    "sentences. Keep names, scripture references and what the user is going through."
+)
+
+ERROR_RESPONSE = "I'm sorry, I couldn't reach my thoughts just now. Please try again in a moment."
+
+# Markdown the model sometimes emits anyway - never worth reading aloud
+_MARKDOWN = re.compile(r"[*_#`>]+")
+_BLESSING = re.compile(r"\b(bless|amen|peace be with you|in jesus'? name)\b", re.IGNORECASE)
 
 class AIIntegration:
     """Handles AI API integration with Christian focus"""
-    
+
     def __init__(self):
-        # TODO: Initialize API clients
-        # TODO: Set current provider
-        # TODO: Set up Christian context
-        # TODO: Initialize clients
-        pass
-    
+        self.llm: Optional[LLMClient] = None
+        self.current_provider = os.getenv("AI_PROVIDER", "openai")
+        self.openai_model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+        self.anthropic_model = os.getenv("ANTHROPIC_MODEL", "claude-instant-1.2")
+        self.max_tokens = int(os.getenv("AI_MAX_TOKENS", "300"))
+        self.failover = os.getenv("AI_FAILOVER", "1") != "0"
+        self.christian_context = CHRISTIAN_CONTEXT
+        self.response_cache = self._initialize_cache()
+        self.intent_router = IntentRouter.from_env()
+        self.conversation_id = os.getenv("CONVERSATION_SESSION", "default")
+        self.sessions = self._initialize_sessions()
+        self.context = self._initialize_context()
+        self.prefetch = self._initialize_prefetch()
+        self._initialize_clients()
+
+    def _initialize_cache(self) -> Optional[ResponseCache]:
+        """Set up the response cache unless disabled"""
+        if os.getenv("RESPONSE_CACHE", "1") == "0":
+            return None
+        try:
+            return ResponseCache(
+                os.getenv("RESPONSE_CACHE_PATH", "~/.cache/scripture_palpi/responses.db"),
+                ttl_s=float(os.getenv("RESPONSE_CACHE_TTL_HOURS", "168")) * 3600,
+                max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000")),
+                similarity=float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.8")),
+            )
+        except Exception as e:
+            logger.warning(f"Response cache disabled: {e}")
+            return None
+
+    def _initialize_context(self) -> Optional[ContextBuilder]:
+        """Set up conversation history unless disabled"""
+        if os.getenv("CONVERSATION_HISTORY", "1") == "0":
+            return None
+        try:
+            store = ConversationStore(os.getenv("CONVERSATION_DB_PATH", "~/.cache/scripture_palpi/conversations.db"))
+        except Exception as e:
+            logger.warning(f"Conversation history disabled: {e}")
+            return None
+        return ContextBuilder(
+            store,
+            summarize=self._summarize,
+            budget_tokens=int(os.getenv("CONTEXT_BUDGET_TOKENS", "1500")),
+            verbatim_turns=int(os.getenv("CONTEXT_VERBATIM_TURNS", "6")),
+            summary_tokens=int(os.getenv("CONTEXT_SUMMARY_TOKENS", "200")),
+        )
+
+    def _initialize_sessions(self) -> Optional[SessionManager]:
+        """Set up per-user sessions unless disabled"""
+        if os.getenv("SESSIONS", "1") == "0":
+            return None
+        try:
+            return SessionManager(
+                os.getenv("SESSION_DB_PATH", "~/.cache/scripture_palpi/sessions.db"),
+                max_active=int(os.getenv("SESSION_MAX_ACTIVE", "8")),
+                history_turns=int(os.getenv("SESSION_HISTORY_TURNS", "4")),
+                flush_s=float(os.getenv("SESSION_FLUSH_S", "60")),
+            )
+        except Exception as e:
+            logger.warning(f"User sessions disabled: {e}")
+            return None
+
+    def _initialize_prefetch(self) -> Optional[SpeculativePrefetch]:
+        """Set up speculative requests from partial transcripts when enabled"""
+        # Off by default: a question that changes after a pause costs an extra request
+        if os.getenv("AI_SPECULATION", "0") != "1":
+            return None
+        return SpeculativePrefetch(
+            self._speculative_stream,
+            stable_ms=float(os.getenv("AI_SPECULATION_STABLE_MS", "300")),
+            min_words=int(os.getenv("AI_SPECULATION_MIN_WORDS", "3")),
+            max_attempts=int(os.getenv("AI_SPECULATION_MAX_ATTEMPTS", "2")),
+        )
+
     def _initialize_clients(self):
-        """Initialize API clients"""
-        # TODO: Initialize OpenAI client
-        # TODO: Initialize Anthropic client
-        # TODO: Handle initialization errors
-        pass
-    
+        """Initialize API clients and open their connection pool"""
+        hedge_after_ms = float(os.getenv("AI_HEDGE_AFTER_MS", "0"))
+        llm = LLMClient(
+            openai_key=os.getenv("OPENAI_API_KEY"),
+            anthropic_key=os.getenv("ANTHROPIC_API_KEY"),
+            openai_model=self.openai_model,
+            anthropic_model=self.anthropic_model,
+            max_tokens=self.max_tokens,
+            first_token_timeout_s=float(os.getenv("AI_FIRST_TOKEN_TIMEOUT_S", "6")),
+            request_timeout_s=float(os.getenv("AI_REQUEST_TIMEOUT_S", "30")),
+            hedge_after_ms=hedge_after_ms or None,
+        )
+        try:
+            llm.start()
+            self.llm = llm
+        except Exception as e:
+            logger.error(f"Failed to initialize AI clients: {e}")
+
     def set_provider(self, provider: str):
         """Set the AI provider to use"""
-        # TODO: Validate provider
-        # TODO: Set current provider
-        pass
-    
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown AI provider: {provider}")
+        if not self.get_available_providers()[provider]:
+            logger.warning(f"AI provider '{provider}' has no API key configured")
+        self.current_provider = provider
+
+    @property
+    def user_id(self) -> Optional[str]:
+        """Who is being answered, when sessions are enabled"""
+        return self.sessions.active.user_id if self.sessions is not None else None
+
+    @property
+    def session_id(self) -> str:
+        """Conversation history key - each user keeps their own"""
+        user_id = self.user_id
+        if user_id is None or user_id == DEFAULT_USER:
+            return self.conversation_id
+        return f"{self.conversation_id}:{user_id}"
+
+    def _preferences(self) -> Optional[Preferences]:
+        return self.sessions.active.preferences if self.sessions is not None else None
+
+    def _provider(self) -> str:
+        """The active user's provider, or the configured one"""
+        preferences = self._preferences()
+        return (preferences.provider if preferences is not None else None) or self.current_provider
+
+    def _system_prompt(self) -> str:
+        """Christian context plus the active user's translation and answer length"""
+        preferences = self._preferences()
+        if preferences is None or not preferences.instructions:
+            return self.christian_context
+        return f"{self.christian_context} {preferences.instructions}"
+
+    def _max_tokens(self) -> int:
+        preferences = self._preferences()
+        return int(self.max_tokens * preferences.token_scale()) if preferences is not None else self.max_tokens
+
     def format_christian_prompt(self, user_input: str) -> str:
         """Format user input with Christian context"""
-        # TODO: Combine Christian context with user input
-        # TODO: Return formatted prompt
-        pass
-    
+        return f"{self._system_prompt()}\n\n{user_input.strip()}"
+
+    def _cache_scope(self) -> str:
+        """Everything besides the prompt that shapes the cached answer"""
+        provider = self._provider()
+        model = self.anthropic_model if provider == "anthropic" else self.openai_model
+        return ResponseCache.make_scope(provider, model, self._system_prompt())
+
+    def _is_follow_up(self) -> bool:
+        """Whether the message may lean on the previous exchange"""
+        if self.context is not None:
+            return self.context.is_follow_up(self.session_id, time.time())
+        return self.sessions is not None and self.sessions.active.is_follow_up(time.time())
+
+    def _local_response(self, message: str, follow_up: bool) -> Optional[str]:
+        """Answer from the local scripture index or the response cache"""
+        if self.intent_router is not None:
+            answer = self.intent_router.route(message)
+            if answer is not None:
+                return answer
+        # A cached answer to "what does it mean?" belongs to some other conversation
+        if self.response_cache is None or follow_up:
+            return None
+        return self.response_cache.get(message, self._cache_scope())
+
+    def _finish_turn(self, message: str, response: str, follow_up: bool, cacheable: bool = True):
+        """Record a complete exchange and cache stand-alone answers"""
+        if self.context is not None:
+            self.context.record(self.session_id, message.strip(), response, self.user_id)
+        if self.sessions is not None:
+            self.sessions.record(message.strip(), response)
+        if self.response_cache is not None and cacheable and not follow_up:
+            self.response_cache.put(message, self._cache_scope(), response)
+
     def send_message_to_ai(self, message: str) -> Optional[str]:
         """Send message to AI and get response"""
-        # TODO: Route to appropriate provider
-        # TODO: Handle errors
-        # TODO: Return AI response
-        pass
-    
-    def _send_to_openai(self, message: str) -> Optional[str]:
-        """Send message to OpenAI ChatGPT"""
-        # TODO: Format prompt
-        # TODO: Send to OpenAI API
-        # TODO: Handle API errors
-        # TODO: Return response
-        pass
-    
-    def _send_to_anthropic(self, message: str) -> Optional[str]:
-        """Send message to Anthropic Claude"""
-        # TODO: Format prompt
-        # TODO: Send to Anthropic API
-        # TODO: Handle API errors
-        # TODO: Return response
-        pass
-    
+        follow_up = self._is_follow_up()
+        cached = self._local_response(message, follow_up)
+        if cached is not None:
+            self._finish_turn(message, cached, follow_up, cacheable=False)
+            return cached
+
+        provider = self._provider()
+        try:
+            with instrumentation.span("llm_response"):
+                response = "".join(self._stream(*self._build_prompt(message), provider, self.failover))
+        except Exception as e:
+            logger.error(f"{provider} request failed: {e}")
+            return None
+
+        if not response:
+            return None
+        response = self.process_ai_response(response)
+        self._finish_turn(message, response, follow_up)
+        return response
+
+    def stream_message_to_ai(self, message: str, cancel: Optional[threading.Event] = None,
+                             speculation: Optional[Speculation] = None) -> Iterator[str]:
+        """Send message to AI and yield the response text as it is generated"""
+        follow_up = self._is_follow_up()
+        cached = self._local_response(message, follow_up)
+        if cached is not None:
+            if speculation is not None:
+                speculation.cancel()
+            self._finish_turn(message, cached, follow_up, cacheable=False)
+            yield cached
+            return
+
+        started = time.perf_counter()
+        provider = self._provider()
+        if speculation is not None:
+            # Sent while the user was still finishing - pick up whatever has arrived
+            chunks = speculation.stream(cancel)
+        else:
+            with instrumentation.span("prompt_build"):
+                prompt = self._build_prompt(message)
+            chunks = self._stream(*prompt, provider, self.failover, cancel)
+        response = []
+        try:
+            for chunk in chunks:
+                if not response:
+                    instrumentation.observe("llm_first_token", (time.perf_counter() - started) * 1000)
+                chunk = _MARKDOWN.sub("", chunk)
+                if chunk:
+                    response.append(chunk)
+                    yield chunk
+        except Exception as e:
+            # Includes a response cut off part way: what was spoken gets no closing, cache entry or history
+            logger.error(f"{provider} stream failed: {e}")
+            if not response:
+                yield ERROR_RESPONSE
+            return
+
+        # Interrupted - half an answer is neither remembered nor cached
+        if cancel is not None and cancel.is_set():
+            return
+
+        if not response:
+            yield ERROR_RESPONSE
+            return
+        instrumentation.observe("llm_response", (time.perf_counter() - started) * 1000)
+
+        closing = self.get_christian_closing("".join(response))
+        if closing:
+            response.append(" " + closing)
+            yield " " + closing
+        self._finish_turn(message, " ".join("".join(response).split()), follow_up)
+
+    def _build_prompt(self, message: str) -> Tuple[str, List[Dict[str, str]]]:
+        """System prompt and messages, with conversation history when enabled"""
+        system = self._system_prompt()
+        if self.context is not None:
+            system, messages, _ = self.context.build(self.session_id, system, message.strip())
+            return system, messages
+        # Without stored history the user's in-memory window still gives follow-ups some context
+        history = self.sessions.active.messages() if self.sessions is not None else []
+        return system, history + [{"role": "user", "content": message.strip()}]
+
+    def _stream(self, system: str, messages: List[Dict[str, str]], provider: str, failover: bool,
+                cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        """Stream response tokens, failing over to the other provider if allowed"""
+        if self.llm is None:
+            raise RuntimeError("AI clients are not initialized")
+        return self.llm.stream(system, messages, provider, fallback=failover, cancel=cancel,
+                               max_tokens=self._max_tokens())
+
+    def _speculative_stream(self, message: str, cancel: threading.Event) -> Iterator[str]:
+        """The request stream_message_to_ai would send, started from a partial transcript"""
+        return self._stream(*self._build_prompt(message), self._provider(), self.failover, cancel)
+
+    def _summarize(self, summary: str, transcript: str) -> str:
+        """Fold a transcript into the running conversation summary"""
+        request = f"Summary so far: {summary}\n\n{transcript}" if summary else transcript
+        messages = [{"role": "user", "content": request}]
+        return "".join(self._stream(SUMMARY_INSTRUCTIONS, messages, self.current_provider, self.failover))
+
+    def new_conversation(self):
+        """Forget the current conversation"""
+        if self.context is not None:
+            self.context.store.clear(self.session_id)
+        if self.sessions is not None:
+            self.sessions.clear_history()
+
     def process_ai_response(self, response: str) -> str:
         """Process and format AI response"""
-        # TODO: Clean up response
-        # TODO: Add Christian closing if appropriate
-        # TODO: Return processed response
-        pass
-    
+        response = _MARKDOWN.sub("", response)
+        response = " ".join(response.split())
+
+        closing = self.get_christian_closing(response)
+        if closing:
+            response = f"{response} {closing}"
+        return response
+
+    def get_christian_closing(self, response: str) -> Optional[str]:
+        """Return the closing blessing if the response doesn't already end with one"""
+        if _BLESSING.search(response[-80:]):
+            return None
+        return CHRISTIAN_CLOSING
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Response cache hit-rate metrics and local scripture answers"""
+        stats = self.response_cache.stats() if self.response_cache is not None else {}
+        if self.intent_router is not None:
+            stats["local_scripture_answers"] = self.intent_router.local_answers
+        return stats
+
+    def get_context_stats(self) -> Dict[str, Any]:
+        """Prompt token counts for recent turns"""
+        return self.context.stats() if self.context is not None else {}
+
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Who is active and how many users are held in memory"""
+        return self.sessions.stats() if self.sessions is not None else {}
+
+    def get_speculation_stats(self) -> Dict[str, Any]:
+        """How often speculative requests were kept and the latency they saved"""
+        return self.prefetch.stats() if self.prefetch is not None else {}
+
     def get_available_providers(self) -> Dict[str, bool]:
         """Get list of available AI providers"""
-        # TODO: Check which providers are configured
-        # TODO: Return availability status
-        pass
-    
+        if self.llm is None:
+            return {provider: False for provider in PROVIDERS}
+        return self.llm.available()
+
     def test_connection(self) -> Dict[str, Any]:
-        """Test connection to AI providers"""
-        # TODO: Test OpenAI connection
-        # TODO: Test Anthropic connection
-        # TODO: Return test results
-        pass 
\ No newline at end of file
+        """Test connection to AI providers and report rolling latency percentiles"""
+        results = {}
+        for provider, available in self.get_available_providers().items():
+            if not available:
+                results[provider] = {"ok": False, "error": "not configured"}
+                continue
+
+            start = time.monotonic()
+            try:
+                messages = [{"role": "user", "content": "Reply with the single word: Amen"}]
+                reply = "".join(self._stream(self.christian_context, messages, provider, failover=False))
+                results[provider] = {
+                    "ok": bool(reply.strip()),
+                    "latency_ms": round((time.monotonic() - start) * 1000, 1),
+                }
+            except Exception as e:
+                results[provider] = {"ok": False, "error": str(e)}
+
+        if self.llm is not None:
+            latency = self.llm.latency_stats()
+            for provider, windows in latency["providers"].items():
+                results[provider].update(windows)
+            results["failovers"] = latency["failovers"]
+            results["hedges"] = latency["hedges"]
+            results["hedge_wins"] = latency["hedge_wins"]
+        return results
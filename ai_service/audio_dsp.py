@@ -0,0 +1,107 @@
+"""
+Audio DSP
+Vectorized tone, gain, resampling, channel and mixing helpers for 16-bit PCM
+"""
+
+from typing import Optional, Union
+
+import numpy as np
+
+INT16_MIN = -32768
+INT16_MAX = 32767
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+def as_samples(pcm: Buffer) -> np.ndarray:
+    """int16 view of a PCM buffer - writable when the buffer is (bytearray, memoryview of one)"""
+    return np.frombuffer(pcm, dtype=np.int16)
+
+def tone(frequency: float, duration_s: float, sample_rate: int, amplitude: float = 0.5,
+         fade_ms: float = 5.0) -> np.ndarray:
+    """Sine tone with short fades so it starts and stops without a click"""
+    count = int(sample_rate * duration_s)
+    wave = np.sin(2 * np.pi * frequency / sample_rate * np.arange(count, dtype=np.float32))
+    wave *= amplitude * INT16_MAX
+
+    fade = min(count // 2, int(sample_rate * fade_ms / 1000))
+    if fade:
+        ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+        wave[:fade] *= ramp
+        wave[-fade:] *= ramp[::-1]
+    return wave.astype(np.int16)
+
+def silence(duration_s: float, sample_rate: int) -> np.ndarray:
+    return np.zeros(int(sample_rate * duration_s), dtype=np.int16)
+
+def _saturate_into(values: np.ndarray, out: np.ndarray) -> np.ndarray:
+    np.clip(values, INT16_MIN, INT16_MAX, out=values)
+    np.copyto(out, values, casting="unsafe")
+    return out
+
+def apply_gain(samples: np.ndarray, gain: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Scale with saturation; in place unless out is given (needed for read-only input)"""
+    if out is None:
+        out = samples
+    if gain == 1.0:
+        if out is not samples:
+            np.copyto(out, samples)
+        return out
+    return _saturate_into(samples.astype(np.float32) * gain, out)
+
+def duck(samples: np.ndarray, gain: float, ramp_samples: int = 0) -> np.ndarray:
+    """Lower the level in place, ramping down over the first ramp_samples"""
+    envelope = np.full(len(samples), gain, dtype=np.float32)
+    ramp = min(ramp_samples, len(samples))
+    if ramp:
+        envelope[:ramp] = np.linspace(1.0, gain, ramp, dtype=np.float32)
+    return _saturate_into(samples * envelope, samples)
+
+def rms(samples: np.ndarray) -> int:
+    """Root mean square level"""
+    if not len(samples):
+        return 0
+    return int(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Linear-interpolation resampling - fine for speech and UI sounds"""
+    if source_rate == target_rate or not len(samples):
+        return samples
+    count = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(count, dtype=np.float64) * (source_rate / target_rate)
+    resampled = np.interp(positions, np.arange(len(samples)), samples.astype(np.float32))
+    return resampled.astype(np.int16)
+
+def to_mono(samples: np.ndarray, channels: int) -> np.ndarray:
+    """Average interleaved channels"""
+    if channels == 1:
+        return samples
+    frames = samples[:len(samples) - len(samples) % channels].reshape(-1, channels)
+    return (frames.sum(axis=1, dtype=np.int32) // channels).astype(np.int16)
+
+def to_stereo(samples: np.ndarray) -> np.ndarray:
+    """Duplicate a mono signal into interleaved stereo"""
+    return np.repeat(samples, 2)
+
+def mix(target: np.ndarray, source: np.ndarray, gain: float = 1.0, offset: int = 0) -> np.ndarray:
+    """Add source into target in place from offset, saturating instead of wrapping"""
+    end = min(len(target), offset + len(source))
+    if end <= offset:
+        return target
+    region = target[offset:end]
+    summed = region.astype(np.float32) + source[:end - offset].astype(np.float32) * gain
+    _saturate_into(summed, region)
+    return target
+
+def to_int16(pcm: Buffer, sample_width: int) -> np.ndarray:
+    """Convert 8, 16, 24 or 32-bit WAV sample data to int16"""
+    if sample_width == 2:
+        return as_samples(pcm)
+    if sample_width == 1:
+        # 8-bit WAV is unsigned
+        return ((np.frombuffer(pcm, dtype=np.uint8).astype(np.int16) - 128) << 8).astype(np.int16)
+    if sample_width == 3:
+        raw = np.frombuffer(pcm, dtype=np.uint8).reshape(-1, 3)
+        return (raw[:, 1].astype(np.uint16) | (raw[:, 2].astype(np.uint16) << 8)).view(np.int16)
+    if sample_width == 4:
+        return (np.frombuffer(pcm, dtype=np.int32) >> 16).astype(np.int16)
+    raise ValueError(f"Unsupported sample width: {sample_width}")
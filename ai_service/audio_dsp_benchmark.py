@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Audio DSP benchmark
+Times the vectorized audio_dsp helpers against per-sample Python loop equivalents
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from ai_service import audio_dsp
+
+SAMPLE_RATE = 22050
+
+def loop_tone(frequency, duration_s, sample_rate):
+    """The original loading sound generator"""
+    samples = []
+    for i in range(int(sample_rate * duration_s)):
+        sample = int(16383 * math.sin(2 * math.pi * frequency * i / sample_rate))
+        samples.extend([sample & 0xFF, (sample >> 8) & 0xFF])
+    return bytes(samples)
+
+def loop_gain(pcm, gain):
+    count = len(pcm) // 2
+    out = []
+    for sample in struct.unpack(f"<{count}h", pcm):
+        out.append(max(-32768, min(32767, int(sample * gain))))
+    return struct.pack(f"<{count}h", *out)
+
+def loop_resample(pcm, source_rate, target_rate):
+    samples = struct.unpack(f"<{len(pcm) // 2}h", pcm)
+    count = int(round(len(samples) * target_rate / source_rate))
+    step = source_rate / target_rate
+    out = []
+    for i in range(count):
+        position = i * step
+        left = int(position)
+        right = min(left + 1, len(samples) - 1)
+        fraction = position - left
+        out.append(int(samples[left] + (samples[right] - samples[left]) * fraction))
+    return struct.pack(f"<{count}h", *out)
+
+def loop_mix(target, source, gain):
+    count = len(target) // 2
+    a = struct.unpack(f"<{count}h", target)
+    b = struct.unpack(f"<{count}h", source)
+    mixed = [max(-32768, min(32767, int(x + y * gain))) for x, y in zip(a, b)]
+    return struct.pack(f"<{count}h", *mixed)
+
+def loop_to_mono(pcm):
+    count = len(pcm) // 2
+    samples = struct.unpack(f"<{count}h", pcm)
+    return struct.pack(f"<{count // 2}h", *[(samples[i] + samples[i + 1]) // 2 for i in range(0, count - 1, 2)])
+
+def best_time(function, repeat):
+    """Fastest of several runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def run(seconds, repeat):
+    speech = audio_dsp.tone(220, seconds, SAMPLE_RATE, amplitude=0.6)
+    music = audio_dsp.tone(523, seconds, SAMPLE_RATE, amplitude=0.6)
+    speech_pcm, music_pcm = speech.tobytes(), music.tobytes()
+    stereo_pcm = audio_dsp.to_stereo(speech).tobytes()
+
+    cases = {
+        "tone": (lambda: loop_tone(440, seconds, SAMPLE_RATE),
+                 lambda: audio_dsp.tone(440, seconds, SAMPLE_RATE).tobytes()),
+        "gain": (lambda: loop_gain(speech_pcm, 0.7),
+                 lambda: audio_dsp.apply_gain(speech.copy(), 0.7)),
+        "resample 22.05k→16k": (lambda: loop_resample(speech_pcm, SAMPLE_RATE, 16000),
+                                lambda: audio_dsp.resample(speech, SAMPLE_RATE, 16000)),
+        "mix": (lambda: loop_mix(speech_pcm, music_pcm, 0.5),
+                lambda: audio_dsp.mix(speech.copy(), music, 0.5)),
+        "stereo→mono": (lambda: loop_to_mono(stereo_pcm),
+                        lambda: audio_dsp.to_mono(audio_dsp.as_samples(stereo_pcm), 2)),
+    }
+
+    results = []
+    for name, (loop_version, vector_version) in cases.items():
+        loop_ms = best_time(loop_version, repeat)
+        vector_ms = best_time(vector_version, repeat)
+        results.append({
+            "operation": name,
+            "loop_ms": round(loop_ms, 3),
+            "numpy_ms": round(vector_ms, 3),
+            "speedup": round(loop_ms / vector_ms, 1) if vector_ms else None,
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=1.0, help="length of the test signal")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per operation (best is kept)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = run(args.seconds, args.repeat)
+    if args.json:
+        print(json.dumps({"machine": platform.machine(), "seconds": args.seconds,
+                          "numpy": np.__version__, "results": results}, indent=2))
+        return
+
+    print(f"🎛️  Audio DSP benchmark - {args.seconds:g} s at {SAMPLE_RATE} Hz on {platform.machine()}")
+    print("=" * 60)
+    print(f"{'operation':<22} {'loop ms':>10} {'numpy ms':>10} {'speedup':>9}")
+    for r in results:
+        print(f"{r['operation']:<22} {r['loop_ms']:>10.2f} {r['numpy_ms']:>10.3f} {r['speedup']:>8.0f}x")
+
+if __name__ == "__main__":
+    main()
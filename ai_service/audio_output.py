@@ -3,55 +3,638 @@ Audio Output Module
 Handles text-to-speech and speaker output
 """
 
-import pyttsx3
+import pyaudio
+import io
+import os
+import queue
+import wave
 import threading
 import time
-from typing import Optional
+import logging
+import numpy as np
+from collections import OrderedDict, deque
+from typing import Optional, Callable, Union, Iterable, Dict, Any, Deque, List, Tuple
+
+from ai_service import audio_dsp, instrumentation
+from ai_service.earcons import EarconBank, EarconLoop
+from ai_service.echo_suppression import PlaybackReference
+from ai_service.piper_tts import PiperEngine
+from ai_service.tts_cache import TTSCache
+from ai_service.voice_selector import VoiceSelector
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of one utterance in the PCM queue
+_END_OF_UTTERANCE = object()
+# Wakes the playback thread so it can start the thinking loop
+_THINK = object()
+# The quality part of Piper voice names
+PIPER_QUALITIES = ("x_low", "low", "medium", "high")
+
+class _EarconPcm(bytes):
+    """UI sound in the PCM queue - played, but not counted as speech"""
+
+# Phrases worth having ready before anyone asks
+DEFAULT_WARMUP_PHRASES = (
+    "Peace be with you.",
+    "Hello! How can I help you today?",
+    "I'm sorry, I didn't catch that. Could you say it again?",
+    "Goodbye, and God bless.",
+)
+
+class PcmSink:
+    """One long-lived PyAudio output stream that all speech is written into"""
+
+    block_frames = 1024  # ~46 ms at 22.05 kHz, so a stop request is honoured quickly
+
+    def __init__(self, sample_rate: int, channels: int = 1, reference: Optional[PlaybackReference] = None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.reference = reference
+        self._audio = None
+        self._stream = None
+
+    def open(self):
+        """Open the output stream"""
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            output=True,
+            frames_per_buffer=self.block_frames,
+        )
+
+    def write(self, pcm: bytes, should_stop: Callable[[], bool] = lambda: False) -> bool:
+        """Write PCM in small blocks, returning False if stopped part way through"""
+        block_bytes = self.block_frames * 2 * self.channels
+        view = memoryview(pcm)
+        for offset in range(0, len(view), block_bytes):
+            if should_stop():
+                return False
+            block = view[offset:offset + block_bytes].tobytes()
+            self._stream.write(block)
+            if self.reference is not None:
+                self.reference.push(block)
+        return True
+
+    def close(self):
+        """Close the output stream"""
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+
+class NullSink(PcmSink):
+    """Discards speech at the pace a speaker would play it, for benchmarks without audio hardware"""
+
+    def __init__(self, sample_rate: int, channels: int = 1, reference: Optional[PlaybackReference] = None):
+        super().__init__(sample_rate, channels, reference)
+        self.bytes_written = 0
+        self._bytes_per_s = 2 * channels * sample_rate
+        self._plays_until = 0.0
+
+    def open(self):
+        self._plays_until = time.monotonic()
+
+    def write(self, pcm: bytes, should_stop: Callable[[], bool] = lambda: False) -> bool:
+        block_bytes = self.block_frames * 2 * self.channels
+        view = memoryview(pcm)
+        for offset in range(0, len(view), block_bytes):
+            if should_stop():
+                return False
+            block = view[offset:offset + block_bytes].tobytes()
+            now = time.monotonic()
+            self._plays_until = max(self._plays_until, now) + len(block) / self._bytes_per_s
+            # Like a blocking stream, return once only about one block is left to play
+            time.sleep(max(0.0, self._plays_until - now - block_bytes / self._bytes_per_s))
+            self.bytes_written += len(block)
+            if self.reference is not None:
+                self.reference.push(block)
+        return True
+
+    def close(self):
+        pass
 
 class AudioOutput:
     """Handles text-to-speech and speaker output"""
-    
+
     def __init__(self):
-        # TODO: Initialize TTS engine
-        # TODO: Set up speaker configuration
-        # TODO: Set up audio settings
-        pass
-    
+        self.model_path = os.getenv("PIPER_MODEL", "en_US-ryan-medium.onnx")
+        self.rate = float(os.getenv("TTS_RATE", "1.0"))  # speaking speed multiplier
+        self.volume = float(os.getenv("TTS_VOLUME", "1.0"))
+
+        self.tts: Optional[PiperEngine] = None
+        self.sink: Optional[PcmSink] = None
+        # The same speaker at low quality, used when the quality voice would leave a gap
+        self.fast_model_path = os.getenv("PIPER_FAST_MODEL")
+        self.fast_tts: Optional[PiperEngine] = None
+        self.selector: Optional[VoiceSelector] = None
+        # Voices other users prefer, with their fast counterparts, kept loaded after their first use
+        self._idle_voices: "OrderedDict[str, Tuple[PiperEngine, Optional[PiperEngine]]]" = OrderedDict()
+        self.max_idle_voices = int(os.getenv("PIPER_IDLE_VOICES", "2"))
+        self._voice_lock = threading.Lock()
+        # System CPU percent, when the application has a sampler running
+        self.cpu_load: Callable[[], Optional[float]] = lambda: None
+        self.cache: Optional[TTSCache] = None
+        self.cache_max_chars = int(os.getenv("TTS_CACHE_MAX_CHARS", "120"))
+        self.engine = None  # pyttsx3 fallback when no Piper voice is available
+        self.is_speaking = False
+
+        # What went to the speaker, so the microphone can tell our voice from the user's
+        self.playback_reference = PlaybackReference()
+        # Barge-in request to silence, in milliseconds
+        self.interrupt_latencies: Deque[float] = deque(maxlen=50)
+        self._stop_requested_at: Optional[float] = None
+        self._writing = False
+
+        # UI sounds, and the "thinking" loop that fills silence until speech arrives
+        self.earcons: Optional[EarconBank] = None
+        self.thinking_delay_s = float(os.getenv("THINKING_DELAY_MS", "300")) / 1000
+        self._thinking_loop: Optional[EarconLoop] = None
+        self._thinking_since: Optional[float] = None
+
+        # Called from the playback thread when an utterance starts playing
+        self.on_audio_start: Optional[Callable[[], None]] = None
+
+        # Text is synthesized on one thread and played on another, so sentence
+        # N+1 is being inferred while sentence N is coming out of the speaker.
+        # Bumping the generation invalidates everything already queued.
+        self._text_queue: "queue.Queue" = queue.Queue()
+        self._pcm_queue: "queue.Queue" = queue.Queue()
+        self._generation = 0
+        self._pending = 0
+        self._done = threading.Condition()
+        # Speech waiting to be played, so the voice selector knows how much time it has
+        self._queued_speech_bytes = 0
+        self._playing_until = 0.0
+        self._threads = []
+
     def initialize_speakers(self):
         """Initialize speakers for audio output"""
-        # TODO: Initialize TTS engine
-        # TODO: Configure voice settings
-        # TODO: Test audio output
-        # TODO: Return success/failure
-        pass
-    
+        self.tts = PiperEngine(self.model_path, length_scale=1.0 / self.rate)
+        null_sink = os.getenv("AUDIO_SINK", "speaker") == "null"
+        if self.tts.load():
+            try:
+                sink_class = NullSink if null_sink else PcmSink
+                self.sink = sink_class(self.tts.sample_rate, reference=self.playback_reference)
+                self.sink.open()
+            except Exception as e:
+                logger.error(f"Failed to open audio output stream: {e}")
+                return False
+            self._initialize_cache()
+            self._initialize_earcons()
+            self._initialize_fast_voice()
+            self.selector = VoiceSelector(
+                self.tts.name,
+                self.fast_tts.name if self.fast_tts is not None else None,
+                cpu_limit=float(os.getenv("TTS_CPU_LIMIT", "85")),
+            )
+        elif null_sink:
+            # pyttsx3 can only play out loud
+            logger.error("The null audio sink needs a Piper voice")
+            return False
+        else:
+            logger.warning("Piper voice unavailable - falling back to pyttsx3")
+            self.tts = None
+            try:
+                import pyttsx3
+                self.engine = pyttsx3.init()
+                self.engine.setProperty("rate", int(170 * self.rate))
+                self.engine.setProperty("volume", self.volume)
+            except Exception as e:
+                logger.error(f"Failed to initialize TTS engine: {e}")
+                return False
+
+        if not self._threads:
+            for target in (self._synthesis_loop, self._playback_loop):
+                thread = threading.Thread(target=target, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return True
+
+    def _initialize_cache(self):
+        """Set up the synthesized speech cache"""
+        try:
+            self.cache = TTSCache(
+                os.getenv("TTS_CACHE_DIR", "~/.cache/scripture_palpi/tts"),
+                max_disk_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "50")) * 1024 * 1024),
+            )
+        except OSError as e:
+            logger.warning(f"TTS cache disabled: {e}")
+            self.cache = None
+
+    def _initialize_fast_voice(self):
+        """Load the low-quality voice and pay both voices' slow first inference now"""
+        if not self.fast_model_path:
+            return
+        fast = PiperEngine(self.fast_model_path, length_scale=1.0 / self.rate)
+        if not fast.load():
+            logger.warning(f"Fast Piper voice unavailable - every sentence uses {self.tts.name}")
+            return
+        for engine in (self.tts, fast):
+            for _ in engine.synthesize(DEFAULT_WARMUP_PHRASES[0]):
+                pass
+        self.fast_tts = fast
+        logger.info(f"Voices: {fast.name} until enough speech is buffered, then {self.tts.name}")
+
+    def use_voice(self, voice: Optional[str]) -> bool:
+        """Speak with another Piper voice, and its low-quality counterpart, from now on; None goes back to PIPER_MODEL"""
+        if self.tts is None:
+            return False
+        path = self._voice_path(voice) if voice else self.model_path
+        with self._voice_lock:
+            if path == self.tts.model_path:
+                return True
+            engines = self._idle_voices.pop(path, None)
+        if engines is None:
+            # Slow the first time only - the voices stay loaded while they are among the recent ones
+            engines = self._load_voice(path)
+            if engines is None:
+                logger.warning(f"Keeping {self.tts.name}: voice {voice} could not be loaded")
+                return False
+        engine, fast = engines
+        with self._voice_lock:
+            self._idle_voices[self.tts.model_path] = (self.tts, self.fast_tts)
+            while len(self._idle_voices) > self.max_idle_voices:
+                self._idle_voices.popitem(last=False)
+            self.tts, self.fast_tts = engine, fast
+            if self.selector is not None:
+                self.selector.set_voices(engine.name, fast.name if fast is not None else None)
+        logger.info(f"Speaking with {engine.name}" + (f", {fast.name} until enough is buffered" if fast else ""))
+        return True
+
+    def _load_voice(self, path: str) -> Optional[Tuple[PiperEngine, Optional[PiperEngine]]]:
+        """A quality voice and, when one is installed, its fast counterpart, both warmed up"""
+        engine = PiperEngine(path, length_scale=1.0 / self.rate)
+        if not engine.load():
+            return None
+        fast_path = self._fast_voice_path(path)
+        fast = PiperEngine(fast_path, length_scale=1.0 / self.rate) if fast_path else None
+        if fast is not None and not fast.load():
+            logger.warning(f"Fast voice {fast.name} unavailable - every sentence uses {engine.name}")
+            fast = None
+        for warming in (engine, fast):
+            if warming is not None:
+                for _ in warming.synthesize(DEFAULT_WARMUP_PHRASES[0]):
+                    pass
+        return engine, fast
+
+    def _voice_path(self, voice: str) -> str:
+        """A model path, or a voice name looked up next to PIPER_MODEL"""
+        if os.sep in voice or voice.endswith(".onnx"):
+            return os.path.expanduser(voice)
+        return os.path.join(os.path.dirname(self.model_path), f"{voice}.onnx")
+
+    def _fast_voice_path(self, path: str) -> Optional[str]:
+        """PIPER_FAST_MODEL for PIPER_MODEL; otherwise the same speaker's -low model next to the voice, if installed"""
+        if path == self.model_path:
+            return self.fast_model_path
+        # Piper names voices <language>-<speaker>-<quality>, e.g. en_US-ryan-medium
+        stem = os.path.basename(path)[:-len(".onnx")] if path.endswith(".onnx") else os.path.basename(path)
+        speaker, _, quality = stem.rpartition("-")
+        if quality not in PIPER_QUALITIES:
+            speaker = stem
+        fast_path = os.path.join(os.path.dirname(path), f"{speaker}-low.onnx")
+        return fast_path if fast_path != path and os.path.exists(fast_path) else None
+
+    def _initialize_earcons(self):
+        """Render every UI sound into memory at the output rate"""
+        self.earcons = EarconBank(self.sink.sample_rate, volume=float(os.getenv("EARCON_VOLUME", "0.35")))
+        count = self.earcons.render(os.getenv("EARCON_DIR"))
+        self._thinking_loop = EarconLoop(self.earcons.get("thinking"), self.sink.block_frames * 2)
+        logger.info(f"Rendered {count} earcons ({self.earcons.memory_bytes // 1024} KB)")
+
+    def play_earcon(self, name: str) -> float:
+        """Queue a UI sound; returns its length in seconds"""
+        pcm = self.earcons.get(name) if self.earcons is not None else None
+        if pcm is None:
+            return 0.0
+        generation = self._begin_utterance()
+        self._pcm_queue.put((generation, _EarconPcm(pcm)))
+        self._pcm_queue.put((generation, _END_OF_UTTERANCE))
+        return self.earcons.duration_s(name)
+
+    def start_thinking(self):
+        """Loop the thinking sound until speech starts or stop_thinking is called"""
+        if self._thinking_loop is None:
+            return
+        self._thinking_loop.rewind()
+        self._thinking_since = time.monotonic()
+        self._pcm_queue.put((self._generation, _THINK))
+
+    def stop_thinking(self):
+        """Silence the thinking loop at the end of the current block"""
+        self._thinking_since = None
+
+    def warm_up_cache(self, phrases: Optional[Iterable[str]] = None) -> int:
+        """Pre-render phrases into the cache so they play without synthesis"""
+        # The voice can be switched while this runs; every phrase is rendered and keyed with the one it started with
+        with self._voice_lock:
+            engine = self.tts
+        if self.cache is None or engine is None:
+            return 0
+        if phrases is None:
+            phrases = DEFAULT_WARMUP_PHRASES
+
+        def render(text: str) -> bytes:
+            pcm = b"".join(engine.synthesize(text))
+            if engine.sample_rate != self.sink.sample_rate:
+                pcm = audio_dsp.resample(audio_dsp.as_samples(pcm), engine.sample_rate,
+                                         self.sink.sample_rate).tobytes()
+            return self._apply_volume(pcm)
+
+        rendered = self.cache.warm_up(phrases, lambda text: self._cache_key(text, engine.name), render)
+        logger.info(f"TTS cache warm-up rendered {rendered} phrases")
+        return rendered
+
+    def buffered_s(self) -> float:
+        """Seconds of synthesized speech not yet played"""
+        if self.sink is None:
+            return 0.0
+        queued_s = self._queued_speech_bytes / (2 * self.sink.channels * self.sink.sample_rate)
+        return queued_s + max(0.0, self._playing_until - time.monotonic())
+
+    def get_voice_stats(self) -> Dict[str, Any]:
+        """Chosen voice and real-time factor per synthesized sentence"""
+        return self.selector.stats() if self.selector is not None else {}
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the speech cache"""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def _cache_key(self, text: str, voice: Optional[str] = None) -> str:
+        """Cache key for text spoken with the current voice settings"""
+        return self.cache.make_key(text, voice or self.tts.name, self.rate, self.volume)
+
+    @instrumentation.timed("tts_speak")
     def text_to_speech(self, text: str):
         """Convert text to speech and play through speakers"""
-        # TODO: Convert text to speech
-        # TODO: Play audio through speakers
-        # TODO: Handle errors
-        pass
-    
-    def play_audio(self, audio_data):
-        """Play audio through speakers"""
-        # TODO: Play audio data
-        # TODO: Handle different audio formats
-        pass
-    
+        self.speak_async(text)
+        self.wait_until_done()
+
+    def play_audio(self, audio_data: Union[bytes, str]):
+        """Play audio through speakers once the current utterance has finished"""
+        if self.sink is None:
+            logger.warning("No audio output stream - cannot play audio")
+            return
+
+        try:
+            pcm = self._to_sink_pcm(audio_data)
+        except (OSError, wave.Error, ValueError) as e:
+            logger.error(f"Unsupported audio data: {e}")
+            return
+
+        generation = self._begin_utterance()
+        self._pcm_queue.put((generation, pcm))
+        self._pcm_queue.put((generation, _END_OF_UTTERANCE))
+
+    def _to_sink_pcm(self, audio_data: Union[bytes, str]) -> bytes:
+        """Convert a WAV file, WAV bytes or raw PCM into the sink's format"""
+        if isinstance(audio_data, str):
+            with open(audio_data, "rb") as f:
+                audio_data = f.read()
+        if audio_data[:4] != b"RIFF":
+            return audio_data  # already raw 16-bit mono PCM at the sink rate
+
+        with wave.open(io.BytesIO(audio_data)) as wav:
+            rate, channels, width = wav.getframerate(), wav.getnchannels(), wav.getsampwidth()
+            pcm = wav.readframes(wav.getnframes())
+
+        samples = audio_dsp.to_int16(pcm, width)
+        samples = audio_dsp.to_mono(samples, channels)
+        samples = audio_dsp.resample(samples, rate, self.sink.sample_rate)
+        return samples.tobytes()
+
     def adjust_volume(self, level: float):
         """Adjust speaker volume"""
-        # TODO: Set volume level
-        # TODO: Validate volume range
-        pass
-    
+        if not 0.0 <= level <= 1.0:
+            raise ValueError("Volume level must be between 0.0 and 1.0")
+        self.volume = level
+        if self.engine is not None:
+            self.engine.setProperty("volume", level)
+
     def speak_async(self, text: str):
         """Speak text asynchronously"""
-        # TODO: Create thread for speech
-        # TODO: Speak text in background
-        pass
-    
-    def stop_speaking(self):
-        """Stop current speech"""
-        # TODO: Stop TTS engine
-        # TODO: Clear speech queue
-        pass 
\ No newline at end of file
+        text = text.strip()
+        if text:
+            generation = self._begin_utterance()
+            self._text_queue.put((generation, text))
+
+    def wait_until_done(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued utterance has been played"""
+        with self._done:
+            return self._done.wait_for(lambda: self._pending == 0, timeout)
+
+    def stop_speaking(self, requested_at: Optional[float] = None):
+        """Stop current speech, timing how long the speaker takes to go quiet"""
+        self._thinking_since = None
+        with self._done:
+            self._generation += 1
+            self._pending = 0
+            self._done.notify_all()
+            if self.is_speaking and requested_at is not None:
+                if self._writing:
+                    self._stop_requested_at = requested_at
+                else:
+                    self._record_interrupt(requested_at)
+
+        for pending in (self._text_queue, self._pcm_queue):
+            while True:
+                try:
+                    pending.get_nowait()
+                except queue.Empty:
+                    break
+        with self._done:
+            self._queued_speech_bytes = 0
+            self._playing_until = 0.0
+
+        if self.engine is not None and self.is_speaking:
+            self.engine.stop()
+        self.is_speaking = False
+
+    def _record_interrupt(self, requested_at: float):
+        self.interrupt_latencies.append((time.monotonic() - requested_at) * 1000)
+
+    def get_interrupt_stats(self) -> Dict[str, Any]:
+        """How quickly barge-in silenced the speaker"""
+        latencies = list(self.interrupt_latencies)
+        if not latencies:
+            return {"interruptions": 0}
+        return {
+            "interruptions": len(latencies),
+            "last_interrupt_ms": round(latencies[-1], 1),
+            "avg_interrupt_ms": round(sum(latencies) / len(latencies), 1),
+            "max_interrupt_ms": round(max(latencies), 1),
+        }
+
+    def _begin_utterance(self) -> int:
+        """Count a new utterance as pending and return the current generation"""
+        with self._done:
+            self._pending += 1
+            return self._generation
+
+    def _finish_utterance(self):
+        """Mark one utterance as played"""
+        with self._done:
+            self._pending = max(0, self._pending - 1)
+            if self._pending == 0:
+                self._done.notify_all()
+
+    def _apply_volume(self, pcm: bytes) -> bytes:
+        """Apply software gain to 16-bit PCM"""
+        if self.volume == 1.0:
+            return pcm
+        samples = audio_dsp.as_samples(pcm)
+        return audio_dsp.apply_gain(samples, self.volume, out=np.empty_like(samples)).tobytes()
+
+    def _synthesis_loop(self):
+        """Turn queued text into PCM chunks for the playback thread"""
+        while True:
+            generation, text = self._text_queue.get()
+            if generation != self._generation:
+                continue
+
+            # The active user's voice can change at any moment; this sentence keeps the pair it started with
+            with self._voice_lock:
+                quality, fast = self.tts, self.fast_tts
+            if quality is None:
+                self._speak_with_fallback(generation, text)
+                continue
+
+            # Only short, phrase-like sentences are worth caching
+            cacheable = self.cache is not None and len(text) <= self.cache_max_chars
+            key = self._cache_key(text, quality.name) if cacheable else None
+            cached = self.cache.get(key) if cacheable else None
+            if cached is not None:
+                self._queue_speech(generation, cached)
+                self._pcm_queue.put((generation, _END_OF_UTTERANCE))
+                continue
+
+            buffered_s, cpu_percent = self.buffered_s(), self.cpu_load()
+            voice, reason = self.selector.choose(text, buffered_s, cpu_percent)
+            engine = fast if fast is not None and voice == fast.name else quality
+            voice = engine.name
+            chunks: Optional[List[bytes]] = []
+            audio_bytes = 0
+            first_chunk_s = 0.0
+            started = time.perf_counter()
+            try:
+                for pcm in engine.synthesize(text):
+                    if generation != self._generation:
+                        chunks = None
+                        break
+                    if not audio_bytes:
+                        first_chunk_s = time.perf_counter() - started
+                        instrumentation.observe("tts_first_chunk", first_chunk_s * 1000)
+                    if engine.sample_rate != self.sink.sample_rate:
+                        pcm = audio_dsp.resample(audio_dsp.as_samples(pcm), engine.sample_rate,
+                                                 self.sink.sample_rate).tobytes()
+                    pcm = self._apply_volume(pcm)
+                    audio_bytes += len(pcm)
+                    chunks.append(pcm)
+                    self._queue_speech(generation, pcm)
+            except Exception as e:
+                logger.error(f"Text-to-speech failed: {e}")
+                chunks = None
+            self._pcm_queue.put((generation, _END_OF_UTTERANCE))
+            if chunks:
+                synthesis_s = time.perf_counter() - started
+                instrumentation.observe("tts_synthesis", synthesis_s * 1000)
+                self.selector.record(voice, text, audio_bytes / (2 * self.sink.sample_rate), synthesis_s,
+                                     first_chunk_s, reason, buffered_s, cpu_percent)
+
+            # Fast-voice renders aren't kept, so a cached phrase is always the quality voice
+            if cacheable and chunks and engine is quality:
+                self.cache.put(key, b"".join(chunks))
+
+    def _queue_speech(self, generation: int, pcm: bytes):
+        with self._done:
+            self._queued_speech_bytes += len(pcm)
+        self._pcm_queue.put((generation, pcm))
+
+    def _playback_loop(self):
+        """Write synthesized PCM into the persistent output stream"""
+        playing = None
+        while True:
+            if self._thinking_since is None:
+                generation, pcm = self._pcm_queue.get()
+            else:
+                try:
+                    generation, pcm = self._pcm_queue.get_nowait()
+                except queue.Empty:
+                    self._play_thinking_block()
+                    continue
+
+            speech = not (pcm is _THINK or pcm is _END_OF_UTTERANCE or isinstance(pcm, _EarconPcm))
+            if speech:
+                with self._done:
+                    self._queued_speech_bytes = max(0, self._queued_speech_bytes - len(pcm))
+            if generation != self._generation:
+                playing = None
+                continue
+            if pcm is _THINK:
+                continue
+
+            if pcm is _END_OF_UTTERANCE:
+                playing = None
+                self._finish_utterance()
+                if self._pcm_queue.empty():
+                    self.is_speaking = False
+                continue
+
+            # Real audio has arrived - the thinking loop ends on this block boundary
+            self._thinking_since = None
+
+            if playing != generation and not isinstance(pcm, _EarconPcm):
+                playing = generation
+                self.is_speaking = True
+                if self.on_audio_start:
+                    self.on_audio_start()
+
+            if speech:
+                self._playing_until = time.monotonic() + len(pcm) / (2 * self.sink.channels * self.sink.sample_rate)
+            self._writing = True
+            try:
+                finished = self.sink.write(pcm, should_stop=lambda: generation != self._generation)
+            except Exception as e:
+                logger.error(f"Audio playback failed: {e}")
+                finished = True
+            with self._done:
+                self._writing = False
+                if not finished and self._stop_requested_at is not None:
+                    self._record_interrupt(self._stop_requested_at)
+                    self._stop_requested_at = None
+
+    def _play_thinking_block(self):
+        """Write one block of the thinking loop, once the start delay has passed"""
+        since = self._thinking_since
+        if since is None:
+            return
+        if time.monotonic() - since < self.thinking_delay_s:
+            time.sleep(0.01)
+            return
+        try:
+            self.sink.write(self._thinking_loop.next_block(), should_stop=lambda: self._thinking_since is None)
+        except Exception as e:
+            logger.error(f"Audio playback failed: {e}")
+            self._thinking_since = None
+
+    def _speak_with_fallback(self, generation: int, text: str):
+        """Speak through pyttsx3 when no Piper voice is loaded"""
+        try:
+            if self.engine is not None:
+                self.is_speaking = True
+                if self.on_audio_start:
+                    self.on_audio_start()
+                self.engine.say(text)
+                self.engine.runAndWait()
+        except Exception as e:
+            logger.error(f"Text-to-speech failed: {e}")
+        finally:
+            self.is_speaking = False
+            if generation == self._generation:
+                self._finish_utterance()
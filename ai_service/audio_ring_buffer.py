@@ -0,0 +1,259 @@
+"""
+Audio Ring Buffer
+One microphone capture shared by every consumer through a preallocated frame ring
+"""
+
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import pyaudio
+
+logger = logging.getLogger(__name__)
+
+class AudioRingBuffer:
+    """Fixed-size ring of equal-length PCM frames with one writer and many cursors"""
+
+    def __init__(self, frame_bytes: int, capacity_frames: int):
+        self.frame_bytes = frame_bytes
+        self.capacity = capacity_frames
+        # Allocated once; frames are copied in by the writer and handed out as views
+        self._storage = bytearray(frame_bytes * capacity_frames)
+        self._view = memoryview(self._storage)
+        self.frames_written = 0
+        self.closed = False
+        self._cond = threading.Condition()
+        self._cursors: Dict[str, "RingCursor"] = {}
+
+    @property
+    def oldest(self) -> int:
+        """Index of the oldest frame that is still safe to read"""
+        # One slot of margin: the slot after the newest frame is the next one overwritten
+        return max(0, self.frames_written - self.capacity + 1)
+
+    def write(self, frame: bytes):
+        """Copy one captured frame into the next slot"""
+        start = (self.frames_written % self.capacity) * self.frame_bytes
+        length = min(len(frame), self.frame_bytes)
+        self._view[start:start + length] = frame[:length]
+        if length < self.frame_bytes:
+            self._view[start + length:start + self.frame_bytes] = bytes(self.frame_bytes - length)
+        with self._cond:
+            self.frames_written += 1
+            self._cond.notify_all()
+
+    def frame_at(self, index: int) -> memoryview:
+        """View of a frame - valid until the writer laps it"""
+        start = (index % self.capacity) * self.frame_bytes
+        return self._view[start:start + self.frame_bytes]
+
+    def cursor(self, name: str, preroll_frames: int = 0) -> "RingCursor":
+        """A reader starting at the live edge, or that many frames behind it"""
+        with self._cond:
+            position = max(self.oldest, self.frames_written - preroll_frames)
+            cursor = RingCursor(self, name, position)
+            self._cursors[name] = cursor
+            return cursor
+
+    def close(self):
+        """Wake every waiting reader"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        """Accept readers again after close(), e.g. when capture restarts"""
+        with self._cond:
+            self.closed = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Fill level and per-consumer lag and overruns"""
+        with self._cond:
+            return {
+                "capacity_frames": self.capacity,
+                "frames_written": self.frames_written,
+                "consumers": {
+                    name: {"lag_frames": cursor.lag, "overruns": cursor.overruns,
+                           "frames_dropped": cursor.frames_dropped, "idle": cursor.parked}
+                    for name, cursor in self._cursors.items()
+                },
+            }
+
+class RingCursor:
+    """One consumer's read position in an AudioRingBuffer"""
+
+    def __init__(self, ring: AudioRingBuffer, name: str, position: int):
+        self.ring = ring
+        self.name = name
+        self.position = position
+        self.overruns = 0
+        self.frames_dropped = 0
+        # A stage that only reads now and then isn't lagging while it has nothing to do
+        self.parked = False
+
+    @property
+    def lag(self) -> int:
+        """Frames written but not yet read"""
+        return 0 if self.parked else self.ring.frames_written - self.position
+
+    def read(self, timeout: Optional[float] = None) -> Optional[memoryview]:
+        """Next frame, waiting for the writer if needed; None on timeout or close"""
+        ring = self.ring
+        with ring._cond:
+            if not ring._cond.wait_for(lambda: self.position < ring.frames_written or ring.closed, timeout):
+                return None
+            if self.position >= ring.frames_written:
+                return None
+
+            oldest = ring.oldest
+            if self.position < oldest:
+                # Fell a whole ring behind - skip to the oldest frame still intact
+                self.overruns += 1
+                self.frames_dropped += oldest - self.position
+                self.position = oldest
+
+            frame = ring.frame_at(self.position)
+            self.position += 1
+            self.parked = False
+            return frame
+
+    def rewind(self, frames: int):
+        """Step back over frames already read, as far as the ring still holds them"""
+        with self.ring._cond:
+            self.position = max(self.ring.oldest, self.position - frames)
+
+    def seek(self, position: int):
+        """Move to an absolute frame index, clamped to what the ring still holds"""
+        with self.ring._cond:
+            self.position = min(self.ring.frames_written, max(self.ring.oldest, position))
+            self.parked = False
+
+    def seek_to_live(self):
+        """Skip everything buffered so far"""
+        with self.ring._cond:
+            self.position = self.ring.frames_written
+
+    def park(self):
+        """Stop reading until the next seek or read"""
+        self.parked = True
+
+class AudioCapture:
+    """The only PyAudio input stream; its callback thread fills the ring"""
+
+    def __init__(self, ring: AudioRingBuffer, sample_rate: int, frame_samples: int,
+                 device_index: Optional[int] = None):
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.frame_samples = frame_samples
+        self.device_index = device_index
+        self.device_overruns = 0
+        self._audio = None
+        self._stream = None
+
+    @property
+    def running(self) -> bool:
+        return self._stream is not None
+
+    def start(self):
+        """Open the microphone and start capturing"""
+        if self._stream is not None:
+            return
+        # A failed start or an earlier stop() closed the ring
+        self.ring.reopen()
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.frame_samples,
+            stream_callback=self._on_audio,
+        )
+        self._stream.start_stream()
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        if status & pyaudio.paInputOverflow:
+            self.device_overruns += 1
+        self.ring.write(in_data)
+        return (None, pyaudio.paContinue)
+
+    def stop(self):
+        """Stop capturing and release the device"""
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+        self.ring.close()
+
+class ReplayCapture:
+    """Stands in for AudioCapture: plays queued PCM clips into the ring in real time, silence in between"""
+
+    def __init__(self, ring: AudioRingBuffer, sample_rate: int, frame_samples: int):
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.frame_samples = frame_samples
+        self.frame_bytes = frame_samples * 2
+        self.device_overruns = 0
+        # Monotonic time the last frame of the most recent clip went into the ring
+        self.clip_finished_at: Optional[float] = None
+        self._clips: Deque[bytes] = deque()
+        self._clip_done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.ring.reopen()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._replay_loop, name="replay-capture", daemon=True)
+        self._thread.start()
+
+    def play(self, pcm: bytes):
+        """Queue 16-bit mono PCM at the capture rate"""
+        self._clip_done.clear()
+        self._clips.append(pcm)
+
+    def wait_until_played(self, timeout: Optional[float] = None) -> bool:
+        return self._clip_done.wait(timeout)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        self.ring.close()
+
+    def _replay_loop(self):
+        silence = bytes(self.frame_bytes)
+        frame_s = self.frame_samples / self.sample_rate
+        clip, offset = None, 0
+        # Paced against the start time so the stream doesn't drift like sleep() alone would
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            if clip is None and self._clips:
+                clip, offset = self._clips.popleft(), 0
+            if clip is not None:
+                self.ring.write(clip[offset:offset + self.frame_bytes])
+                offset += self.frame_bytes
+                if offset >= len(clip):
+                    clip = None
+                    self.clip_finished_at = time.monotonic()
+                    if not self._clips:
+                        self._clip_done.set()
+            else:
+                self.ring.write(silence)
+            next_at += frame_s
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
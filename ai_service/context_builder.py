@@ -0,0 +1,133 @@
+"""
+Context Builder
+Assembles each AI prompt from conversation history within a token budget
+"""
+
+import queue
+import threading
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from ai_service.conversation_store import ConversationStore, Turn
+
+logger = logging.getLogger(__name__)
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count - about four characters per token for English"""
+    return (len(text) + 3) // 4
+
+def format_transcript(turns: List[Turn]) -> str:
+    """Turns as 'User: ... / Palpi: ...' lines"""
+    speakers = {"user": "User", "assistant": "Palpi"}
+    return "\n".join(f"{speakers.get(turn.role, turn.role)}: {turn.content}" for turn in turns)
+
+class ContextBuilder:
+    """Recent turns verbatim, older turns folded into a cached rolling summary"""
+
+    def __init__(self, store: ConversationStore, summarize: Optional[Callable[[str, str], str]] = None,
+                 budget_tokens: int = 1500, verbatim_turns: int = 6, summary_tokens: int = 200,
+                 follow_up_s: float = 120.0):
+        self.store = store
+        self.summarize = summarize
+        self.budget_tokens = budget_tokens
+        self.verbatim_turns = verbatim_turns
+        self.summary_tokens = summary_tokens
+        self.follow_up_s = follow_up_s
+
+        self.prompt_tokens: Deque[int] = deque(maxlen=100)
+        self.summaries_built = 0
+
+        self._pending: "queue.Queue[str]" = queue.Queue()
+        self._worker = threading.Thread(target=self._summary_loop, daemon=True)
+        self._worker.start()
+
+    def build(self, session_id: str, system: str, message: str) -> Tuple[str, List[Dict[str, str]], int]:
+        """System prompt, chat messages and prompt token count for the next request"""
+        through_id, summary, _ = self.store.get_summary(session_id)
+        if summary:
+            system = f"{system}\n\nEarlier in this conversation: {summary}"
+
+        used = estimate_tokens(system) + estimate_tokens(message)
+        history: List[Turn] = []
+        for turn in reversed(self.store.recent_turns(session_id, self.verbatim_turns)):
+            if turn.id <= through_id or used + turn.tokens > self.budget_tokens:
+                break
+            history.insert(0, turn)
+            used += turn.tokens
+
+        # Both providers expect the conversation to open with the user
+        while history and history[0].role != "user":
+            used -= history.pop(0).tokens
+
+        messages = [{"role": turn.role, "content": turn.content} for turn in history]
+        messages.append({"role": "user", "content": message})
+        self.prompt_tokens.append(used)
+        return system, messages, used
+
+    def record(self, session_id: str, message: str, response: str, user_id: Optional[str] = None):
+        """Store a finished exchange and refresh the summary in the background"""
+        self.store.add_turn(session_id, "user", message, estimate_tokens(message), user_id)
+        self.store.add_turn(session_id, "assistant", response, estimate_tokens(response), user_id)
+        self._pending.put(session_id)
+
+    def is_follow_up(self, session_id: str, now: float) -> bool:
+        """Whether the next message may depend on what was just said"""
+        last = self.store.last_turn_time(session_id)
+        return last is not None and now - last < self.follow_up_s
+
+    def _summary_loop(self):
+        while True:
+            session_id = self._pending.get()
+            try:
+                self.refresh_summary(session_id)
+            except Exception as e:
+                logger.warning(f"Conversation summary update failed: {e}")
+
+    def refresh_summary(self, session_id: str):
+        """Fold turns that left the verbatim window into the session summary"""
+        window = self.store.recent_turns(session_id, self.verbatim_turns)
+        if not window:
+            return
+        through_id, summary, _ = self.store.get_summary(session_id)
+        aged_out = self.store.turns_between(session_id, through_id, window[0].id)
+        if not aged_out:
+            return
+
+        transcript = format_transcript(aged_out)
+        updated = None
+        if self.summarize is not None:
+            try:
+                updated = self.summarize(summary, transcript)
+            except Exception as e:
+                logger.warning(f"Falling back to extractive summary: {e}")
+        if not updated:
+            updated = self._extractive_summary(summary, aged_out)
+
+        updated = self._truncate(" ".join(updated.split()))
+        self.store.save_summary(session_id, aged_out[-1].id, updated, estimate_tokens(updated))
+        self.summaries_built += 1
+
+    def _extractive_summary(self, summary: str, turns: List[Turn]) -> str:
+        """The user's questions, newest kept when space runs out"""
+        asked = [turn.content.split("?")[0].strip() for turn in turns if turn.role == "user"]
+        return " ".join(filter(None, [summary] + [f"The user asked: {question}." for question in asked]))
+
+    def _truncate(self, summary: str) -> str:
+        """Keep the newest part of the summary within its token allowance"""
+        limit = self.summary_tokens * 4
+        if len(summary) <= limit:
+            return summary
+        cut = summary[-limit:]
+        return cut[cut.find(" ") + 1:] if " " in cut else cut
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-turn prompt token counts"""
+        counts = list(self.prompt_tokens)
+        return {
+            "last_prompt_tokens": counts[-1] if counts else 0,
+            "avg_prompt_tokens": round(sum(counts) / len(counts), 1) if counts else 0.0,
+            "max_prompt_tokens": max(counts) if counts else 0,
+            "budget_tokens": self.budget_tokens,
+            "summaries_built": self.summaries_built,
+        }
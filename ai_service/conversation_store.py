@@ -0,0 +1,129 @@
+"""
+Conversation Store
+SQLite-backed conversation turns and rolling summaries
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Turn:
+    """One stored message"""
+    id: int
+    role: str
+    content: str
+    tokens: int
+    created_at: float
+
+class ConversationStore:
+    """Persists conversation turns and each session's summary of older turns"""
+
+    def __init__(self, db_path: str):
+        self.db_path = os.path.expanduser(db_path)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS turns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                user_id TEXT,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                tokens INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_turns_session ON turns(session_id, created_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_turns_user ON turns(user_id, created_at)")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                session_id TEXT PRIMARY KEY,
+                through_turn_id INTEGER NOT NULL,
+                summary TEXT NOT NULL,
+                tokens INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    def add_turn(self, session_id: str, role: str, content: str, tokens: int,
+                 user_id: Optional[str] = None) -> int:
+        """Append a message and return its id"""
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO turns (session_id, user_id, role, content, tokens, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, user_id, role, content, tokens, time.time()),
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def recent_turns(self, session_id: str, limit: int) -> List[Turn]:
+        """The latest turns of a session, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, role, content, tokens, created_at FROM turns "
+                "WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, limit),
+            ).fetchall()
+        return [Turn(*row) for row in reversed(rows)]
+
+    def turns_between(self, session_id: str, after_id: int, before_id: int) -> List[Turn]:
+        """Turns with after_id < id < before_id, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, role, content, tokens, created_at FROM turns "
+                "WHERE session_id = ? AND id > ? AND id < ? ORDER BY id",
+                (session_id, after_id, before_id),
+            ).fetchall()
+        return [Turn(*row) for row in rows]
+
+    def last_turn_time(self, session_id: str) -> Optional[float]:
+        """When the session last had a message"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MAX(created_at) FROM turns WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_summary(self, session_id: str) -> Tuple[int, str, int]:
+        """(last summarized turn id, summary, summary tokens) for a session"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT through_turn_id, summary, tokens FROM summaries WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row if row else (0, "", 0)
+
+    def save_summary(self, session_id: str, through_turn_id: int, summary: str, tokens: int):
+        """Replace a session's summary"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO summaries (session_id, through_turn_id, summary, tokens, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (session_id, through_turn_id, summary, tokens, time.time()),
+            )
+            self._db.commit()
+
+    def clear(self, session_id: str):
+        """Forget a session"""
+        with self._lock:
+            self._db.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+            self._db.execute("DELETE FROM summaries WHERE session_id = ?", (session_id,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
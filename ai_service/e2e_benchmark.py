@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark
+Replays recorded questions through the whole assistant against mock LLM providers and a null speaker
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import psutil
+
+from ai_service.mock_llm_server import MockLLMServer
+from ai_service.wake_word import read_wav_pcm
+
+# Offsets from the turn's LatencyTrace, plus the one the user actually feels
+METRICS = ("speech_end_to_first_audio", "transcribed", "first_token", "first_sentence", "first_audio", "done")
+LABELS = {
+    "speech_end_to_first_audio": "speech end → first audio",
+    "transcribed": "wake → transcribed",
+    "first_token": "wake → first token",
+    "first_sentence": "wake → first sentence",
+    "first_audio": "wake → first audio",
+    "done": "wake → turn done",
+}
+
+class StageMonitor:
+    """CPU time and peak RSS of this process for each pipeline state"""
+
+    def __init__(self, interval_s: float = 0.05):
+        self.interval_s = interval_s
+        self.process = psutil.Process()
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._state = None
+        self._since = self._cpu_at = 0.0
+        self._peak = 0
+        threading.Thread(target=self._sample_loop, name="stage-monitor", daemon=True).start()
+
+    def enter(self, state: str):
+        now, cpu, rss = time.monotonic(), self._cpu_s(), self.process.memory_info().rss
+        with self._lock:
+            if self._state is not None:
+                stage = self.stages.setdefault(self._state, {"visits": 0, "wall_s": 0.0, "cpu_s": 0.0, "rss_peak": 0})
+                stage["visits"] += 1
+                stage["wall_s"] += now - self._since
+                stage["cpu_s"] += cpu - self._cpu_at
+                stage["rss_peak"] = max(stage["rss_peak"], self._peak, rss)
+            self._state, self._since, self._cpu_at, self._peak = state, now, cpu, rss
+
+    def report(self):
+        with self._lock:
+            stages = dict(self.stages)
+        return {
+            name: {
+                "visits": s["visits"],
+                "wall_s": round(s["wall_s"], 2),
+                "cpu_s": round(s["cpu_s"], 2),
+                # Above 100 when several threads run at once
+                "cpu_percent": round(100 * s["cpu_s"] / s["wall_s"], 1) if s["wall_s"] else None,
+                "rss_peak_mb": round(s["rss_peak"] / (1024 * 1024), 1),
+            }
+            for name, s in stages.items()
+        }
+
+    def _cpu_s(self) -> float:
+        times = self.process.cpu_times()
+        return times.user + times.system
+
+    def _sample_loop(self):
+        while True:
+            rss = self.process.memory_info().rss
+            with self._lock:
+                self._peak = max(self._peak, rss)
+            time.sleep(self.interval_s)
+
+class EventLog:
+    """Receives the events the worker would push to the app"""
+
+    def __init__(self, monitor: StageMonitor):
+        self.monitor = monitor
+        self.state = None
+        self.turns = {}
+        self.transcripts = {}
+        self._cond = threading.Condition()
+
+    def publish(self, event: str, data: dict):
+        if event == "state":
+            self.monitor.enter(data["state"])
+        with self._cond:
+            if event == "state":
+                self.state = data["state"]
+            elif event == "transcript":
+                self.transcripts[data["turn"]] = data
+            elif event == "turn":
+                self.turns[data["turn"]] = data
+            self._cond.notify_all()
+
+    def wait_for_turn(self, after: int, timeout: float):
+        with self._cond:
+            self._cond.wait_for(lambda: any(turn > after for turn in self.turns), timeout)
+            finished = [turn for turn in self.turns if turn > after]
+            return self.turns[min(finished)] if finished else None
+
+    def wait_for_state(self, state: str, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.state == state, timeout)
+
+def load_samples(folder):
+    """Every WAV in the folder: the wake phrase, a pause as if for the chime, then the question"""
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith(".wav"))
+    return [(name, read_wav_pcm(os.path.join(folder, name))) for name in names]
+
+def configure_environment(args, server: MockLLMServer, workdir: str):
+    """Point the pipeline at the replay source, null sink and mock providers"""
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(ROOT, ".env"))
+    os.environ.update({
+        "AUDIO_SOURCE": "replay",
+        "AUDIO_SINK": "null",
+        "OPENAI_API_KEY": "mock",
+        "ANTHROPIC_API_KEY": "mock",
+        "OPENAI_BASE_URL": f"{server.url}/v1",
+        "ANTHROPIC_BASE_URL": server.url,
+        "AI_PROVIDER": args.provider,
+        # Every run starts cold, so runs on different commits are comparable - and none of it lands in,
+        # or is shaped by, the real user's cache, history or stored preferences
+        "RESPONSE_CACHE": "0",
+        "CONVERSATION_HISTORY": "0",
+        "SESSIONS": "0",
+        "TTS_CACHE_DIR": os.path.join(workdir, "tts"),
+    })
+
+def run_turn(palpi, events: EventLog, name: str, pcm: bytes, timeout_s: float):
+    """Play one recording and collect the turn it produces"""
+    capture = palpi.voice_recognition.capture
+    before = palpi.turn_count
+    capture.play(pcm)
+    capture.wait_until_played(timeout_s)
+    speech_end = capture.clip_finished_at
+
+    turn = events.wait_for_turn(before, timeout_s)
+    if turn is None:
+        return {"file": name, "error": "no turn - wake word or question not recognized"}
+    events.wait_for_state("listening", timeout_s)
+
+    result = {"file": name, "turn": turn["turn"], "interrupted": turn["interrupted"]}
+    transcript = events.transcripts.get(turn["turn"])
+    if transcript is not None:
+        result["transcript"] = transcript["text"]
+    result.update({f"{stage}_ms": ms for stage, ms in turn["latency_ms"].items() if stage != "wake"})
+    trace = palpi.last_trace
+    if trace is not None and trace.turn_id == turn["turn"] and "first_audio" in trace.marks:
+        result["speech_end_to_first_audio_ms"] = round((trace.marks["first_audio"] - speech_end) * 1000, 1)
+    return result
+
+def summarize(turns):
+    """p50/p95/mean of every metric over the turns that completed"""
+    summary = {}
+    for metric in METRICS:
+        values = sorted(t[f"{metric}_ms"] for t in turns if f"{metric}_ms" in t)
+        if values:
+            summary[metric] = {
+                "p50": round(statistics.median(values), 1),
+                "p95": round(values[min(len(values) - 1, int(0.95 * len(values)))], 1),
+                "mean": round(statistics.fmean(values), 1),
+                "count": len(values),
+            }
+    return summary
+
+def pipeline_stages():
+    """p50/p95 of the instrumented pipeline stages"""
+    from ai_service import instrumentation
+    return {
+        name: {"count": h["count"], "p50": h["p50"], "p95": h["p95"]}
+        for name, h in instrumentation.snapshot()["stages"].items()
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_benchmark(args):
+    samples = load_samples(args.folder)
+    if not samples:
+        raise SystemExit(f"No WAV files found in {args.folder}")
+
+    server = MockLLMServer(args.first_token_ms, args.tokens_per_s)
+    server.start()
+    configure_environment(args, server, tempfile.mkdtemp(prefix="palpi-benchmark-"))
+
+    from main import ScripturePalpi
+    monitor = StageMonitor()
+    events = EventLog(monitor)
+    palpi = ScripturePalpi()
+    palpi.publish = events.publish
+
+    started = time.monotonic()
+    if not palpi.start_ai_service() or not palpi.wait_until_ready(timeout=120):
+        raise SystemExit("Pipeline did not start - check the STT model and Piper voice")
+    if palpi.audio_output is None or palpi.audio_output.sink is None:
+        raise SystemExit("No Piper voice - the null sink needs one")
+    startup_s = time.monotonic() - started
+    # Let the TTS cache warm-up finish so it isn't billed to the first turn
+    time.sleep(args.settle_s)
+
+    turns = []
+    for _ in range(args.repeat):
+        for name, pcm in samples:
+            turns.append(run_turn(palpi, events, name, pcm, args.turn_timeout_s))
+    palpi.stop_ai_service()
+    server.stop()
+
+    completed = [t for t in turns if "error" not in t]
+    return {
+        "commit": git_commit(),
+        "timestamp": round(time.time()),
+        "config": {
+            "provider": args.provider,
+            "first_token_ms": args.first_token_ms,
+            "tokens_per_s": args.tokens_per_s,
+            "stt_backend": palpi.voice_recognition.stt.name,
+            "piper_model": palpi.audio_output.model_path,
+            "files": len(samples),
+            "repeat": args.repeat,
+        },
+        "startup_s": round(startup_s, 2),
+        "turns_completed": len(completed),
+        "turns_failed": len(turns) - len(completed),
+        "summary": summarize(completed),
+        "stages": monitor.report(),
+        "pipeline": pipeline_stages(),
+        "mock_llm_requests": server.requests,
+        "turns": turns,
+    }
+
+def print_report(results, baseline=None):
+    config = results["config"]
+    print(f"🧪 End-to-end benchmark @ {results['commit'] or 'unknown commit'} - "
+          f"{config['files']} files × {config['repeat']}, {config['provider']} mock "
+          f"({config['first_token_ms']:.0f} ms first token, {config['tokens_per_s']:.0f} tokens/s)")
+    print("=" * 72)
+    print(f"startup {results['startup_s']:.2f} s, {results['turns_completed']} turns completed, "
+          f"{results['turns_failed']} failed")
+    print()
+    header = f"{'ms':<28} {'p50':>8} {'p95':>8} {'mean':>8}"
+    print(header + (f" {'Δ p50':>9}" if baseline else ""))
+    for metric, values in results["summary"].items():
+        line = f"{LABELS[metric]:<28} {values['p50']:>8.0f} {values['p95']:>8.0f} {values['mean']:>8.0f}"
+        before = (baseline or {}).get("summary", {}).get(metric)
+        if before:
+            line += f" {values['p50'] - before['p50']:>+9.0f}"
+        print(line)
+
+    print()
+    print(f"{'state':<14} {'wall s':>8} {'CPU s':>8} {'CPU %':>8} {'peak RSS MB':>12}")
+    for state, s in results["stages"].items():
+        cpu_percent = f"{s['cpu_percent']:.0f}" if s["cpu_percent"] is not None else "-"
+        print(f"{state:<14} {s['wall_s']:>8.2f} {s['cpu_s']:>8.2f} {cpu_percent:>8} {s['rss_peak_mb']:>12.1f}")
+
+    for turn in results["turns"]:
+        if "error" in turn:
+            print(f"❌ {turn['file']}: {turn['error']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("folder", help="folder of WAVs, each a wake phrase followed by a question")
+    parser.add_argument("--provider", choices=["openai", "anthropic"], default="openai")
+    parser.add_argument("--first-token-ms", type=float, default=400, help="mock provider time to first token")
+    parser.add_argument("--tokens-per-s", type=float, default=30, help="mock provider streaming rate")
+    parser.add_argument("--repeat", type=int, default=1, help="play the folder this many times")
+    parser.add_argument("--turn-timeout-s", type=float, default=60)
+    parser.add_argument("--settle-s", type=float, default=3, help="idle time after startup before the first turn")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to show p50 changes against")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+if __name__ == "__main__":
+    main()
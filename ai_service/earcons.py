@@ -0,0 +1,91 @@
+"""
+Earcons
+Short UI sounds rendered once at startup and kept in memory as PCM
+"""
+
+import os
+import wave
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ai_service import audio_dsp
+
+logger = logging.getLogger(__name__)
+
+# (frequency Hz, duration s) notes; a frequency of 0 is a rest
+EARCON_NOTES: Dict[str, List[Tuple[float, float]]] = {
+    "wake": [(660, 0.07), (880, 0.09)],
+    "thinking": [(523, 0.12), (0, 0.68)],  # one pulse per loop
+    "error": [(440, 0.12), (0, 0.03), (330, 0.2)],
+    "goodbye": [(784, 0.1), (659, 0.1), (523, 0.18)],
+}
+
+class EarconBank:
+    """Every UI sound as ready-to-write PCM at the output sample rate"""
+
+    def __init__(self, sample_rate: int, volume: float = 0.35):
+        self.sample_rate = sample_rate
+        self.volume = volume
+        self._sounds: Dict[str, bytes] = {}
+
+    def render(self, override_dir: Optional[str] = None) -> int:
+        """Synthesize the built-in sounds, replaced by <name>.wav files from override_dir"""
+        for name, notes in EARCON_NOTES.items():
+            self._sounds[name] = self._render_notes(notes).tobytes()
+
+        if override_dir and os.path.isdir(override_dir):
+            for name in EARCON_NOTES:
+                path = os.path.join(override_dir, f"{name}.wav")
+                if os.path.exists(path):
+                    try:
+                        self._sounds[name] = self._load_wav(path).tobytes()
+                    except (OSError, wave.Error, ValueError) as e:
+                        logger.warning(f"Keeping the built-in {name} earcon: {e}")
+        return len(self._sounds)
+
+    def _render_notes(self, notes: List[Tuple[float, float]]) -> np.ndarray:
+        parts = [
+            audio_dsp.tone(frequency, duration, self.sample_rate, amplitude=self.volume)
+            if frequency else audio_dsp.silence(duration, self.sample_rate)
+            for frequency, duration in notes
+        ]
+        return np.concatenate(parts)
+
+    def _load_wav(self, path: str) -> np.ndarray:
+        with wave.open(path, "rb") as wav:
+            rate, channels, width = wav.getframerate(), wav.getnchannels(), wav.getsampwidth()
+            pcm = wav.readframes(wav.getnframes())
+        samples = audio_dsp.to_mono(audio_dsp.to_int16(pcm, width), channels)
+        return audio_dsp.resample(samples, rate, self.sample_rate)
+
+    def get(self, name: str) -> Optional[bytes]:
+        return self._sounds.get(name)
+
+    def duration_s(self, name: str) -> float:
+        sound = self._sounds.get(name)
+        return len(sound) / (2 * self.sample_rate) if sound else 0.0
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(len(sound) for sound in self._sounds.values())
+
+class EarconLoop:
+    """Hands out fixed-size blocks of a sound, wrapping around without a gap"""
+
+    def __init__(self, pcm: bytes, block_bytes: int):
+        # Doubled (or more) so any block can be sliced out in one piece
+        repeats = 2 + block_bytes // max(1, len(pcm))
+        self._data = memoryview(pcm * repeats)
+        self._length = len(pcm)
+        self._block_bytes = block_bytes
+        self._offset = 0
+
+    def rewind(self):
+        self._offset = 0
+
+    def next_block(self) -> memoryview:
+        block = self._data[self._offset:self._offset + self._block_bytes]
+        self._offset = (self._offset + self._block_bytes) % self._length
+        return block
@@ -0,0 +1,66 @@
+"""
+Echo Suppression
+Tells the user's voice apart from our own speech picked up by the microphone
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Tuple
+
+from ai_service import audio_dsp
+
+class PlaybackReference:
+    """Loudness of recently played audio blocks, written by the output stream"""
+
+    def __init__(self, history_s: float = 2.0):
+        self.history_s = history_s
+        self._levels: Deque[Tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+
+    def push(self, pcm: bytes):
+        """Record one block of 16-bit PCM as it is handed to the speaker"""
+        now = time.monotonic()
+        rms = audio_dsp.rms(audio_dsp.as_samples(pcm))
+        with self._lock:
+            self._levels.append((now, rms))
+            while self._levels and now - self._levels[0][0] > self.history_s:
+                self._levels.popleft()
+
+    def level(self, now: float, lookback_s: float) -> int:
+        """Loudest block played within the lookback window"""
+        with self._lock:
+            return max((rms for played_at, rms in self._levels if now - played_at <= lookback_s), default=0)
+
+class EchoSuppressor:
+    """Learns how loud the speaker is at the microphone and flags frames louder than that"""
+
+    silence_rms = 50
+    fast_adapt = 0.05
+    slow_adapt = 0.005
+
+    def __init__(self, reference: PlaybackReference, coupling: float = 1.0, margin: float = 2.0,
+                 lookback_s: float = 0.3):
+        self.reference = reference
+        # Microphone RMS per unit of output RMS; starts high so the first reply doesn't self-interrupt
+        self.coupling = coupling
+        self.margin = margin
+        # Covers the output buffer plus the acoustic path back to the microphone
+        self.lookback_s = lookback_s
+        self.suppressed_frames = 0
+
+    def is_user_speech(self, mic_rms: int, now: float) -> bool:
+        """Whether a loud microphone frame is more than our own echo"""
+        played = self.reference.level(now, self.lookback_s)
+        if played < self.silence_rms:
+            return True
+
+        ratio = mic_rms / played
+        if ratio > self.margin * self.coupling:
+            # Creep towards louder couplings too, in case the estimate started low
+            self.coupling += self.slow_adapt * (ratio - self.coupling)
+            return True
+
+        self.coupling += self.fast_adapt * (ratio - self.coupling)
+        self.suppressed_frames += 1
+        return False
@@ -0,0 +1,142 @@
+"""
+Instrumentation
+Stage timing spans and fixed-bucket latency histograms for the voice pipeline
+"""
+
+import os
+import time
+import bisect
+import functools
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# INSTRUMENTATION=0 turns every span into a shared no-op
+ENABLED = os.getenv("INSTRUMENTATION", "1") != "0"
+
+# One bucket layout for every stage, from a wake-word frame (sub-ms) to a slow LLM reply
+BUCKETS_MS: Tuple[float, ...] = (
+    0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000, 30000,
+)
+
+class Histogram:
+    """Counts of observations per fixed latency bucket"""
+
+    __slots__ = ("name", "bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, name: str, bounds: Tuple[float, ...] = BUCKETS_MS):
+        self.name = name
+        self.bounds = bounds
+        # The extra last bucket catches everything above the largest bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms: float):
+        index = bisect.bisect_left(self.bounds, value_ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value_ms
+            self.count += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Estimate by interpolating within the bucket that holds the q-th percentile"""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if not total:
+            return None
+        rank = q / 100 * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                if index == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index]
+                return round(lower + (upper - lower) * (rank - seen) / count, 2)
+            seen += count
+        return self.bounds[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts, total, summed = list(self.counts), self.count, self.sum
+        return {
+            "count": total,
+            "sum_ms": round(summed, 2),
+            "counts": counts,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+_histograms: Dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+
+def histogram(name: str) -> Histogram:
+    """The histogram for a stage, created on first use"""
+    found = _histograms.get(name)
+    if found is None:
+        with _histograms_lock:
+            found = _histograms.setdefault(name, Histogram(name))
+    return found
+
+def observe(name: str, value_ms: float):
+    """Record a duration measured elsewhere"""
+    if ENABLED:
+        histogram(name).observe(value_ms)
+
+class _Span:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, name: str):
+        self._histogram = histogram(name)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe((time.perf_counter() - self._start) * 1000)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(name: str):
+    """Context manager timing its body into the named stage"""
+    return _Span(name) if ENABLED else _NULL_SPAN
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call; leaves the function untouched when disabled"""
+    def decorate(function: Callable) -> Callable:
+        if not ENABLED:
+            return function
+        stage = histogram(name)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stage.observe((time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorate
+
+def snapshot() -> Dict[str, Any]:
+    """Every stage histogram, for the status report"""
+    with _histograms_lock:
+        histograms = list(_histograms.values())
+    return {
+        "enabled": ENABLED,
+        "buckets_ms": list(BUCKETS_MS),
+        "stages": {h.name: h.snapshot() for h in histograms},
+    }
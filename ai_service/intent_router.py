@@ -0,0 +1,152 @@
+"""
+Intent Router
+Answers messages that are nothing but a verse lookup from the local scripture index, before any LLM call
+"""
+
+import os
+import re
+import logging
+from typing import Optional
+
+from ai_service.scripture_index import ScriptureIndex, book_aliases
+
+logger = logging.getLogger(__name__)
+
+_UNITS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+}
+_TEENS = {
+    "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70,
+    "eighty": 80, "ninety": 90,
+}
+
+# Only a message that is nothing but a lookup is answered locally - "what does John 3:16 mean?",
+# "I lost my job two weeks ago" or "a verse about my fear of flying" need the LLM
+_LOOKUP_PREFIX = (
+    r"(?:(?:please|can you|could you|would you)\s+)?"
+    r"(?:(?:read|quote|look up|find|show|give)(?:\s+me)?|what\s+(?:does|do|is|s)|tell\s+me(?:\s+what)?|is\s+there)"
+    r"(?:\s+(?:a|an|the|some|any))?"
+)
+_LOOKUP_SUFFIX = r"(?:say|says|please|say please)"
+
+# "verse about fear", "read me a scripture on forgiveness", "bible verses for anxiety"
+_TOPIC = re.compile(
+    rf"^(?:{_LOOKUP_PREFIX}\s+)?(?:(?:a|an|some|any)\s+)?(?:bible\s+)?(?:verse|verses|scripture|scriptures|passage)"
+    rf"\s+(?:about|on|for)\s+(?P<topic>[a-z]+(?:\s+[a-z]+)?)(?:\s+{_LOOKUP_SUFFIX})?$"
+)
+# Words that make the "topic" about the user rather than a subject to look up
+_PERSONAL = {"my", "our", "me", "i", "we", "your", "his", "her", "their", "when", "how", "what", "why", "if"}
+
+def spoken_numbers_to_digits(text: str) -> str:
+    """Turn 'romans eight twenty eight' into 'romans 8 28'"""
+    words = []
+    current = None
+    last = None
+
+    def flush():
+        nonlocal current, last
+        if current is not None:
+            words.append(str(current))
+        current, last = None, None
+
+    for word in text.split():
+        lower = word.lower()
+        if lower in _UNITS:
+            if current is not None and last in ("tens", "hundred"):
+                current += _UNITS[lower]
+            else:
+                flush()
+                current = _UNITS[lower]
+            last = "unit"
+        elif lower in _TEENS or lower in _TENS:
+            value = _TEENS.get(lower) or _TENS[lower]
+            if current is not None and last == "hundred":
+                current += value
+            else:
+                flush()
+                current = value
+            last = "tens" if lower in _TENS else "teen"
+        elif lower == "hundred" and last == "unit":
+            current *= 100
+            last = "hundred"
+        elif lower == "and" and last == "hundred":
+            continue
+        else:
+            flush()
+            words.append(word)
+    flush()
+    return " ".join(words)
+
+class IntentRouter:
+    """Routes reference lookups and topical verse requests to the local index"""
+
+    max_read_verses = 20
+
+    def __init__(self, index: ScriptureIndex):
+        self.index = index
+        self.local_answers = 0
+        self._aliases = book_aliases()
+
+        books = "|".join(re.escape(alias) for alias in sorted(self._aliases, key=len, reverse=True))
+        self._reference = re.compile(
+            rf"^(?:{_LOOKUP_PREFIX}\s+)?(?:(?:verse|verses|passage|chapter)\s+)?"
+            rf"(?P<book>{books})\.?\s+(?:chapter\s+)?(?P<chapter>\d+)"
+            rf"(?:(?:\s*:\s*|\s+(?:verses?\s+)?)(?P<verse>\d+)"
+            rf"(?:\s*(?:-|to|through)\s*(?P<end>\d+))?)?"
+            rf"(?:\s+{_LOOKUP_SUFFIX})?$"
+        )
+
+    @classmethod
+    def from_env(cls) -> Optional["IntentRouter"]:
+        """Create a router if a scripture index has been built"""
+        index_dir = os.getenv("SCRIPTURE_INDEX_DIR", "scripture_index")
+        if not ScriptureIndex.exists(index_dir):
+            logger.info(f"No scripture index at {index_dir} - verse lookups go to the AI provider")
+            return None
+        return cls(ScriptureIndex(index_dir))
+
+    def route(self, message: str) -> Optional[str]:
+        """Spoken answer for a lookup request, or None if the LLM should answer"""
+        text = " ".join(spoken_numbers_to_digits(re.sub(r"[^\w\s:-]", " ", message.lower())).split())
+
+        answer = self._answer_reference(text) or self._answer_topic(text)
+        if answer:
+            self.local_answers += 1
+        return answer
+
+    def _answer_reference(self, text: str) -> Optional[str]:
+        match = self._reference.match(text)
+        if not match:
+            return None
+
+        book = self._aliases[match.group("book")]
+        chapter = int(match.group("chapter"))
+        verse = int(match.group("verse")) if match.group("verse") else None
+        end = int(match.group("end")) if match.group("end") else None
+
+        verses = self.index.lookup(book, chapter, verse, end, limit=self.max_read_verses)
+        if not verses:
+            return None
+
+        if len(verses) == 1:
+            reference, verse_text = verses[0]
+            return f"{reference}. {verse_text}"
+
+        heading = f"{book} chapter {chapter}" if verse is None else f"{verses[0][0]} to {verses[-1][0].rsplit(':', 1)[1]}"
+        return f"{heading}. " + " ".join(verse_text for _, verse_text in verses)
+
+    def _answer_topic(self, text: str) -> Optional[str]:
+        match = _TOPIC.match(text)
+        if not match or _PERSONAL & set(match.group("topic").split()):
+            return None
+
+        results = self.index.search(match.group("topic"), limit=1)
+        if not results:
+            return None
+
+        reference, verse_text = results[0]
+        return f"Here is a verse about {match.group('topic').strip()}. {reference} says: {verse_text}"
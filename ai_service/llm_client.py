@@ -0,0 +1,352 @@
+"""
+LLM Client Layer
+Asyncio streaming clients with warm connection pools, deadlines, failover and hedging
+"""
+
+import asyncio
+import queue
+import threading
+import time
+import logging
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+# The SDKs take seconds to import on a Pi, so they load on the client thread in start()
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("openai", "anthropic")
+
+# Markers passed from the event loop to the consuming thread
+_END = object()
+
+# (system prompt, messages, max tokens) - the same for every provider tried
+_Request = Tuple[str, List[Dict[str, str]], int]
+
+class LatencyWindow:
+    """Rolling window of recent latencies"""
+
+    def __init__(self, size: int = 100):
+        self._values: Deque[float] = deque(maxlen=size)
+
+    def add(self, value_ms: float):
+        self._values.append(value_ms)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self._values:
+            return None
+        ordered = sorted(self._values)
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"count": len(self._values), "p50_ms": self.percentile(0.5), "p95_ms": self.percentile(0.95)}
+
+class _Attempt:
+    """One streaming request to one provider"""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.chunks: "asyncio.Queue" = asyncio.Queue()
+        self.first_token = asyncio.Event()
+        self.finished = asyncio.Event()
+        self.error: Optional[BaseException] = None
+        self.started = time.monotonic()
+        self.hedge = False
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def failed(self) -> bool:
+        """Finished without ever producing a token"""
+        return self.finished.is_set() and not self.first_token.is_set()
+
+class LLMClient:
+    """Runs provider requests on a private event loop and streams them to sync callers"""
+
+    keep_warm_interval_s = 45
+    cancel_poll_s = 0.05
+
+    def __init__(self, openai_key: Optional[str], anthropic_key: Optional[str],
+                 openai_model: str, anthropic_model: str, max_tokens: int,
+                 first_token_timeout_s: float = 6.0, request_timeout_s: float = 30.0,
+                 hedge_after_ms: Optional[float] = None):
+        self.openai_key = openai_key
+        self.anthropic_key = anthropic_key
+        self.models = {"openai": openai_model, "anthropic": anthropic_model}
+        self.max_tokens = max_tokens
+        self.first_token_timeout_s = first_token_timeout_s
+        self.request_timeout_s = request_timeout_s
+        self.hedge_after_ms = hedge_after_ms
+
+        self.first_token_latency = {p: LatencyWindow() for p in PROVIDERS}
+        self.total_latency = {p: LatencyWindow() for p in PROVIDERS}
+        self.failovers = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+        self._clients: Dict[str, Any] = {}
+        self._http: Optional["httpx.AsyncClient"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the event loop thread, create pooled clients and open connections"""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._setup(), self._loop).result()
+
+    async def _setup(self):
+        import httpx
+        import openai
+        import anthropic
+
+        # One keep-alive pool shared by both SDKs; retries are ours to decide
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=120),
+            timeout=httpx.Timeout(self.request_timeout_s, connect=5.0),
+        )
+        if self.openai_key:
+            self._clients["openai"] = openai.AsyncOpenAI(
+                api_key=self.openai_key, http_client=self._http, max_retries=0)
+        if self.anthropic_key:
+            self._clients["anthropic"] = anthropic.AsyncAnthropic(
+                api_key=self.anthropic_key, http_client=self._http, max_retries=0)
+
+        await self._warm()
+        asyncio.get_running_loop().create_task(self._keep_warm())
+
+    async def _warm(self):
+        """Open TLS connections ahead of the first request"""
+        import httpx
+
+        async def touch(provider: str):
+            try:
+                await self._http.head(str(self._clients[provider].base_url))
+            except httpx.HTTPError as e:
+                logger.debug(f"Warm-up of {provider} connection failed: {e}")
+
+        await asyncio.gather(*(touch(provider) for provider in self._clients))
+
+    async def _keep_warm(self):
+        """Stop idle connections from being closed by the server"""
+        while True:
+            await asyncio.sleep(self.keep_warm_interval_s)
+            await self._warm()
+
+    def available(self) -> Dict[str, bool]:
+        """Which providers have a client"""
+        return {provider: provider in self._clients for provider in PROVIDERS}
+
+    def stream(self, system: str, messages: List[Dict[str, str]], primary: str,
+               fallback: bool = True, cancel: Optional[threading.Event] = None,
+               max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Stream a response, failing over or hedging to the other provider as configured"""
+        out: "queue.Queue" = queue.Queue()
+        request = (system, messages, max_tokens or self.max_tokens)
+        future = asyncio.run_coroutine_threadsafe(self._run(request, primary, fallback, out), self._loop)
+        try:
+            while True:
+                try:
+                    item = out.get(timeout=self.cancel_poll_s)
+                except queue.Empty:
+                    if cancel is not None and cancel.is_set():
+                        return
+                    continue
+                if cancel is not None and cancel.is_set():
+                    return
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Leaving early (barge-in, shutdown) cancels the request
+            future.cancel()
+
+    def _order(self, primary: str, fallback: bool) -> List[str]:
+        order = [primary] + ([p for p in PROVIDERS if p != primary] if fallback else [])
+        return [provider for provider in order if provider in self._clients]
+
+    def _launch(self, provider: str, request: _Request) -> _Attempt:
+        attempt = _Attempt(provider)
+        attempt.task = asyncio.get_running_loop().create_task(self._pump(attempt, request))
+        return attempt
+
+    async def _pump(self, attempt: _Attempt, request: _Request):
+        """Read one provider stream into the attempt's queue"""
+        try:
+            async for chunk in self._provider_stream(attempt.provider, *request):
+                if not attempt.first_token.is_set():
+                    self.first_token_latency[attempt.provider].add((time.monotonic() - attempt.started) * 1000)
+                    attempt.first_token.set()
+                attempt.chunks.put_nowait(chunk)
+            self.total_latency[attempt.provider].add((time.monotonic() - attempt.started) * 1000)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            attempt.error = e
+            logger.warning(f"{attempt.provider} request failed: {e}")
+        finally:
+            attempt.finished.set()
+            attempt.chunks.put_nowait(_END)
+
+    async def _run(self, request: _Request, primary: str, fallback: bool, out: "queue.Queue"):
+        """Pick a winning attempt, then forward its tokens"""
+        racing: List[_Attempt] = []
+        try:
+            order = self._order(primary, fallback)
+            if not order:
+                raise RuntimeError("No AI provider is configured")
+
+            winner = await self._first_to_respond(order, request, racing)
+            if winner is None:
+                errors = [a.error for a in racing if a.error is not None]
+                raise errors[-1] if errors else TimeoutError("No AI provider responded in time")
+
+            for attempt in racing:
+                if attempt is not winner:
+                    attempt.task.cancel()
+            if winner.hedge:
+                self.hedge_wins += 1
+
+            deadline = winner.started + self.request_timeout_s
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(winner.chunks.get(), max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"{winner.provider} response cut off at the {self.request_timeout_s}s deadline")
+                if chunk is _END:
+                    break
+                out.put(chunk)
+            if winner.error is not None:
+                # Failed part way through - the caller must not take what arrived for the whole answer
+                raise winner.error
+            out.put(_END)
+        except asyncio.CancelledError:
+            out.put(_END)
+            raise
+        except Exception as e:
+            out.put(e)
+        finally:
+            for attempt in racing:
+                attempt.task.cancel()
+
+    async def _first_to_respond(self, order: List[str], request: _Request,
+                                racing: List[_Attempt]) -> Optional[_Attempt]:
+        """Launch attempts in order until one produces a first token"""
+        loop = asyncio.get_running_loop()
+        remaining = list(order)
+
+        def launch():
+            racing.append(self._launch(remaining.pop(0), request))
+
+        launch()
+        first_deadline = loop.time() + self.first_token_timeout_s
+        hedge_at = loop.time() + self.hedge_after_ms / 1000 if self.hedge_after_ms else None
+
+        while True:
+            live = [a for a in racing if not a.failed]
+            if not live:
+                if not remaining:
+                    return None
+                self.failovers += 1
+                launch()
+                first_deadline = loop.time() + self.first_token_timeout_s
+                continue
+
+            wake_at = first_deadline if hedge_at is None or not remaining else min(first_deadline, hedge_at)
+            waiters = [loop.create_task(a.first_token.wait()) for a in live]
+            waiters += [loop.create_task(a.finished.wait()) for a in live]
+            await asyncio.wait(waiters, timeout=max(0.0, wake_at - loop.time()),
+                               return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                waiter.cancel()
+
+            for attempt in live:
+                if attempt.first_token.is_set():
+                    return attempt
+
+            now = loop.time()
+            if hedge_at is not None and remaining and now >= hedge_at:
+                # Primary is slow to start - race the next provider against it
+                hedge_at = None
+                self.hedges += 1
+                launch()
+                racing[-1].hedge = True
+            elif now >= first_deadline:
+                for attempt in live:
+                    attempt.task.cancel()
+                    attempt.error = TimeoutError(f"{attempt.provider} sent no tokens in {self.first_token_timeout_s}s")
+                    attempt.finished.set()
+                if not remaining:
+                    return None
+                self.failovers += 1
+                launch()
+                first_deadline = loop.time() + self.first_token_timeout_s
+
+    async def _provider_stream(self, provider: str, system: str, messages: List[Dict[str, str]], max_tokens: int):
+        """Async token stream from one provider"""
+        if provider == "openai":
+            stream = await self._clients["openai"].chat.completions.create(
+                model=self.models["openai"],
+                messages=[{"role": "system", "content": system}] + messages,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        else:
+            stream = await self._clients["anthropic"].completions.create(
+                model=self.models["anthropic"],
+                prompt=self._anthropic_prompt(system, messages),
+                max_tokens_to_sample=max_tokens,
+                stream=True,
+            )
+            async for completion in stream:
+                if completion.completion:
+                    yield completion.completion
+
+    @staticmethod
+    def _anthropic_prompt(system: str, messages: List[Dict[str, str]]) -> str:
+        """Render chat messages as a Human/Assistant completion prompt"""
+        import anthropic
+
+        prompt = ""
+        for index, message in enumerate(messages):
+            content = message["content"].strip()
+            if message["role"] == "user":
+                if index == 0:
+                    content = f"{system}\n\n{content}"
+                prompt += f"{anthropic.HUMAN_PROMPT} {content}"
+            else:
+                prompt += f"{anthropic.AI_PROMPT} {content}"
+        return prompt + anthropic.AI_PROMPT
+
+    def latency_stats(self) -> Dict[str, Any]:
+        """Rolling first-token and total latency percentiles per provider"""
+        return {
+            "providers": {
+                provider: {
+                    "first_token": self.first_token_latency[provider].summary(),
+                    "total": self.total_latency[provider].summary(),
+                }
+                for provider in PROVIDERS
+            },
+            "failovers": self.failovers,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
+    def close(self):
+        """Close pooled connections and stop the event loop"""
+        if self._loop is None:
+            return
+        if self._http is not None:
+            asyncio.run_coroutine_threadsafe(self._http.aclose(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Mock LLM Server
+Local stand-in for the OpenAI and Anthropic streaming APIs with configurable latency and token rate
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+DEFAULT_RESPONSE = (
+    "Peace be with you. The Lord is my shepherd; I shall not want. He makes me lie down in green "
+    "pastures and leads me beside still waters. Whatever you are carrying today, you do not carry "
+    "it alone, so bring it to Him in prayer."
+)
+
+class MockLLMServer:
+    """Streams a canned answer one word-token at a time, like the real APIs do"""
+
+    def __init__(self, first_token_ms: float = 400, tokens_per_s: float = 30,
+                 response: str = DEFAULT_RESPONSE, host: str = "127.0.0.1", port: int = 0):
+        self.first_token_ms = first_token_ms
+        self.tokens_per_s = tokens_per_s
+        self.tokens: List[str] = re.findall(r"\S+\s*", response)
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="mock-llm", daemon=True)
+            self._thread.start()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread = None
+
+    def token_delays(self):
+        """Seconds to wait before each token"""
+        yield self.first_token_ms / 1000
+        while True:
+            yield 1 / self.tokens_per_s if self.tokens_per_s > 0 else 0.0
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        # Connection warm-up
+        self.send_response(200)
+        self.end_headers()
+
+    def do_POST(self):
+        mock: MockLLMServer = self.server.mock
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.endswith("/chat/completions"):
+            events = self._openai_events(body.get("model", "mock"), mock.tokens)
+        elif self.path.endswith("/complete"):
+            events = self._anthropic_events(body.get("model", "mock"), mock.tokens)
+        else:
+            self.send_error(404)
+            return
+
+        mock.requests += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        delays = mock.token_delays()
+        try:
+            for event, last in events:
+                if not last:
+                    time.sleep(next(delays))
+                self.wfile.write(event.encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client cancelled - barge-in, a lost hedge or a missed speculation
+
+    @staticmethod
+    def _openai_events(model: str, tokens: List[str]):
+        def chunk(delta, finish_reason=None):
+            data = {
+                "id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        for index, token in enumerate(tokens):
+            yield chunk({"role": "assistant", "content": token} if index == 0 else {"content": token}), False
+        yield chunk({}, "stop") + "data: [DONE]\n\n", True
+
+    @staticmethod
+    def _anthropic_events(model: str, tokens: List[str]):
+        def completion(text, stop_reason=None):
+            data = {"type": "completion", "id": "compl_mock", "completion": text,
+                    "stop_reason": stop_reason, "model": model}
+            return f"event: completion\ndata: {json.dumps(data)}\n\n"
+
+        # Legacy completions lead with a space
+        for index, token in enumerate(tokens):
+            yield completion(" " + token if index == 0 else token), False
+        yield completion("", "stop_sequence"), True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--first-token-ms", type=float, default=400)
+    parser.add_argument("--tokens-per-s", type=float, default=30)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.first_token_ms, args.tokens_per_s, port=args.port)
+    print(f"🤖 Mock LLM server on {server.url}")
+    print(f"   OPENAI_BASE_URL={server.url}/v1  ANTHROPIC_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
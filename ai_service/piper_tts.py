@@ -0,0 +1,65 @@
+"""
+Piper TTS Engine
+Keeps a Piper voice model resident in memory and streams raw PCM per sentence
+"""
+
+import os
+import json
+import logging
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+class PiperEngine:
+    """Loads a Piper ONNX voice once and synthesizes text straight to PCM"""
+
+    sample_width = 2  # 16-bit signed little-endian
+    channels = 1
+
+    def __init__(self, model_path: str, config_path: Optional[str] = None, length_scale: float = 1.0):
+        self.model_path = model_path
+        self.config_path = config_path or f"{model_path}.json"
+        self.length_scale = length_scale
+        self.voice = None
+        self.sample_rate = self._read_sample_rate()
+
+    def _read_sample_rate(self) -> int:
+        """Read the output sample rate from the voice config"""
+        try:
+            with open(self.config_path) as f:
+                return int(json.load(f)["audio"]["sample_rate"])
+        except (OSError, KeyError, ValueError):
+            return 22050
+
+    def load(self) -> bool:
+        """Load the voice model - this is the slow part, so it happens once"""
+        if self.voice is not None:
+            return True
+        if not os.path.exists(self.model_path):
+            logger.error(f"Piper model not found: {self.model_path}")
+            return False
+
+        try:
+            from piper.voice import PiperVoice
+            self.voice = PiperVoice.load(self.model_path, config_path=self.config_path)
+            self.sample_rate = self.voice.config.sample_rate
+        except Exception as e:
+            logger.error(f"Failed to load Piper voice {self.model_path}: {e}")
+            self.voice = None
+            return False
+        return True
+
+    @property
+    def name(self) -> str:
+        """Voice name derived from the model file"""
+        return os.path.basename(self.model_path).rsplit(".onnx", 1)[0]
+
+    def synthesize(self, text: str) -> Iterator[bytes]:
+        """Yield raw PCM chunks for the text as soon as each is inferred"""
+        if self.voice is None:
+            raise RuntimeError("Piper voice is not loaded")
+        yield from self.voice.synthesize_stream_raw(
+            text,
+            length_scale=self.length_scale,
+            sentence_silence=0.0,
+        )
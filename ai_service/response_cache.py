@@ -0,0 +1,226 @@
+"""
+AI Response Cache
+SQLite-backed cache of AI answers with near-duplicate question matching
+"""
+
+import os
+import re
+import math
+import time
+import sqlite3
+import hashlib
+import datetime
+import threading
+import logging
+from collections import Counter, OrderedDict
+from typing import Dict, Any, FrozenSet, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Questions whose answer changes from day to day are only shared within the same day
+_DATED = re.compile(r"\b(today|tonight|this morning|this evening)\b")
+_PUNCTUATION = re.compile(r"[^\w\s:']")
+_NUMBERS = re.compile(r"\d+")
+# Politeness that doesn't change the question
+_FILLER = re.compile(r"^(?:(?:please|can you|could you|would you|will you|hey|ok|okay)\s+)+|\s+please$")
+# Words that can differ between two phrasings of the same question; everything else has to match.
+# Question words, pronouns, auxiliaries and modals stay meaningful - "why did Jesus die" and "how did
+# Jesus die", "pray for my mother" and "pray for your mother", "is" and "was" ask different things.
+_STOPWORDS = frozenset("""
+    a an the and or of to in on at for with about from by as it its this that these those
+    there s tell say says said saying explain bible scripture scriptures verse verses please hey ok okay some any
+""".split())
+
+class ResponseCache:
+    """Caches AI responses by normalized prompt, with TTL and LRU eviction"""
+
+    def __init__(self, db_path: str, ttl_s: float = 7 * 24 * 3600, max_entries: int = 1000,
+                 similarity: float = 0.8):
+        self.db_path = os.path.expanduser(db_path)
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.similarity = similarity
+
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+        # key -> (scope, content words, numbers, trigram vector, vector norm) for near-duplicate lookups
+        self._vectors: "OrderedDict[str, Tuple[str, FrozenSet[str], Tuple[str, ...], Counter, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self._db.commit()
+        self._load_vectors()
+
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        """Lowercase, drop punctuation (keeping verse colons), filler and extra whitespace"""
+        text = " ".join(_PUNCTUATION.sub(" ", prompt.lower()).split())
+        return _FILLER.sub("", text) or text
+
+    @staticmethod
+    def _effective_scope(scope: str, normalized: str) -> str:
+        """Narrow the scope to today for date-dependent questions"""
+        if _DATED.search(normalized):
+            return f"{scope}@{datetime.date.today().isoformat()}"
+        return scope
+
+    @staticmethod
+    def make_scope(*parts: str) -> str:
+        """Hash of everything besides the prompt that shapes the answer"""
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _key(scope: str, normalized: str) -> str:
+        return hashlib.sha256(f"{scope}\0{normalized}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _content_words(text: str) -> FrozenSet[str]:
+        return frozenset(word for word in text.replace(":", " ").split() if word not in _STOPWORDS)
+
+    @staticmethod
+    def _trigrams(text: str) -> Counter:
+        padded = f"  {text} "
+        return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+    def get(self, prompt: str, scope: str) -> Optional[str]:
+        """Return a cached response for the prompt or a near-duplicate of it"""
+        normalized = self.normalize(prompt)
+        scope = self._effective_scope(scope, normalized)
+        key = self._key(scope, normalized)
+
+        with self._lock:
+            response = self._fetch(key)
+            if response is not None:
+                self.hits += 1
+                return response
+
+            similar_key = self._find_similar(normalized, scope)
+            response = self._fetch(similar_key) if similar_key else None
+            if response is not None:
+                self.fuzzy_hits += 1
+                return response
+
+            self.misses += 1
+            return None
+
+    def put(self, prompt: str, scope: str, response: str):
+        """Store a response"""
+        normalized = self.normalize(prompt)
+        scope = self._effective_scope(scope, normalized)
+        key = self._key(scope, normalized)
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, scope, prompt, response, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, scope, normalized, response, now, now),
+            )
+            self._remember_vector(key, scope, normalized)
+            self._evict(now)
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics"""
+        with self._lock:
+            lookups = self.hits + self.fuzzy_hits + self.misses
+            return {
+                "hits": self.hits,
+                "fuzzy_hits": self.fuzzy_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.fuzzy_hits) / lookups, 3) if lookups else 0.0,
+                "entries": len(self._vectors),
+            }
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._vectors.clear()
+
+    def _fetch(self, key: str) -> Optional[str]:
+        """Read a live entry and bump its LRU position"""
+        row = self._db.execute(
+            "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self._vectors.pop(key, None)
+            return None
+
+        response, created_at = row
+        now = time.time()
+        if now - created_at > self.ttl_s:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+            self._vectors.pop(key, None)
+            return None
+
+        self._db.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        self._db.commit()
+        if key in self._vectors:
+            self._vectors.move_to_end(key)
+        return response
+
+    def _find_similar(self, normalized: str, scope: str) -> Optional[str]:
+        """Key of the most similar cached prompt above the similarity threshold"""
+        vector = self._trigrams(normalized)
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        if not norm:
+            return None
+
+        # "about love" and "about lust", or "John 3:16" and "John 3:17", look alike but are different
+        # questions - only rephrasings with exactly the same content words are scored at all
+        words = self._content_words(normalized)
+        numbers = tuple(_NUMBERS.findall(normalized))
+        best_key, best_score = None, self.similarity
+        for key, (entry_scope, entry_words, entry_numbers, entry_vector, entry_norm) in self._vectors.items():
+            if entry_scope != scope or entry_words != words or entry_numbers != numbers:
+                continue
+            dot = sum(count * entry_vector[gram] for gram, count in vector.items() if gram in entry_vector)
+            score = dot / (norm * entry_norm)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def _remember_vector(self, key: str, scope: str, normalized: str):
+        vector = self._trigrams(normalized)
+        numbers = tuple(_NUMBERS.findall(normalized))
+        self._vectors[key] = (scope, self._content_words(normalized), numbers, vector,
+                              math.sqrt(sum(v * v for v in vector.values())))
+        self._vectors.move_to_end(key)
+
+    def _load_vectors(self):
+        """Rebuild the similarity index from the database in LRU order"""
+        cutoff = time.time() - self.ttl_s
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+        self._db.commit()
+        for key, scope, prompt in self._db.execute(
+            "SELECT key, scope, prompt FROM responses ORDER BY last_used"
+        ):
+            self._remember_vector(key, scope, prompt)
+
+    def _evict(self, now: float):
+        """Drop expired entries and the least recently used beyond the size limit"""
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_s,))
+        while len(self._vectors) > self.max_entries:
+            key, _ = self._vectors.popitem(last=False)
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Response cache check
+Asks a scratch cache rephrasings that must share an answer and near-misses that must not
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service.response_cache import ResponseCache
+
+SCOPE = "check"
+
+# (cached question, question asked afterwards)
+SAME_ANSWER = [
+    ("What does the Bible say about love?", "what does the bible say about love"),
+    ("What does the Bible say about love?", "Hey, what does the Bible say about love?"),
+    ("What does the Bible say about love?", "What does the Bible say on love?"),
+    ("Can you pray for my mother?", "Pray for my mother please"),
+]
+DIFFERENT_ANSWER = [
+    ("What does the Bible say about love?", "What does the Bible say about hate?"),
+    ("What does the Bible say about love?", "What does the Bible say about lust?"),
+    ("Pray for my mother", "Pray for my father"),
+    ("Pray for my mother", "Pray for my brother"),
+    ("Why did Jesus die?", "How did Jesus die?"),
+    ("Explain John 3:16", "Explain John 3:17"),
+    ("Does God love me?", "Does God love you?"),
+    ("Pray for my mother", "Pray for your mother"),
+    ("Was Jesus married?", "Is Jesus married?"),
+    ("Should I forgive him?", "Must I forgive him?"),
+]
+
+def check_pairs():
+    results, failures = [], []
+    with tempfile.TemporaryDirectory() as workdir:
+        for index, (cached, asked) in enumerate(SAME_ANSWER + DIFFERENT_ANSWER):
+            cache = ResponseCache(os.path.join(workdir, f"{index}.db"))
+            cache.put(cached, SCOPE, f"answer to: {cached}")
+            hit = cache.get(asked, SCOPE) is not None
+            expected = index < len(SAME_ANSWER)
+            results.append({"cached": cached, "asked": asked, "hit": hit, "expected_hit": expected})
+            if hit != expected:
+                failures.append(f"'{asked}' after '{cached}': {'hit' if hit else 'missed'}")
+    return results, failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results, failures = check_pairs()
+    if args.json:
+        print(json.dumps({"pairs": results, "failures": failures}, indent=2))
+    else:
+        print("🗂️  Response cache near-duplicate check")
+        print("=" * 60)
+        for r in results:
+            mark = "✅" if r["hit"] == r["expected_hit"] else "❌"
+            print(f"{mark} {'hit ' if r['hit'] else 'miss'}  {r['asked']}  (cached: {r['cached']})")
+        print("✅ Every pair behaved as expected" if not failures else "\n".join(f"❌ {f}" for f in failures))
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Scripture lookup benchmark
+Compares local index lookups with the LLM path for latency and memory footprint
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service.scripture_index import ScriptureIndex
+from ai_service.intent_router import IntentRouter
+
+DEFAULT_QUERIES = [
+    "Read John 3:16",
+    "Romans eight twenty eight",
+    "Psalm twenty three",
+    "First Corinthians thirteen four to seven",
+    "Philippians 4:13",
+    "Give me a verse about fear",
+    "Bible verse about forgiveness",
+    "Scripture on hope",
+]
+
+def percentile(values, fraction):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(latencies_ms):
+    return {
+        "p50_ms": round(percentile(latencies_ms, 0.5), 3),
+        "p95_ms": round(percentile(latencies_ms, 0.95), 3),
+        "mean_ms": round(statistics.mean(latencies_ms), 3),
+    }
+
+def benchmark_local(index_dir, queries, repeat):
+    """Time the intent router against the local index"""
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    start = time.perf_counter()
+    router = IntentRouter(ScriptureIndex(index_dir))
+    load_ms = (time.perf_counter() - start) * 1000
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    answered = 0
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            answer = router.route(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+            answered += answer is not None
+
+    index_bytes = sum(os.path.getsize(os.path.join(index_dir, name)) for name in os.listdir(index_dir))
+    return {
+        "path": "local",
+        "load_ms": round(load_ms, 1),
+        "answered": answered // repeat,
+        "queries": len(queries),
+        "python_heap_kb": heap_peak // 1024,
+        "rss_growth_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before,
+        "index_on_disk_kb": index_bytes // 1024,
+        **summarize(latencies),
+    }
+
+def benchmark_llm(queries):
+    """Time the same queries through the AI provider with local answers disabled"""
+    from dotenv import load_dotenv
+    from ai_service.ai_integration import AIIntegration
+
+    load_dotenv()
+    # Every query goes to the provider, and none of them end up in the user's cache, history or session
+    os.environ.update({"RESPONSE_CACHE": "0", "CONVERSATION_HISTORY": "0", "SESSIONS": "0"})
+    ai = AIIntegration()
+    ai.intent_router = None
+    if not any(ai.get_available_providers().values()):
+        return {"path": "llm", "error": "no AI provider configured"}
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        ai.send_message_to_ai(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"path": "llm", "provider": ai.current_provider, "queries": len(queries), **summarize(latencies)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--index", default=os.getenv("SCRIPTURE_INDEX_DIR", "scripture_index"))
+    parser.add_argument("--repeat", type=int, default=200, help="passes over the queries for the local path")
+    parser.add_argument("--llm", action="store_true", help="also time the LLM path (uses API credits)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    if not ScriptureIndex.exists(args.index):
+        raise SystemExit(f"No scripture index in {args.index} - build one with "
+                         f"python -m ai_service.scripture_index build <bible.txt> {args.index}")
+
+    results = [benchmark_local(args.index, DEFAULT_QUERIES, args.repeat)]
+    if args.llm:
+        results.append(benchmark_llm(DEFAULT_QUERIES))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("📖 Scripture lookup benchmark")
+    print("=" * 50)
+    for r in results:
+        if "error" in r:
+            print(f"{r['path']:<6} ❌ {r['error']}")
+            continue
+        print(f"{r['path']:<6} p50 {r['p50_ms']:>9.3f} ms   p95 {r['p95_ms']:>9.3f} ms")
+    local = results[0]
+    print(f"\n💾 Local index: {local['index_on_disk_kb']} KB on disk (memory-mapped), "
+          f"{local['python_heap_kb']} KB Python heap, loaded in {local['load_ms']} ms")
+    print(f"✅ Answered locally: {local['answered']}/{local['queries']} queries")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Scripture Index
+Local Bible text store with a memory-mapped verse index and keyword search
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import mmap
+import struct
+import logging
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BOOKS = (
+    "Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy", "Joshua", "Judges", "Ruth",
+    "1 Samuel", "2 Samuel", "1 Kings", "2 Kings", "1 Chronicles", "2 Chronicles", "Ezra",
+    "Nehemiah", "Esther", "Job", "Psalms", "Proverbs", "Ecclesiastes", "Song of Solomon",
+    "Isaiah", "Jeremiah", "Lamentations", "Ezekiel", "Daniel", "Hosea", "Joel", "Amos",
+    "Obadiah", "Jonah", "Micah", "Nahum", "Habakkuk", "Zephaniah", "Haggai", "Zechariah",
+    "Malachi", "Matthew", "Mark", "Luke", "John", "Acts", "Romans", "1 Corinthians",
+    "2 Corinthians", "Galatians", "Ephesians", "Philippians", "Colossians", "1 Thessalonians",
+    "2 Thessalonians", "1 Timothy", "2 Timothy", "Titus", "Philemon", "Hebrews", "James",
+    "1 Peter", "2 Peter", "1 John", "2 John", "3 John", "Jude", "Revelation",
+)
+
+# Abbreviations and spoken forms beyond the canonical names
+_EXTRA_ALIASES = {
+    "gen": "Genesis", "ex": "Exodus", "exod": "Exodus", "lev": "Leviticus", "num": "Numbers",
+    "deut": "Deuteronomy", "josh": "Joshua", "judg": "Judges", "neh": "Nehemiah",
+    "esth": "Esther", "ps": "Psalms", "psalm": "Psalms", "psa": "Psalms", "prov": "Proverbs",
+    "eccl": "Ecclesiastes", "song of songs": "Song of Solomon", "song": "Song of Solomon",
+    "isa": "Isaiah", "jer": "Jeremiah", "lam": "Lamentations", "ezek": "Ezekiel",
+    "dan": "Daniel", "hos": "Hosea", "obad": "Obadiah", "mic": "Micah", "hab": "Habakkuk",
+    "zeph": "Zephaniah", "hag": "Haggai", "zech": "Zechariah", "mal": "Malachi",
+    "matt": "Matthew", "mt": "Matthew", "mk": "Mark", "lk": "Luke", "jn": "John",
+    "rom": "Romans", "gal": "Galatians", "eph": "Ephesians", "phil": "Philippians",
+    "col": "Colossians", "philem": "Philemon", "heb": "Hebrews", "jas": "James",
+    "rev": "Revelation", "revelations": "Revelation",
+}
+
+_ORDINALS = {"1": ("first", "1st", "i"), "2": ("second", "2nd", "ii"), "3": ("third", "3rd", "iii")}
+
+# Fixed-size verse record: book, chapter, verse, byte offset and length in verses.txt
+_RECORD = struct.Struct("<BHHII")
+
+_STOPWORDS = {
+    "a", "about", "an", "and", "any", "are", "be", "bible", "can", "do", "does", "for", "from",
+    "give", "have", "i", "in", "is", "it", "me", "my", "of", "on", "or", "read", "say", "scripture",
+    "some", "tell", "that", "the", "to", "verse", "verses", "was", "what", "when", "with", "you",
+}
+_WORD = re.compile(r"[a-z']+")
+
+def book_aliases() -> Dict[str, str]:
+    """Every lowercase way of naming a book, mapped to its canonical name"""
+    aliases = {}
+    for book in BOOKS:
+        name = book.lower()
+        aliases[name] = book
+        aliases[name.replace(" ", "")] = book
+        if name[0] in _ORDINALS:
+            for ordinal in _ORDINALS[name[0]]:
+                aliases[f"{ordinal} {name[2:]}"] = book
+    for alias, book in _EXTRA_ALIASES.items():
+        aliases[alias] = book
+    return aliases
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words for the inverted index"""
+    return [word.strip("'") for word in _WORD.findall(text.lower()) if word.strip("'")]
+
+def build_index(source_path: str, index_dir: str) -> int:
+    """Build the on-disk index from a 'Book C:V text' per line Bible file"""
+    aliases = book_aliases()
+    line_pattern = re.compile(r"^\s*((?:[1-3]\s*)?[A-Za-z][A-Za-z ]*?)\.?\s+(\d+):(\d+)\s+(.+?)\s*$")
+
+    verses = []
+    skipped = 0
+    with open(source_path, encoding="utf-8-sig") as f:
+        for line in f:
+            match = line_pattern.match(line)
+            book = aliases.get(match.group(1).lower()) if match else None
+            if book is None:
+                skipped += 1 if line.strip() else 0
+                continue
+            verses.append((BOOKS.index(book), int(match.group(2)), int(match.group(3)), match.group(4)))
+
+    if skipped:
+        logger.warning(f"Skipped {skipped} unparseable lines in {source_path}")
+    verses.sort(key=lambda v: v[:3])
+
+    os.makedirs(index_dir, exist_ok=True)
+    postings: Dict[str, array] = defaultdict(lambda: array("I"))
+
+    with open(os.path.join(index_dir, "verses.txt"), "wb") as text_file, \
+            open(os.path.join(index_dir, "verses.idx"), "wb") as index_file:
+        offset = 0
+        for ordinal, (book_id, chapter, verse, text) in enumerate(verses):
+            data = text.encode("utf-8") + b"\n"
+            text_file.write(data)
+            index_file.write(_RECORD.pack(book_id, chapter, verse, offset, len(data) - 1))
+            offset += len(data)
+            for term in set(tokenize(text)):
+                postings[term].append(ordinal)
+
+    # Postings are stored back to back; the term dictionary points into them
+    terms = {}
+    with open(os.path.join(index_dir, "postings.bin"), "wb") as postings_file:
+        position = 0
+        for term in sorted(postings):
+            ordinals = postings[term]
+            ordinals.tofile(postings_file)
+            terms[term] = (position, len(ordinals))
+            position += len(ordinals)
+
+    with open(os.path.join(index_dir, "terms.json"), "w") as f:
+        json.dump(terms, f, separators=(",", ":"))
+    return len(verses)
+
+class ScriptureIndex:
+    """Memory-mapped verse lookup and keyword search over a built index"""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._files = []
+        self._text = self._map("verses.txt")
+        self._records = self._map("verses.idx")
+        self._postings = self._map("postings.bin")
+        self.verse_count = len(self._records) // _RECORD.size
+
+        with open(os.path.join(index_dir, "terms.json")) as f:
+            self._terms: Dict[str, List[int]] = json.load(f)
+
+    def _map(self, name: str) -> mmap.mmap:
+        f = open(os.path.join(self.index_dir, name), "rb")
+        self._files.append(f)
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def exists(cls, index_dir: str) -> bool:
+        """Whether a built index is present"""
+        return all(os.path.exists(os.path.join(index_dir, name))
+                   for name in ("verses.txt", "verses.idx", "postings.bin", "terms.json"))
+
+    def _record(self, ordinal: int) -> Tuple[int, int, int, int, int]:
+        return _RECORD.unpack_from(self._records, ordinal * _RECORD.size)
+
+    def _text_at(self, offset: int, length: int) -> str:
+        return self._text[offset:offset + length].decode("utf-8")
+
+    def _reference(self, book_id: int, chapter: int, verse: int) -> str:
+        return f"{BOOKS[book_id]} {chapter}:{verse}"
+
+    def _lower_bound(self, key: Tuple[int, int, int]) -> int:
+        """First record at or after (book, chapter, verse)"""
+        low, high = 0, self.verse_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._record(middle)[:3] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, book: str, chapter: int, verse: Optional[int] = None,
+               end_verse: Optional[int] = None, limit: int = 20) -> List[Tuple[str, str]]:
+        """Verses for a reference; a whole chapter when no verse is given"""
+        book_id = BOOKS.index(book)
+        first = verse or 1
+        last = end_verse or verse
+
+        results = []
+        ordinal = self._lower_bound((book_id, chapter, first))
+        while ordinal < self.verse_count and len(results) < limit:
+            record_book, record_chapter, record_verse, offset, length = self._record(ordinal)
+            if (record_book, record_chapter) != (book_id, chapter) or (last and record_verse > last):
+                break
+            results.append((self._reference(book_id, chapter, record_verse), self._text_at(offset, length)))
+            ordinal += 1
+        return results
+
+    def search(self, query: str, limit: int = 3) -> List[Tuple[str, str]]:
+        """Verses best matching the keywords, ranked by idf and verse brevity"""
+        terms = [term for term in tokenize(query) if term not in _STOPWORDS and term in self._terms]
+        if not terms:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(terms):
+            position, count = self._terms[term]
+            idf = math.log(self.verse_count / count)
+            postings = array("I")
+            postings.frombytes(self._postings[position * 4:(position + count) * 4])
+            for ordinal in postings:
+                scores[ordinal] += idf
+
+        def rank(ordinal: int):
+            length = self._record(ordinal)[4]
+            return (-scores[ordinal], length)
+
+        results = []
+        for ordinal in sorted(scores, key=rank)[:limit]:
+            book_id, chapter, verse, offset, length = self._record(ordinal)
+            results.append((self._reference(book_id, chapter, verse), self._text_at(offset, length)))
+        return results
+
+    def close(self):
+        """Release the memory maps"""
+        for mapped in (self._text, self._records, self._postings):
+            mapped.close()
+        for f in self._files:
+            f.close()
+
+def main():
+    if len(sys.argv) != 4 or sys.argv[1] != "build":
+        print("Usage: python -m ai_service.scripture_index build <bible.txt> <index_dir>")
+        sys.exit(1)
+    count = build_index(sys.argv[2], sys.argv[3])
+    print(f"✅ Indexed {count} verses into {sys.argv[3]}")
+
+if __name__ == "__main__":
+    main()
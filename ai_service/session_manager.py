@@ -0,0 +1,356 @@
+"""
+Session Manager
+Who is talking, with their preferences and recent exchanges - active users in memory, the rest in SQLite
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from ai_service.llm_client import PROVIDERS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER = "default"
+
+# max_tokens multiplier of AI_MAX_TOKENS and the instruction added to the system prompt
+RESPONSE_LENGTHS = {
+    "short": (0.5, "Keep answers to one or two sentences."),
+    "medium": (1.0, ""),
+    "long": (2.0, "You may take several sentences when the question deserves it."),
+}
+
+class Preferences:
+    """How one user likes to be answered"""
+
+    __slots__ = ("voice", "translation", "response_length", "provider", "instructions")
+    FIELDS = ("voice", "translation", "response_length", "provider")
+
+    def __init__(self, voice: Optional[str] = None, translation: Optional[str] = None,
+                 response_length: str = "medium", provider: Optional[str] = None):
+        self.voice = voice
+        self.translation = translation
+        self.response_length = response_length
+        self.provider = provider
+        self.instructions = ""
+        self._compile()
+
+    def update(self, changes: Dict[str, Any]):
+        """Apply a partial update; None or "" resets a field to the default"""
+        unknown = set(changes) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown preferences: {', '.join(sorted(unknown))}")
+        length = changes.get("response_length", self.response_length) or "medium"
+        if length not in RESPONSE_LENGTHS:
+            raise ValueError(f"response_length must be one of {', '.join(RESPONSE_LENGTHS)}")
+        provider = changes.get("provider", self.provider) or None
+        if provider is not None and provider not in PROVIDERS:
+            raise ValueError(f"Unknown AI provider: {provider}")
+
+        self.voice = changes.get("voice", self.voice) or None
+        self.translation = changes.get("translation", self.translation) or None
+        self.response_length = length
+        self.provider = provider
+        self._compile()
+
+    def _compile(self):
+        """Build the system prompt addition once, rather than on every turn"""
+        parts = []
+        if self.translation:
+            parts.append(f"Quote scripture from the {self.translation} translation.")
+        parts.append(RESPONSE_LENGTHS[self.response_length][1])
+        self.instructions = " ".join(part for part in parts if part)
+
+    def token_scale(self) -> float:
+        return RESPONSE_LENGTHS[self.response_length][0]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Preferences":
+        preferences = cls()
+        try:
+            preferences.update({k: v for k, v in data.items() if k in cls.FIELDS})
+        except ValueError as e:
+            logger.warning(f"Ignoring stored preferences: {e}")
+        return preferences
+
+class Session:
+    """One user's profile and their last few exchanges"""
+
+    __slots__ = ("user_id", "name", "speaker_id", "preferences", "history", "last_active", "dirty")
+
+    def __init__(self, user_id: str, name: Optional[str] = None, speaker_id: Optional[str] = None,
+                 preferences: Optional[Preferences] = None, history: Tuple = (), history_turns: int = 4,
+                 last_active: float = 0.0):
+        self.user_id = user_id
+        self.name = name
+        self.speaker_id = speaker_id
+        self.preferences = preferences or Preferences()
+        # (user message, response) pairs - tuples of two strings, nothing more
+        self.history: Deque[Tuple[str, str]] = deque(history, maxlen=history_turns)
+        self.last_active = last_active
+        self.dirty = False
+
+    def remember(self, message: str, response: str):
+        self.history.append((message, response))
+        self.last_active = time.time()
+        self.dirty = True
+
+    def is_follow_up(self, now: float, within_s: float = 120.0) -> bool:
+        """Whether the next message may depend on the last exchange"""
+        return bool(self.history) and now - self.last_active < within_s
+
+    def messages(self) -> List[Dict[str, str]]:
+        """The history window as chat messages"""
+        messages = []
+        for message, response in self.history:
+            messages.append({"role": "user", "content": message})
+            messages.append({"role": "assistant", "content": response})
+        return messages
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the session and everything it holds"""
+        size = sys.getsizeof(self) + sys.getsizeof(self.preferences) + sys.getsizeof(self.history)
+        for exchange in self.history:
+            size += sys.getsizeof(exchange) + sum(sys.getsizeof(text) for text in exchange)
+        return size
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "name": self.name,
+            "speaker_id": self.speaker_id,
+            "preferences": self.preferences.as_dict(),
+            "history_turns": len(self.history),
+            "last_active": round(self.last_active) if self.last_active else None,
+        }
+
+class SessionManager:
+    """Keeps the most recent users in an in-memory LRU so switching between them never touches the disk"""
+
+    def __init__(self, db_path: str, max_active: int = 8, history_turns: int = 4, flush_s: float = 60.0):
+        self.db_path = os.path.expanduser(db_path)
+        self.max_active = max(1, max_active)
+        self.history_turns = history_turns
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[Session], None]] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.switches = 0
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                user_id TEXT PRIMARY KEY,
+                name TEXT,
+                speaker_id TEXT,
+                preferences TEXT NOT NULL,
+                history TEXT NOT NULL,
+                last_active REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_speaker ON sessions(speaker_id)")
+        self._db.commit()
+
+        self.active = self.get(DEFAULT_USER)
+        self._closed = threading.Event()
+        # History changes on every turn; it reaches the disk in batches, off the turn path
+        self._flusher = threading.Thread(target=self._flush_loop, args=(flush_s,), name="session-flush", daemon=True)
+        self._flusher.start()
+
+    def add_listener(self, callback: Callable[[Session], None]):
+        """Called with the active session whenever it changes or its preferences do"""
+        self._listeners.append(callback)
+
+    def get(self, user_id: str) -> Session:
+        """A user's session, loading or creating it if it isn't active"""
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is not None:
+                self._sessions.move_to_end(user_id)
+                self.hits += 1
+                return session
+            self.misses += 1
+            session = self._load(user_id) or Session(user_id, history_turns=self.history_turns)
+            self._sessions[user_id] = session
+            while len(self._sessions) > self.max_active:
+                self._evict()
+            return session
+
+    def switch(self, user_id: str) -> Session:
+        """Make user_id the one being answered"""
+        user_id = user_id.strip()
+        if not user_id:
+            raise ValueError("user_id is required")
+        with self._lock:
+            session = self.get(user_id)
+            changed = session is not self.active
+            self.active = session
+            if changed:
+                self.switches += 1
+        if changed:
+            logger.info(f"Now talking with {session.name or session.user_id}")
+            self._notify(session)
+        return session
+
+    def identify_speaker(self, speaker_id: str) -> Optional[Session]:
+        """Switch to the user enrolled with this speaker label, if there is one"""
+        with self._lock:
+            for session in self._sessions.values():
+                if session.speaker_id == speaker_id:
+                    return self.switch(session.user_id)
+            row = self._db.execute(
+                "SELECT user_id FROM sessions WHERE speaker_id = ? LIMIT 1", (speaker_id,)
+            ).fetchone()
+        return self.switch(row[0]) if row else None
+
+    def update(self, user_id: str, name: Optional[str] = None, speaker_id: Optional[str] = None,
+               preferences: Optional[Dict[str, Any]] = None) -> Session:
+        """Change a user's profile; saved right away, since it happens rarely"""
+        with self._lock:
+            session = self.get(user_id)
+            if preferences:
+                session.preferences.update(preferences)
+            if name is not None:
+                session.name = name or None
+            if speaker_id is not None:
+                session.speaker_id = speaker_id or None
+            self._save([session])
+            is_active = session is self.active
+        if is_active:
+            self._notify(session)
+        return session
+
+    def record(self, message: str, response: str):
+        """Add a finished exchange to the active user's history window"""
+        with self._lock:
+            self.active.remember(message, response)
+
+    def clear_history(self):
+        """Forget the active user's recent exchanges, keeping their profile"""
+        with self._lock:
+            self.active.history.clear()
+            self.active.dirty = True
+
+    def users(self) -> List[Dict[str, Any]]:
+        """Every known user, active ones from memory"""
+        with self._lock:
+            users = {user_id: session.as_dict() for user_id, session in self._sessions.items()}
+            rows = self._db.execute(
+                "SELECT user_id, name, speaker_id, preferences, last_active FROM sessions"
+            ).fetchall()
+        for user_id, name, speaker_id, preferences, last_active in rows:
+            users.setdefault(user_id, {
+                "user_id": user_id,
+                "name": name,
+                "speaker_id": speaker_id,
+                "preferences": json.loads(preferences),
+                "last_active": round(last_active) if last_active else None,
+            })
+        return sorted(users.values(), key=lambda user: user["last_active"] or 0, reverse=True)
+
+    def flush(self):
+        """Write every changed active session to the database"""
+        with self._lock:
+            dirty = [session for session in self._sessions.values() if session.dirty]
+            if dirty:
+                self._save(dirty)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            active = self.active
+        lookups = self.hits + self.misses
+        return {
+            "active_user": active.user_id,
+            "active_name": active.name,
+            "in_memory": len(sessions),
+            "max_in_memory": self.max_active,
+            "memory_bytes": sum(session.memory_bytes() for session in sessions),
+            "switches": self.switches,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "misses": self.misses,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        self._closed.set()
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+    def _notify(self, session: Session):
+        for callback in self._listeners:
+            try:
+                callback(session)
+            except Exception as e:
+                logger.warning(f"Session listener failed: {e}")
+
+    def _flush_loop(self, interval_s: float):
+        while not self._closed.wait(interval_s):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Saving sessions failed: {e}")
+
+    def _load(self, user_id: str) -> Optional[Session]:
+        """Called with the lock held"""
+        row = self._db.execute(
+            "SELECT name, speaker_id, preferences, history, last_active FROM sessions WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        self.loads += 1
+        name, speaker_id, preferences, history, last_active = row
+        return Session(
+            user_id, name, speaker_id, Preferences.from_dict(json.loads(preferences)),
+            history=[tuple(exchange) for exchange in json.loads(history)],
+            history_turns=self.history_turns, last_active=last_active,
+        )
+
+    def _evict(self):
+        """Called with the lock held: drop the least recently used session, saving it first"""
+        for user_id, session in self._sessions.items():
+            # The active user is never the one to go, however long they have been quiet
+            if session is not getattr(self, "active", None):
+                break
+        else:
+            return
+        if session.dirty:
+            self._save([session])
+        del self._sessions[user_id]
+        self.evictions += 1
+
+    def _save(self, sessions: List[Session]):
+        """Called with the lock held"""
+        self._db.executemany(
+            "INSERT OR REPLACE INTO sessions (user_id, name, speaker_id, preferences, history, last_active) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (session.user_id, session.name, session.speaker_id, json.dumps(session.preferences.as_dict()),
+                 json.dumps(list(session.history)), session.last_active)
+                for session in sessions
+            ],
+        )
+        self._db.commit()
+        for session in sessions:
+            session.dirty = False
@@ -3,26 +3,26 @@
 Simple Alexa-style Loading Sound Test
 """
 
+import os
+import sys
 import subprocess
 import time
 import threading
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service import audio_dsp
+
 def play_loading_sound():
     """Play a simple loading sound"""
     try:
         # Create a simple beep sound (sine wave)
-        import math
         sample_rate = 22050
         duration = 0.5  # 0.5 seconds
         frequency = 440  # 440 Hz (A note - softer)
         
         # Generate sine wave
-        samples = []
-        for i in range(int(sample_rate * duration)):
-            sample = int(16383 * math.sin(2 * math.pi * frequency * i / sample_rate))  # Lower volume
-            samples.extend([sample & 0xFF, (sample >> 8) & 0xFF])
-        
-        audio_data = bytes(samples)
+        audio_data = audio_dsp.tone(frequency, duration, sample_rate, amplitude=0.5).tobytes()  # Lower volume
         
         # Play through default audio device
         subprocess.run(['aplay', '-f', 'S16_LE', '-r', str(sample_rate), '-c', '1'], 
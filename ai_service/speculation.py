@@ -0,0 +1,192 @@
+"""
+Speculative Prefetch
+Starts the LLM request from a settled partial transcript before endpointing fires
+"""
+
+import re
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from ai_service import instrumentation
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+_NOT_WORD = re.compile(r"[^\w']+")
+
+def normalize(text: str) -> str:
+    """Lowercase words only, so punctuation, case and spacing never cause a miss"""
+    return " ".join(_NOT_WORD.sub(" ", text.lower()).split())
+
+class Speculation:
+    """One LLM request sent from a partial transcript, buffered until the turn claims it"""
+
+    poll_s = 0.05
+
+    def __init__(self, text: str, start_stream: Callable[[str, threading.Event], Iterator[str]]):
+        self.text = text
+        self.key = normalize(text)
+        self.launched_at = time.monotonic()
+        self.first_token_at: Optional[float] = None
+        self.cancelled = threading.Event()
+        self._start_stream = start_stream
+        self._chunks: "queue.Queue" = queue.Queue()
+
+    def start(self):
+        threading.Thread(target=self._run, name="speculation", daemon=True).start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def saved_ms(self, claimed_at: float) -> float:
+        """Head start over a request sent at claimed_at: up to the first token, or all of it if none has come yet"""
+        ready_at = min(claimed_at, self.first_token_at or claimed_at)
+        return (ready_at - self.launched_at) * 1000
+
+    def stream(self, cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        """The buffered response, then the rest as it arrives"""
+        try:
+            while True:
+                try:
+                    item = self._chunks.get(timeout=self.poll_s)
+                except queue.Empty:
+                    if cancel is not None and cancel.is_set():
+                        return
+                    continue
+                if cancel is not None and cancel.is_set():
+                    return
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Leaving early (barge-in) cancels the request, as with a normal stream
+            self.cancelled.set()
+
+    def _run(self):
+        try:
+            for chunk in self._start_stream(self.text, self.cancelled):
+                if self.first_token_at is None:
+                    self.first_token_at = time.monotonic()
+                self._chunks.put(chunk)
+        except Exception as e:
+            self._chunks.put(e)
+        finally:
+            self._chunks.put(_END)
+
+class SpeculativePrefetch:
+    """Sends the question once its partial transcript has stopped changing, and keeps or drops it at endpointing"""
+
+    def __init__(self, start_stream: Callable[[str, threading.Event], Iterator[str]],
+                 stable_ms: float = 300, min_words: int = 3, max_attempts: int = 2):
+        self.start_stream = start_stream
+        self.stable_ms = stable_ms
+        self.min_words = min_words
+        # Every abandoned attempt is a paid request, so a rambling question gets only a few
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self._armed = False
+        self._attempts = 0
+        self._partial_key = ""
+        self._partial_since = 0.0
+        self._current: Optional[Speculation] = None
+
+        self.turns = 0
+        self.launched = 0
+        self.hits = 0
+        self.misses = 0
+        self.abandoned = 0
+        self.saved_ms_total = 0.0
+        self.last: Optional[Dict[str, Any]] = None
+
+    def begin(self):
+        """A question is about to be recorded"""
+        with self._lock:
+            self._drop()
+            self._armed = True
+            self._attempts = 0
+            self._partial_key = ""
+
+    def cancel(self):
+        """No question follows - drop anything in flight"""
+        with self._lock:
+            self._drop()
+            self._armed = False
+
+    def observe_partial(self, text: str):
+        """Called with every partial transcript; speculates once it has held still for stable_ms"""
+        now = time.monotonic()
+        key = normalize(text)
+        with self._lock:
+            if not self._armed:
+                return
+            if key != self._partial_key:
+                self._partial_key = key
+                self._partial_since = now
+                # The user kept talking - whatever was sent is already the wrong question
+                self._drop()
+                return
+            if (self._current is None and self._attempts < self.max_attempts
+                    and len(key.split()) >= self.min_words
+                    and (now - self._partial_since) * 1000 >= self.stable_ms):
+                self._launch(text)
+
+    def resolve(self, final_text: str) -> Optional[Speculation]:
+        """At endpointing: the in-flight request if it asked the same question, otherwise None"""
+        now = time.monotonic()
+        with self._lock:
+            speculation, self._current = self._current, None
+            armed, self._armed = self._armed, False
+            if not armed:
+                self.last = None
+                return None
+            self.turns += 1
+            if speculation is None:
+                self.last = {"speculated": False, "hit": False}
+                return None
+            if speculation.key != normalize(final_text):
+                speculation.cancel()
+                self.misses += 1
+                self.last = {"speculated": True, "hit": False}
+                logger.debug(f"Speculation missed: '{speculation.text}' vs '{final_text}'")
+                return None
+            saved_ms = speculation.saved_ms(now)
+            self.hits += 1
+            self.saved_ms_total += saved_ms
+            self.last = {"speculated": True, "hit": True, "saved_ms": round(saved_ms)}
+        instrumentation.observe("speculation_saved", saved_ms)
+        return speculation
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and latency saved, per turn and per hit"""
+        turns, hits = self.turns, self.hits
+        return {
+            "turns": turns,
+            "launched": self.launched,
+            "hits": hits,
+            "misses": self.misses,
+            "abandoned": self.abandoned,
+            "hit_rate": round(hits / turns, 3) if turns else None,
+            "avg_saved_ms": round(self.saved_ms_total / hits, 1) if hits else None,
+            "saved_ms_per_turn": round(self.saved_ms_total / turns, 1) if turns else None,
+            "last": self.last,
+        }
+
+    def _launch(self, text: str):
+        """Called with the lock held"""
+        self._current = Speculation(text, self.start_stream)
+        self._attempts += 1
+        self.launched += 1
+        self._current.start()
+
+    def _drop(self):
+        """Called with the lock held"""
+        if self._current is not None:
+            self._current.cancel()
+            self._current = None
+            self.abandoned += 1
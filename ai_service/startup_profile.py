@@ -0,0 +1,181 @@
+"""
+Startup Profile
+Timeline of startup stages and module imports, printed by main.py --profile-startup
+"""
+
+import sys
+import time
+import threading
+import importlib.abc
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+_ORIGIN = time.perf_counter()
+
+def _now() -> float:
+    return time.perf_counter() - _ORIGIN
+
+class _TimedLoader:
+    """Wraps a module's loader to time creating and executing it"""
+
+    def __init__(self, loader, profiler: "ImportProfiler", name: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def create_module(self, spec):
+        # Extension modules do their work here, so timing starts now
+        self._profiler._enter()
+        try:
+            return self._loader.create_module(spec)
+        except BaseException:
+            self._profiler._leave(self._name)
+            raise
+
+    def exec_module(self, module):
+        # Put the real loader back so nothing after import ever sees this wrapper
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(self._name)
+
+    def __getattr__(self, attribute):
+        return getattr(self._loader, attribute)
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Records how long every module takes to import, including and excluding its own imports"""
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self._local = threading.local()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        if spec.loader is None or spec.origin in ("built-in", "frozen") or not hasattr(spec.loader, "exec_module"):
+            return spec
+        spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self):
+        # [start, time spent in nested imports]
+        self._stack().append([_now(), 0.0])
+
+    def _leave(self, name: str):
+        stack = self._stack()
+        start, nested = stack.pop()
+        total = _now() - start
+        if stack:
+            stack[-1][1] += total
+        self.records.append({
+            "module": name,
+            "start_s": round(start, 4),
+            "total_ms": round(total * 1000, 2),
+            "self_ms": round((total - nested) * 1000, 2),
+            "depth": len(stack),
+            "thread": threading.current_thread().name,
+        })
+
+class StartupTimeline:
+    """Named startup stages and milestones, timed from when this module was imported"""
+
+    def __init__(self):
+        self.stages: List[Dict[str, Any]] = []
+        self.marks: Dict[str, float] = {}
+        self.imports: Optional[ImportProfiler] = None
+        self._lock = threading.Lock()
+
+    def profile_imports(self):
+        """Start timing every import from here on"""
+        self.imports = ImportProfiler()
+        self.imports.install()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = _now()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            with self._lock:
+                self.stages.append({
+                    "stage": name,
+                    "start_s": round(start, 3),
+                    "duration_ms": round((_now() - start) * 1000, 1),
+                    "thread": threading.current_thread().name,
+                    "ok": ok,
+                })
+
+    def mark(self, name: str):
+        """A milestone such as 'listening' or 'ready'"""
+        self.marks.setdefault(name, round(_now(), 3))
+
+    def as_dict(self, top_imports: int = 15) -> Dict[str, Any]:
+        report = {"marks": dict(self.marks), "stages": sorted(self.stages, key=lambda s: s["start_s"])}
+        if self.imports is not None:
+            records = self.imports.records
+            by_package = defaultdict(float)
+            for record in records:
+                by_package[record["module"].split(".")[0]] += record["self_ms"]
+            report["imports"] = {
+                "modules": len(records),
+                "slowest": sorted((r for r in records if r["depth"] == 0),
+                                  key=lambda r: r["total_ms"], reverse=True)[:top_imports],
+                "by_package_ms": dict(sorted(((p, round(ms, 1)) for p, ms in by_package.items()),
+                                             key=lambda item: item[1], reverse=True)[:top_imports]),
+            }
+        return report
+
+    def format(self) -> str:
+        report = self.as_dict()
+        lines = ["⏱️  Startup timeline (seconds since main.py was loaded)", "=" * 64]
+        for s in report["stages"]:
+            status = "" if s["ok"] else "  ❌"
+            lines.append(f"{s['start_s']:>8.3f}  {s['duration_ms']:>9.1f} ms  {s['stage']:<28} [{s['thread']}]{status}")
+        for name, at in sorted(report["marks"].items(), key=lambda item: item[1]):
+            lines.append(f"{at:>8.3f}  ── {name}")
+
+        imports = report.get("imports")
+        if imports:
+            lines += ["", f"📦 Top-level imports, slowest first ({imports['modules']} modules loaded)"]
+            lines += [f"{r['total_ms']:>9.1f} ms  {r['module']}" for r in imports["slowest"]]
+            lines += ["", "📦 Import time by package (excluding nested packages)"]
+            lines += [f"{ms:>9.1f} ms  {package}" for package, ms in imports["by_package_ms"].items()]
+        return "\n".join(lines)
+
+# Global startup timeline instance
+timeline = StartupTimeline()
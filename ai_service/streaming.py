@@ -0,0 +1,107 @@
+"""
+Streaming Helpers
+Sentence splitting and per-turn latency tracing for the streaming voice pipeline
+"""
+
+import re
+import time
+from typing import Dict, Iterator, Optional
+
+# Terminal punctuation (optionally followed by a closing quote/bracket) and whitespace
+_SENTENCE_END = re.compile(r'([.!?]+["\')\]]*)\s+')
+
+# Abbreviations that end in a period but do not end a sentence ("St. Paul", "Rom. 8")
+_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "st", "vs", "etc", "cf", "ch", "vv",
+    "gen", "ex", "lev", "num", "deut", "judg", "sam", "chr", "neh", "esth",
+    "ps", "prov", "eccl", "isa", "jer", "lam", "ezek", "dan", "hos", "mic",
+    "matt", "mk", "lk", "jn", "rom", "cor", "gal", "eph", "phil", "col",
+    "thess", "tim", "tit", "heb", "jas", "pet", "rev",
+}
+
+
+class SentenceSplitter:
+    """Accumulates streamed LLM text and yields complete sentences for TTS"""
+
+    def __init__(self, min_chars: int = 10, max_chars: int = 250):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> Iterator[str]:
+        """Add a chunk of streamed text and yield any sentences it completes"""
+        self._buffer += chunk
+        while True:
+            sentence = self._next_sentence()
+            if sentence is None:
+                break
+            yield sentence
+
+    def flush(self) -> Iterator[str]:
+        """Yield whatever text is left once the stream has ended"""
+        sentence = self._buffer.strip()
+        self._buffer = ""
+        if sentence:
+            yield sentence
+
+    def _next_sentence(self) -> Optional[str]:
+        """Cut the next complete sentence off the front of the buffer"""
+        for match in _SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[:match.end(1)].strip()
+            if len(candidate) < self.min_chars or self._ends_with_abbreviation(candidate):
+                continue
+            self._buffer = self._buffer[match.end():]
+            return candidate
+
+        if len(self._buffer) > self.max_chars:
+            # No sentence end in sight - break at a clause boundary to keep TTS fed
+            cut = max(self._buffer.rfind(", ", 0, self.max_chars),
+                      self._buffer.rfind("; ", 0, self.max_chars))
+            if cut <= 0:
+                cut = self._buffer.rfind(" ", 0, self.max_chars)
+            if cut > 0:
+                candidate = self._buffer[:cut + 1].strip()
+                self._buffer = self._buffer[cut + 1:]
+                return candidate
+        return None
+
+    @staticmethod
+    def _ends_with_abbreviation(text: str) -> bool:
+        """Check if the text ends with a known abbreviation rather than a sentence"""
+        last_word = text.rsplit(None, 1)[-1].rstrip(".").lower()
+        return last_word in _ABBREVIATIONS
+
+
+class LatencyTrace:
+    """Records monotonic timestamps for the stages of one conversation turn"""
+
+    STAGES = ("wake", "transcribed", "first_token", "first_sentence", "first_audio", "done")
+
+    def __init__(self, turn_id: int = 0, start: Optional[float] = None):
+        self.turn_id = turn_id
+        self.marks: Dict[str, float] = {}
+        self.mark("wake", start)
+
+    def mark(self, stage: str, timestamp: Optional[float] = None):
+        """Record a stage the first time it is reached"""
+        if stage not in self.marks:
+            self.marks[stage] = timestamp if timestamp is not None else time.monotonic()
+
+    def elapsed_ms(self, stage: str) -> Optional[float]:
+        """Milliseconds from wake to the given stage"""
+        if stage not in self.marks:
+            return None
+        return (self.marks[stage] - self.marks["wake"]) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage offsets from wake in milliseconds"""
+        return {stage: round(self.elapsed_ms(stage), 1) for stage in self.marks}
+
+    def format(self) -> str:
+        """Human readable one-line trace"""
+        parts = ["wake"]
+        for stage in self.STAGES[1:]:
+            elapsed = self.elapsed_ms(stage)
+            if elapsed is not None:
+                parts.append(f"{stage} {elapsed:.0f} ms")
+        return f"turn {self.turn_id}: " + " → ".join(parts)
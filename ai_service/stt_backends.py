@@ -0,0 +1,166 @@
+"""
+Speech-to-Text Backends
+Pluggable STT engines - local models are loaded once and kept resident
+"""
+
+import os
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+class STTBackend(ABC):
+    """Interface every speech-to-text engine implements"""
+
+    name = "base"
+    supports_partials = False
+    # Whether audio stays on the device - only then may it listen for the wake phrase in transcripts
+    offline = True
+
+    def load(self) -> bool:
+        """Load models or clients; called once at microphone initialization"""
+        return True
+
+    @abstractmethod
+    def transcribe(self, pcm: bytes, sample_rate: int) -> Optional[str]:
+        """Transcribe a complete utterance of 16-bit mono PCM"""
+
+    def start_stream(self, sample_rate: int):
+        """Begin an incremental recognition pass"""
+
+    def accept_audio(self, frame: bytes) -> Optional[str]:
+        """Feed audio while the user is talking; returns the partial transcript"""
+        return None
+
+    def finish_stream(self) -> Optional[str]:
+        """Finish the incremental pass and return the final transcript"""
+        return None
+
+class GoogleSTTBackend(STTBackend):
+    """Google Web Speech API through SpeechRecognition (needs network)"""
+
+    name = "google"
+    offline = False
+
+    def __init__(self):
+        self.recognizer = None
+
+    def load(self) -> bool:
+        import speech_recognition as sr
+        self._sr = sr
+        self.recognizer = sr.Recognizer()
+        return True
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> Optional[str]:
+        try:
+            return self.recognizer.recognize_google(self._sr.AudioData(pcm, sample_rate, 2))
+        except self._sr.UnknownValueError:
+            return None
+        except self._sr.RequestError as e:
+            logger.error(f"Speech recognition request failed: {e}")
+            return None
+
+class VoskSTTBackend(STTBackend):
+    """Offline Kaldi recognition with Vosk, including partial results"""
+
+    name = "vosk"
+    supports_partials = True
+
+    def __init__(self, model_path: Optional[str] = None):
+        self.model_path = model_path or os.getenv("VOSK_MODEL_PATH", "vosk-model-small-en-us-0.15")
+        self.model = None
+        self._recognizer = None
+        self._segments = []
+
+    def load(self) -> bool:
+        if self.model is not None:
+            return True
+        if not os.path.isdir(self.model_path):
+            logger.error(f"Vosk model not found: {self.model_path}")
+            return False
+        try:
+            import vosk
+            vosk.SetLogLevel(-1)
+            self._vosk = vosk
+            self.model = vosk.Model(self.model_path)
+        except Exception as e:
+            logger.error(f"Failed to load Vosk model: {e}")
+            return False
+        return True
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> Optional[str]:
+        recognizer = self._vosk.KaldiRecognizer(self.model, sample_rate)
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get("text") or None
+
+    def start_stream(self, sample_rate: int):
+        self._recognizer = self._vosk.KaldiRecognizer(self.model, sample_rate)
+        self._segments = []
+
+    def accept_audio(self, frame: bytes) -> Optional[str]:
+        if self._recognizer.AcceptWaveform(frame):
+            # Vosk closed a segment at an internal pause - keep it and start the next
+            text = json.loads(self._recognizer.Result()).get("text")
+            if text:
+                self._segments.append(text)
+            partial = ""
+        else:
+            partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        return " ".join(self._segments + ([partial] if partial else []))
+
+    def finish_stream(self) -> Optional[str]:
+        if self._recognizer is None:
+            return None
+        text = json.loads(self._recognizer.FinalResult()).get("text")
+        if text:
+            self._segments.append(text)
+        self._recognizer = None
+        return " ".join(self._segments) or None
+
+class WhisperSTTBackend(STTBackend):
+    """Offline Whisper recognition with faster-whisper (int8 on CPU)"""
+
+    name = "whisper"
+
+    def __init__(self, model_size: Optional[str] = None):
+        self.model_size = model_size or os.getenv("WHISPER_MODEL", "tiny.en")
+        self.model = None
+
+    def load(self) -> bool:
+        if self.model is not None:
+            return True
+        try:
+            from faster_whisper import WhisperModel
+            self.model = WhisperModel(
+                self.model_size,
+                device="cpu",
+                compute_type="int8",
+                cpu_threads=int(os.getenv("WHISPER_THREADS", "4")),
+            )
+        except Exception as e:
+            logger.error(f"Failed to load Whisper model {self.model_size}: {e}")
+            return False
+        return True
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> Optional[str]:
+        import numpy as np
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        if sample_rate != 16000:
+            raise ValueError("Whisper expects 16 kHz audio")
+        segments, _ = self.model.transcribe(audio, language="en", beam_size=1)
+        return " ".join(segment.text.strip() for segment in segments) or None
+
+STT_BACKENDS: Dict[str, Type[STTBackend]] = {
+    "google": GoogleSTTBackend,
+    "vosk": VoskSTTBackend,
+    "whisper": WhisperSTTBackend,
+}
+
+def create_stt_backend(name: str) -> STTBackend:
+    """Create an STT backend by name"""
+    try:
+        return STT_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown STT backend: {name}") from None
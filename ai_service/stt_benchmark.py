@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Speech-to-text benchmark
+Reports real-time factor and word error rate for each STT backend on a folder of WAVs
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service.stt_backends import STT_BACKENDS, create_stt_backend
+from ai_service.wake_word import SAMPLE_RATE, read_wav_pcm
+
+def normalize_words(text):
+    """Lowercase words without punctuation"""
+    return re.sub(r"[^a-z0-9' ]", " ", (text or "").lower()).split()
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance between a reference and a hypothesis"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1]
+
+def load_samples(folder):
+    """WAV files paired with their .txt reference transcripts"""
+    samples = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(".wav"):
+            continue
+        path = os.path.join(folder, name)
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path) as f:
+                reference = f.read().strip()
+        samples.append((name, read_wav_pcm(path), reference))
+    return samples
+
+def benchmark_backend(name, samples):
+    """Run one backend over every sample"""
+    backend = create_stt_backend(name)
+
+    start = time.monotonic()
+    if not backend.load():
+        return {"backend": name, "error": "failed to load"}
+    load_s = time.monotonic() - start
+
+    audio_s = processing_s = 0.0
+    errors = words = 0
+    files = []
+    for file_name, pcm, reference in samples:
+        duration = len(pcm) / (2 * SAMPLE_RATE)
+        start = time.monotonic()
+        hypothesis = backend.transcribe(pcm, SAMPLE_RATE)
+        elapsed = time.monotonic() - start
+
+        audio_s += duration
+        processing_s += elapsed
+        result = {"file": file_name, "rtf": round(elapsed / duration, 3), "text": hypothesis}
+        if reference is not None:
+            ref_words = normalize_words(reference)
+            file_errors = word_errors(ref_words, normalize_words(hypothesis))
+            errors += file_errors
+            words += len(ref_words)
+            result["wer"] = round(file_errors / len(ref_words), 3) if ref_words else None
+        files.append(result)
+
+    return {
+        "backend": name,
+        "load_s": round(load_s, 2),
+        "audio_s": round(audio_s, 2),
+        "rtf": round(processing_s / audio_s, 3) if audio_s else None,
+        "wer": round(errors / words, 3) if words else None,
+        "files": files,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("folder", help="folder of WAVs with optional matching .txt transcripts")
+    parser.add_argument("--backends", nargs="+", default=["vosk", "whisper"], choices=sorted(STT_BACKENDS))
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    samples = load_samples(args.folder)
+    if not samples:
+        raise SystemExit(f"No WAV files found in {args.folder}")
+
+    results = [benchmark_backend(name, samples) for name in args.backends]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"🎤 STT benchmark - {len(samples)} files")
+    print("=" * 50)
+    print(f"{'backend':<10} {'load s':>7} {'RTF':>7} {'WER':>7}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['backend']:<10} ❌ {r['error']}")
+            continue
+        wer = f"{r['wer']:.1%}" if r['wer'] is not None else "-"
+        print(f"{r['backend']:<10} {r['load_s']:>7.2f} {r['rtf']:>7.3f} {wer:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+TTS Audio Cache
+Content-addressed cache of synthesized speech, kept in memory and on disk
+"""
+
+import os
+import hashlib
+import threading
+import zlib
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".pcm.z"
+
+class TTSCache:
+    """Size-bounded LRU cache of compressed PCM keyed by text and voice settings"""
+
+    def __init__(self, cache_dir: str, max_disk_bytes: int = 50 * 1024 * 1024,
+                 max_memory_bytes: int = 8 * 1024 * 1024):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+
+        # key -> compressed PCM, and key -> compressed size on disk; both in LRU order
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize text so trivially different spellings share an entry"""
+        return " ".join(text.split()).lower()
+
+    def make_key(self, text: str, voice: str, rate: float, volume: float) -> str:
+        """Content address for a phrase spoken with the given settings"""
+        material = f"{self.normalize(text)}\0{voice}\0{rate:.3f}\0{volume:.3f}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached PCM for a key, or None on a miss"""
+        with self._lock:
+            compressed = self._memory.get(key)
+            if compressed is not None:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+            elif key in self._disk:
+                compressed = self._read_entry(key)
+                if compressed is not None:
+                    self._disk.move_to_end(key)
+                    self._remember(key, compressed)
+
+            if compressed is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return zlib.decompress(compressed)
+
+    def put(self, key: str, pcm: bytes):
+        """Store PCM for a key in memory and on disk"""
+        compressed = zlib.compress(pcm, 1)
+        with self._lock:
+            self._remember(key, compressed)
+            self._write_entry(key, compressed)
+
+    def contains(self, key: str) -> bool:
+        """Check for a key without touching hit/miss counters or LRU order"""
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def warm_up(self, phrases: Iterable[str], key_for: Callable[[str], str],
+                render: Callable[[str], Optional[bytes]]) -> int:
+        """Pre-render phrases that aren't cached yet, returning how many were added"""
+        rendered = 0
+        for phrase in phrases:
+            key = key_for(phrase)
+            if self.contains(key):
+                continue
+            pcm = render(phrase)
+            if pcm:
+                self.put(key, pcm)
+                rendered += 1
+        return rendered
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current cache size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _SUFFIX)
+
+    def _load_index(self):
+        """Rebuild the on-disk LRU order from file modification times"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(_SUFFIX):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, name[:-len(_SUFFIX)], st.st_size))
+
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _remember(self, key: str, compressed: bytes):
+        """Add an entry to the in-memory LRU, evicting as needed"""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = compressed
+        self._memory_bytes += len(compressed)
+
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _read_entry(self, key: str) -> Optional[bytes]:
+        """Read an entry from disk, dropping it from the index if it's gone"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                compressed = f.read()
+            os.utime(path)  # keeps LRU order across restarts
+            return compressed
+        except OSError:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+
+    def _write_entry(self, key: str, compressed: bytes):
+        """Atomically write an entry to disk and enforce the size bound"""
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write TTS cache entry: {e}")
+            return
+
+        self._disk_bytes -= self._disk.pop(key, 0)
+        self._disk[key] = len(compressed)
+        self._disk_bytes += len(compressed)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Remove least recently used files until under the disk budget"""
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
@@ -0,0 +1,178 @@
+"""
+Voice Activity Detection
+Frame-level speech detection and utterance endpointing for the microphone stream
+"""
+
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+from ai_service import audio_dsp
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+logger = logging.getLogger(__name__)
+
+class VoiceActivityDetector:
+    """Classifies 10-30 ms frames as speech, adapting to background noise as it goes"""
+
+    min_noise_floor = 50.0
+
+    def __init__(self, sample_rate: int = 16000, ratio: float = 2.5, aggressiveness: int = 2):
+        self.sample_rate = sample_rate
+        self.ratio = ratio
+        self.noise_floor = self.min_noise_floor
+        self.last_rms = 0
+        self.last_speech = False
+        self._webrtc = webrtcvad.Vad(aggressiveness) if webrtcvad is not None else None
+
+    @property
+    def threshold(self) -> float:
+        """Frame RMS above which a frame counts as loud"""
+        return self.noise_floor * self.ratio
+
+    def process(self, frame: bytes) -> bool:
+        """Classify one frame of 16-bit mono PCM and update the noise floor"""
+        self.last_speech = self._classify(frame)
+        return self.last_speech
+
+    def _classify(self, frame: bytes) -> bool:
+        rms = audio_dsp.rms(audio_dsp.as_samples(frame))
+        self.last_rms = rms
+
+        loud = rms > self.threshold
+        if loud:
+            # Creep up slowly so a new steady noise source is eventually absorbed
+            self.noise_floor += 0.001 * (rms - self.noise_floor)
+        else:
+            self.noise_floor = max(self.min_noise_floor, 0.95 * self.noise_floor + 0.05 * rms)
+
+        if loud and self._webrtc is not None:
+            try:
+                return self._webrtc.is_speech(bytes(frame), self.sample_rate)
+            except Exception:
+                pass  # frame size webrtcvad can't handle - trust the energy decision
+        return loud
+
+@dataclass
+class Utterance:
+    """One endpointed utterance plus how it was cut"""
+
+    pcm: bytes
+    sample_rate: int
+    speech_ms: int
+    leading_trimmed_ms: int
+    trailing_trimmed_ms: int
+    endpoint_delay_ms: float
+    forced: bool = False  # hit the maximum length rather than a pause
+    transcript: Optional[str] = None  # filled in when STT ran while recording
+
+    @property
+    def duration_ms(self) -> int:
+        return len(self.pcm) * 1000 // (2 * self.sample_rate)
+
+class Endpointer:
+    """Finds the start and end of a single utterance in a stream of frames"""
+
+    def __init__(self, vad: VoiceActivityDetector, frame_ms: int = 30, hangover_ms: int = 500,
+                 padding_ms: int = 150, min_speech_ms: int = 90,
+                 no_speech_timeout_ms: int = 5000, max_utterance_ms: int = 10000):
+        self.vad = vad
+        self.frame_ms = frame_ms
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.padding_frames = max(0, padding_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.no_speech_timeout_frames = no_speech_timeout_ms // frame_ms
+        self.max_frames = max_utterance_ms // frame_ms
+        self.reset()
+
+    def reset(self):
+        """Prepare for a new utterance"""
+        self._preroll: Deque[bytes] = deque(maxlen=self.padding_frames + self.min_speech_frames)
+        self._frames: List[bytes] = []
+        self._started = False
+        self._speech_run = 0
+        self._silent_run = 0
+        self._waited = 0
+        self._leading_dropped = 0
+        self._speech_frames = 0
+        self._last_speech_at = 0.0
+        self.utterance: Optional[Utterance] = None
+        self.timed_out = False
+
+    @property
+    def started(self) -> bool:
+        """Whether speech has been detected yet"""
+        return self._started
+
+    @property
+    def frames(self) -> List[bytes]:
+        """Frames kept for the utterance so far, including pre-roll"""
+        return self._frames
+
+    @property
+    def done(self) -> bool:
+        """Whether the utterance has ended (or never started)"""
+        return self.utterance is not None or self.timed_out
+
+    def process(self, frame: bytes, speech: Optional[bool] = None) -> bool:
+        """Feed one frame; returns True once the utterance has been endpointed. speech overrides the VAD"""
+        if self.done:
+            return True
+
+        # Ring buffer frames are reused by the capture thread - keep a copy
+        frame = bytes(frame)
+        if speech is None:
+            speech = self.vad.process(frame)
+        if not self._started:
+            return self._wait_for_speech(frame, speech)
+
+        self._frames.append(frame)
+        if speech:
+            self._speech_frames += 1
+            self._silent_run = 0
+            self._last_speech_at = time.monotonic()
+        else:
+            self._silent_run += 1
+
+        if self._silent_run >= self.hangover_frames:
+            self._finish(forced=False)
+        elif len(self._frames) >= self.max_frames:
+            self._finish(forced=True)
+        return self.done
+
+    def _wait_for_speech(self, frame: bytes, speech: bool) -> bool:
+        """Buffer pre-roll until enough consecutive speech frames arrive"""
+        self._preroll.append(frame)
+        self._waited += 1
+        self._speech_run = self._speech_run + 1 if speech else 0
+
+        if self._speech_run >= self.min_speech_frames:
+            self._started = True
+            self._leading_dropped = self._waited - len(self._preroll)
+            self._frames = list(self._preroll)
+            self._speech_frames = self._speech_run
+            self._last_speech_at = time.monotonic()
+        elif self._waited >= self.no_speech_timeout_frames:
+            self.timed_out = True
+        return self.done
+
+    def _finish(self, forced: bool):
+        """Trim trailing silence (keeping some padding) and build the utterance"""
+        trailing = max(0, self._silent_run - self.padding_frames)
+        frames = self._frames[:len(self._frames) - trailing] if trailing else self._frames
+
+        self.utterance = Utterance(
+            pcm=b"".join(frames),
+            sample_rate=self.vad.sample_rate,
+            speech_ms=self._speech_frames * self.frame_ms,
+            leading_trimmed_ms=self._leading_dropped * self.frame_ms,
+            trailing_trimmed_ms=trailing * self.frame_ms,
+            endpoint_delay_ms=round((time.monotonic() - self._last_speech_at) * 1000, 1),
+            forced=forced,
+        )
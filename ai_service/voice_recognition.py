@@ -3,60 +3,390 @@ Voice Recognition Module
 Handles microphone input and converts speech to text
 """
 
-import speech_recognition as   sr
-import pyaudio
+import os
+import re
 import threading
 import time
-from typing import Optional, Callable
+import logging
+from collections import deque
+from typing import Optional, Callable, Dict, Any, Deque, Tuple
+
+from ai_service import audio_dsp, instrumentation
+from ai_service.audio_ring_buffer import AudioRingBuffer, AudioCapture, ReplayCapture
+from ai_service.echo_suppression import EchoSuppressor, PlaybackReference
+from ai_service.wake_word import WakeWordDetector, SAMPLE_RATE, FRAME_MS, FRAME_SAMPLES, FRAME_BYTES
+from ai_service.vad import VoiceActivityDetector, Endpointer, Utterance
+from ai_service.stt_backends import STTBackend, GoogleSTTBackend, create_stt_backend
+
+logger = logging.getLogger(__name__)
+
+# Matches "Hey Scripture Palpi" plus the ways Google tends to transcribe it
+WAKE_WORD_PATTERN = re.compile(r"\b(?:hey|hi|okay|ok)?\s*scripture\s*pal\s*p(?:i|ie|y|ee)\b[,.!?]?", re.IGNORECASE)
 
 class VoiceRecognition:
     """Handles voice recognition and microphone input"""
-    
+
     def __init__(self):
-        # TODO: Initialize recognizer
-        # TODO: Initialize microphone
-        # TODO: Set up listening state
-        # TODO: Set up callback
-        pass
-        
-    def initialize_microphone(self):
-        """Initialize microphone for voice input"""
-        # TODO: Create microphone instance
-        # TODO: Adjust for ambient noise
-        # TODO: Return success/failure
-        pass
-    
-    def start_listening(self, callback: Callable[[str], None]):
+        self.stt: STTBackend = create_stt_backend(os.getenv("STT_BACKEND", "vosk"))
+
+        # One VAD tracks the noise floor for both the wake word gate and endpointing
+        self.vad = VoiceActivityDetector(SAMPLE_RATE)
+        self.wake_word = WakeWordDetector.from_env(vad=self.vad)
+        self.endpointer = Endpointer(
+            self.vad,
+            frame_ms=FRAME_MS,
+            hangover_ms=int(os.getenv("VAD_HANGOVER_MS", "500")),
+            no_speech_timeout_ms=int(os.getenv("VAD_NO_SPEECH_TIMEOUT_MS", "5000")),
+            max_utterance_ms=int(os.getenv("VAD_MAX_UTTERANCE_MS", "10000")),
+        )
+        self.last_utterance: Optional[Utterance] = None
+        self._utterance_count = 0
+        self._endpoint_delay_total = 0.0
+        self._stt_bytes_total = 0
+        self.device_index = int(os.getenv("MIC_DEVICE_INDEX")) if os.getenv("MIC_DEVICE_INDEX") else None
+
+        # The microphone is opened once; every stage reads the same frames through a cursor
+        ring_frames = int(float(os.getenv("AUDIO_RING_SECONDS", "3")) * 1000) // FRAME_MS
+        self.ring = AudioRingBuffer(FRAME_BYTES, ring_frames)
+        if os.getenv("AUDIO_SOURCE", "microphone") == "replay":
+            # Recorded clips instead of the microphone, queued with capture.play()
+            self.capture = ReplayCapture(self.ring, SAMPLE_RATE, FRAME_SAMPLES)
+        else:
+            self.capture = AudioCapture(self.ring, SAMPLE_RATE, FRAME_SAMPLES, self.device_index)
+        # Each stage reads through its own cursor, so the ring stats show which one falls behind
+        self._wake_cursor = self.ring.cursor("wake")
+        self._vad_cursor = self.ring.cursor("vad")
+        self._stt_cursor = self.ring.cursor("stt")
+        self._vad_cursor.park()
+        self._stt_cursor.park()
+        # Audio from before speech was noticed, replayed into the recorder
+        self.preroll_frames = int(os.getenv("PREROLL_MS", "300")) // FRAME_MS
+        self.wake_preroll_frames = int(os.getenv("WAKE_PREROLL_MS", "90")) // FRAME_MS
+        self.output_latency_s = float(os.getenv("OUTPUT_LATENCY_MS", "100")) / 1000
+        # Ring positions of frames that were only the wake chime, heard as silence by VAD and STT
+        self._chime_frames = set()
+        self._silence = bytes(FRAME_BYTES)
+
+        # Barge-in while we are talking: "speech" on any voice, "wake" on the wake word only, or "off"
+        self.barge_in = os.getenv("BARGE_IN", "speech")
+        self.barge_in_frames = max(1, int(os.getenv("BARGE_IN_MS", "150")) // FRAME_MS)
+        self.echo: Optional[EchoSuppressor] = None
+        self.is_playback_active: Callable[[], bool] = lambda: False
+        self.barge_ins = 0
+        self._voiced = 0
+        self._recent_voice: Deque[bool] = deque(maxlen=1000 // FRAME_MS)
+
+        self.is_listening = False
+        self.callback: Optional[Callable[[str], None]] = None
+        # May return how long its acknowledgement sound plays, so it isn't recorded
+        self.on_wake: Optional[Callable[[], Optional[float]]] = None
+        self.on_partial: Optional[Callable[[str], None]] = None
+        self.on_recording: Optional[Callable[[], None]] = None
+        self.on_barge_in: Optional[Callable[[float], None]] = None
+        self._listen_thread = None
+        self._stt_ready = threading.Event()
+
+    def initialize_microphone(self, load_stt: bool = True):
+        """Initialize microphone for voice input; load_stt=False leaves the STT model to load_stt()"""
+        # Load the STT model now so the first command doesn't pay for it
+        if load_stt:
+            self.load_stt()
+
+        try:
+            self.capture.start()
+        except Exception as e:
+            logger.error(f"Failed to initialize microphone: {e}")
+            self.capture.stop()
+            return False
+
+        # A short settle so the first frames aren't judged against a default floor;
+        # after this the floor keeps adapting on every frame
+        for _ in range(300 // FRAME_MS):
+            self.vad.process(self._read_frame())
+
+        self._check_wake_fallback()
+        return True
+
+    def load_stt(self):
+        """Load the STT model - the slow part of startup with Vosk or Whisper"""
+        try:
+            if not self.stt.load():
+                logger.warning(f"STT backend '{self.stt.name}' unavailable - falling back to Google")
+                self.stt = GoogleSTTBackend()
+                self.stt.load()
+                self._check_wake_fallback()
+        finally:
+            # Never leave a recording waiting on a model that failed to load
+            self._stt_ready.set()
+
+    def _check_wake_fallback(self):
+        """Say how the wake word will be found without enrolled templates"""
+        if self.wake_word.enabled:
+            return
+        if self.stt.offline:
+            logger.warning(f"No wake word templates enrolled - spotting the wake phrase in local "
+                           f"{self.stt.name} transcripts instead")
+        else:
+            logger.error(f"No wake word templates enrolled and the {self.stt.name} recognizer sends audio off the "
+                         f"device - wake word disabled until templates are enrolled")
+
+    def attach_playback(self, reference: Optional[PlaybackReference], is_active: Callable[[], bool]):
+        """Keep listening while speech plays, using the played audio to reject echo"""
+        self.is_playback_active = is_active
+        if reference is not None:
+            self.echo = EchoSuppressor(reference, coupling=float(os.getenv("ECHO_COUPLING", "1.0")))
+        else:
+            # No reference signal (pyttsx3 output) - only the wake word can interrupt
+            self.echo = None
+
+    def start_listening(self, callback: Callable[[str], None], on_wake: Optional[Callable[[], Optional[float]]] = None,
+                        on_barge_in: Optional[Callable[[float], None]] = None):
         """Start listening for voice input"""
-        # TODO: Set callback function
-        # TODO: Set listening state to True
-        # TODO: Start listening thread
-        pass
-    
+        if self.is_listening:
+            return
+        if not self.capture.running and not self.initialize_microphone():
+            raise RuntimeError("No microphone available")
+
+        self._wake_cursor.seek_to_live()
+        self.callback = callback
+        self.on_wake = on_wake
+        self.on_barge_in = on_barge_in
+        self.is_listening = True
+        self._listen_thread = threading.Thread(target=self._listen_loop, daemon=True)
+        self._listen_thread.start()
+
     def stop_listening(self):
         """Stop listening for voice input"""
-        # TODO: Set listening state to False
-        pass
-    
+        self.is_listening = False
+
+    def _read_frame(self, cursor=None) -> memoryview:
+        """Next microphone frame from the shared ring, by default the wake word's"""
+        frame = (cursor or self._wake_cursor).read(timeout=1.0)
+        if frame is None:
+            raise IOError("No audio from the microphone")
+        return frame
+
     def _listen_loop(self):
         """Main listening loop"""
-        # TODO: Continuous listening loop
-        # TODO: Handle microphone input
-        # TODO: Convert speech to text
-        # TODO: Call callback with result
-        pass
-    
-    def _process_audio(self, audio) -> Optional[str]:
+        while self.is_listening:
+            try:
+                frame = self._read_frame()
+            except Exception as e:
+                logger.error(f"Microphone error: {e}")
+                time.sleep(1)
+                continue
+
+            if self.barge_in != "off" and self.is_playback_active():
+                self._listen_during_playback(frame)
+                continue
+            self._voiced = 0
+
+            with instrumentation.span("wake_detect"):
+                woke = self.wake_word.process_frame(frame)
+            if woke:
+                self._handle_wake("", preroll_frames=self.wake_preroll_frames)
+            elif not self.wake_word.enabled and self.wake_word.voice_active and self.stt.offline:
+                # No enrolled templates: fall back to finding the phrase in a transcript - only with an
+                # on-device recognizer, never by sending every utterance in the room to a cloud one
+                text = self._process_audio(self._record_phrase(1 + self.preroll_frames))
+                command = self._strip_wake_word(text) if text else None
+                if command is not None:
+                    self._handle_wake(command)
+
+    def _listen_during_playback(self, frame: memoryview):
+        """Watch for the user talking over our own speech"""
+        now = time.monotonic()
+        woke = self.wake_word.process_frame(frame)
+        user_voice = self.vad.last_speech and (self.echo is None or self.echo.is_user_speech(self.vad.last_rms, now))
+        self._recent_voice.append(user_voice)
+        self._voiced = self._voiced + 1 if user_voice else 0
+
+        # Our own voice saying "Scripture Palpi" must not wake us
+        if woke and sum(self._recent_voice) >= 3:
+            self._interrupt(now)
+            self._handle_wake("", preroll_frames=self.wake_preroll_frames)
+        elif self.barge_in == "speech" and self.echo is not None and self._voiced >= self.barge_in_frames:
+            # Replay the frames that triggered the barge-in plus a little lead-in
+            replay = self._voiced + self.preroll_frames
+            self._interrupt(now)
+            text = self._process_audio(self._record_phrase(replay))
+            if text:
+                stripped = self._strip_wake_word(text)
+                self._handle_wake(text if stripped is None else stripped)
+
+    def _interrupt(self, detected_at: float):
+        """Tell the application to stop talking"""
+        self.barge_ins += 1
+        self._voiced = 0
+        self._recent_voice.clear()
+        if self.on_barge_in:
+            self.on_barge_in(detected_at)
+
+    def _handle_wake(self, command: str, preroll_frames: int = 0):
+        """Run one turn after the wake word was heard"""
+        acknowledgement_s = self.on_wake() if self.on_wake else None
+
+        # "Hey Scripture Palpi" on its own - the question follows separately. Detection
+        # lags the end of the wake word, so the question may already have started.
+        if not command:
+            chime = None
+            if acknowledgement_s:
+                # Users talk straight over the chime, so nothing is skipped - frames that are
+                # only the chime are silenced instead
+                start = time.monotonic()
+                chime = (start, start + acknowledgement_s + self.output_latency_s)
+            command = self._process_audio(self._record_phrase(preroll_frames, chime))
+
+        if command and self.callback:
+            self.callback(command)
+        self.wake_word.reset()
+
+    def _record_phrase(self, preroll_frames: int = 0, chime: Optional[Tuple[float, float]] = None) -> Optional[Utterance]:
+        """Record from the microphone until the speaker stops talking; chime is when the wake sound plays"""
+        if self.on_recording:
+            self.on_recording()
+        self._vad_cursor.seek(self._wake_cursor.position - preroll_frames)
+        self.endpointer.reset()
+        # Decided when speech starts: a model still loading then means recognizing the whole
+        # utterance afterwards, from the endpointer's copy rather than the fixed-size ring
+        streaming = None
+        self._chime_frames.clear()
+
+        try:
+            frame = self._read_frame(self._vad_cursor)
+            while self.is_listening:
+                if self._is_chime(frame, chime):
+                    self._chime_frames.add(self._vad_cursor.position - 1)
+                    done = self.endpointer.process(self._silence, speech=False)
+                else:
+                    done = self.endpointer.process(frame)
+                if streaming is None and self.endpointer.started:
+                    streaming = self._stt_ready.is_set() and self.stt.supports_partials
+                    if streaming:
+                        self.stt.start_stream(SAMPLE_RATE)
+                        # From the first frame the endpointer kept, pre-roll included
+                        self._stt_cursor.seek(self._vad_cursor.position - len(self.endpointer.frames))
+
+                # Recognize incrementally while the user is still talking
+                if streaming:
+                    self._stream_to_stt()
+
+                if done:
+                    break
+                frame = self._read_frame(self._vad_cursor)
+        finally:
+            # The wake word carries on after the utterance rather than scanning it again
+            self._wake_cursor.seek(self._vad_cursor.position)
+            self._vad_cursor.park()
+            self._stt_cursor.park()
+
+        utterance = self.endpointer.utterance
+        if utterance is None:
+            if streaming:
+                self.stt.finish_stream()
+            return None
+
+        if not self._stt_ready.is_set():
+            logger.info("Waiting for the STT model to finish loading")
+            self._stt_ready.wait()
+        # An empty transcript still means recognition already ran
+        if streaming:
+            # Only the tail is left to decode - the rest was recognized while the user spoke
+            with instrumentation.span("stt_finish"):
+                utterance.transcript = self.stt.finish_stream() or ""
+        else:
+            utterance.transcript = None
+        self._record_utterance_stats(utterance)
+        return utterance
+
+    def _stream_to_stt(self):
+        """Feed the recognizer every frame the endpointer has read so far"""
+        partial = None
+        while self._stt_cursor.position < self._vad_cursor.position:
+            position = self._stt_cursor.position
+            frame = self._stt_cursor.read(timeout=0)
+            if frame is None:
+                break
+            partial = self.stt.accept_audio(self._silence if position in self._chime_frames else bytes(frame))
+        if partial and self.on_partial:
+            self.on_partial(partial)
+
+    def _is_chime(self, frame: memoryview, chime: Optional[Tuple[float, float]]) -> bool:
+        """Whether a frame was captured while the wake chime played and holds nothing louder than it"""
+        if chime is None:
+            return False
+        # Frames still waiting behind this one put its capture time that far back
+        captured_at = time.monotonic() - self._vad_cursor.lag * FRAME_MS / 1000
+        if not chime[0] <= captured_at < chime[1]:
+            return False
+        if self.echo is None:
+            return True
+        return not self.echo.is_user_speech(audio_dsp.rms(audio_dsp.as_samples(frame)), captured_at)
+
+    def _record_utterance_stats(self, utterance: Utterance):
+        """Keep per-utterance endpointing figures for monitoring"""
+        self.last_utterance = utterance
+        self._utterance_count += 1
+        self._endpoint_delay_total += utterance.endpoint_delay_ms
+        self._stt_bytes_total += len(utterance.pcm)
+        logger.info(
+            f"Utterance: {utterance.duration_ms} ms sent ({len(utterance.pcm)} bytes), "
+            f"endpoint delay {utterance.endpoint_delay_ms:.0f} ms, trimmed "
+            f"{utterance.leading_trimmed_ms} ms leading / {utterance.trailing_trimmed_ms} ms trailing"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Wake word and endpointing statistics"""
+        count = self._utterance_count
+        stats = {
+            "wake_word": self.wake_word.stats(),
+            "stt_backend": self.stt.name,
+            "utterances": count,
+            "noise_floor": round(self.vad.noise_floor, 1),
+            "avg_endpoint_delay_ms": round(self._endpoint_delay_total / count, 1) if count else None,
+            "avg_stt_bytes": self._stt_bytes_total // count if count else None,
+            "barge_ins": self.barge_ins,
+            "audio_ring": self.ring.stats(),
+            "mic_overruns": self.capture.device_overruns,
+        }
+        if self.echo is not None:
+            stats["echo_coupling"] = round(self.echo.coupling, 3)
+            stats["echo_suppressed_frames"] = self.echo.suppressed_frames
+        if self.last_utterance is not None:
+            stats["last_endpoint_delay_ms"] = self.last_utterance.endpoint_delay_ms
+            stats["last_stt_bytes"] = len(self.last_utterance.pcm)
+        return stats
+
+    def _strip_wake_word(self, text: str) -> Optional[str]:
+        """Return the text after the wake word, or None if it wasn't said"""
+        match = WAKE_WORD_PATTERN.search(text)
+        if not match:
+            return None
+        return text[match.end():].strip()
+
+    def _process_audio(self, utterance: Optional[Utterance]) -> Optional[str]:
         """Process audio and convert to text"""
-        # TODO: Use Google Speech Recognition
-        # TODO: Handle recognition errors
-        # TODO: Return recognized text
-        pass
-    
+        if utterance is None:
+            return None
+        if utterance.transcript is not None:
+            return utterance.transcript or None
+        try:
+            with instrumentation.span("stt"):
+                return self.stt.transcribe(utterance.pcm, utterance.sample_rate)
+        except Exception as e:
+            logger.error(f"Speech recognition failed: {e}")
+            return None
+
     def listen_once(self) -> Optional[str]:
         """Listen for a single voice input and return text"""
-        # TODO: Initialize microphone if needed
-        # TODO: Listen for single input
-        # TODO: Process audio
-        # TODO: Return text result
-        pass 
\ No newline at end of file
+        if self.is_listening:
+            raise RuntimeError("Microphone is in use by the listening loop")
+        if not self.capture.running and not self.initialize_microphone():
+            return None
+
+        self._wake_cursor.seek_to_live()
+        self.is_listening = True
+        try:
+            return self._process_audio(self._record_phrase())
+        finally:
+            self.is_listening = False
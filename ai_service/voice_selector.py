@@ -0,0 +1,106 @@
+"""
+Voice Selector
+Picks a fast or a high-quality Piper voice for each sentence from measured speed, CPU load and buffered audio
+"""
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+class VoiceSpeed:
+    """Running real-time factor and speaking rate of one voice"""
+
+    def __init__(self, name: str, rtf: float, chars_per_s: float = 15.0, alpha: float = 0.3):
+        self.name = name
+        self.rtf = rtf
+        self.chars_per_s = chars_per_s
+        self.alpha = alpha
+        self.segments = 0
+        self.measured = False
+
+    def update(self, chars: int, audio_s: float, synthesis_s: float):
+        if audio_s <= 0:
+            return
+        rtf, chars_per_s = synthesis_s / audio_s, chars / audio_s
+        # The first real measurement replaces the prior outright
+        weight = self.alpha if self.measured else 1.0
+        self.rtf += weight * (rtf - self.rtf)
+        self.chars_per_s += weight * (chars_per_s - self.chars_per_s)
+        self.measured = True
+
+class VoiceSelector:
+    """Fast voice while little audio is buffered, quality voice once synthesis can't cause a gap"""
+
+    def __init__(self, quality: str, fast: Optional[str] = None, cpu_limit: float = 85.0,
+                 margin: float = 1.25, history: int = 50):
+        self.quality = VoiceSpeed(quality, rtf=0.5)
+        self.fast = VoiceSpeed(fast, rtf=0.2) if fast else None
+        # Voices used before, so switching back keeps their measurements
+        self._previous: Dict[str, VoiceSpeed] = {}
+        self.cpu_limit = cpu_limit
+        # Synthesis has to finish this many times over before the buffer runs out
+        self.margin = margin
+        self.segments: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def set_voices(self, quality: str, fast: Optional[str] = None):
+        """Another pair of voices, e.g. the new user's preference and its fast counterpart"""
+        with self._lock:
+            for speed in (self.quality, self.fast):
+                if speed is not None:
+                    self._previous[speed.name] = speed
+            self.quality = self._previous.pop(quality, None) or VoiceSpeed(quality, rtf=0.5)
+            self.fast = (self._previous.pop(fast, None) or VoiceSpeed(fast, rtf=0.2)) if fast else None
+
+    def choose(self, text: str, buffered_s: float, cpu_percent: Optional[float] = None) -> Tuple[str, str]:
+        """Voice name for the next sentence, and why"""
+        if self.fast is None:
+            return self.quality.name, "only voice"
+        if cpu_percent is not None and cpu_percent >= self.cpu_limit:
+            return self.fast.name, "cpu"
+        needed_s = len(text) / self.quality.chars_per_s * self.quality.rtf * self.margin
+        if buffered_s >= needed_s:
+            return self.quality.name, "buffered"
+        # Nothing (or too little) is playing: the first sentence of an answer always lands here
+        return self.fast.name, "latency"
+
+    def record(self, voice: str, text: str, audio_s: float, synthesis_s: float, first_chunk_s: float,
+               reason: str, buffered_s: float, cpu_percent: Optional[float]) -> Dict[str, Any]:
+        """Fold one synthesized sentence into the voice's speed and the segment history"""
+        segment = {
+            "voice": voice,
+            "reason": reason,
+            "chars": len(text),
+            "audio_s": round(audio_s, 2),
+            "synthesis_ms": round(synthesis_s * 1000, 1),
+            "first_chunk_ms": round(first_chunk_s * 1000, 1),
+            "rtf": round(synthesis_s / audio_s, 3) if audio_s > 0 else None,
+            "buffered_s": round(buffered_s, 2),
+            "cpu_percent": cpu_percent,
+        }
+        with self._lock:
+            # The quality voice may have been switched while this sentence was synthesized
+            speed = next((s for s in (self.quality, self.fast) if s is not None and s.name == voice), None)
+            speed = speed or self._previous.get(voice)
+            if speed is not None:
+                speed.segments += 1
+                speed.update(len(text), audio_s, synthesis_s)
+            self.segments.append(segment)
+        return segment
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-voice speed and the most recent segments"""
+        with self._lock:
+            voices = [speed for speed in (self.quality, self.fast) if speed is not None]
+            return {
+                "voices": {
+                    speed.name: {
+                        "role": "quality" if speed is self.quality else "fast",
+                        "segments": speed.segments,
+                        "rtf": round(speed.rtf, 3),
+                        "chars_per_s": round(speed.chars_per_s, 1),
+                    }
+                    for speed in voices
+                },
+                "recent_segments": list(self.segments)[-10:],
+            }
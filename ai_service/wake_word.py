@@ -0,0 +1,248 @@
+"""
+Wake Word Detection
+Always-on local "Hey Scripture Palpi" spotting on fixed-size audio frames
+"""
+
+import os
+import time
+import wave
+import logging
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from ai_service import audio_dsp
+from ai_service.vad import VoiceActivityDetector
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+FRAME_BYTES = FRAME_SAMPLES * 2
+
+def _mel_filterbank(n_fft: int, sample_rate: int, n_bands: int,
+                    fmin: float = 100.0, fmax: float = 4000.0) -> np.ndarray:
+    """Triangular mel filters, shape (n_bands, n_fft // 2 + 1)"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(fmin), hz_to_mel(fmax), n_bands + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / sample_rate).astype(int)
+
+    filters = np.zeros((n_bands, n_fft // 2 + 1), dtype=np.float32)
+    for band in range(n_bands):
+        left, center, right = bins[band], bins[band + 1], bins[band + 2]
+        if center > left:
+            filters[band, left:center] = np.linspace(0, 1, center - left, endpoint=False)
+        if right > center:
+            filters[band, center:right] = np.linspace(1, 0, right - center, endpoint=False)
+    return filters
+
+def read_wav_pcm(path: str, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Read a WAV file as 16-bit mono PCM at the given rate"""
+    with wave.open(path, "rb") as wav:
+        rate, channels, width = wav.getframerate(), wav.getnchannels(), wav.getsampwidth()
+        pcm = wav.readframes(wav.getnframes())
+
+    samples = audio_dsp.to_mono(audio_dsp.to_int16(pcm, width), channels)
+    return audio_dsp.resample(samples, rate, sample_rate).tobytes()
+
+class WakeWordDetector:
+    """Energy-gated template matcher scored with subsequence DTW on log-mel frames"""
+
+    n_fft = 512
+    n_bands = 20
+    score_hop = 3           # score every 3 frames (90 ms) while voice is active
+    hangover_frames = 10    # keep the gate open across short pauses between words
+    step_penalty = 0.05     # cost of stretching or squeezing time during alignment
+
+    def __init__(self, template_dir: Optional[str] = None, sensitivity: float = 0.5,
+                 refractory_s: float = 1.5, vad: Optional[VoiceActivityDetector] = None):
+        self.sensitivity = sensitivity
+        self.vad = vad or VoiceActivityDetector(SAMPLE_RATE)
+        self.refractory_frames = int(refractory_s * 1000 / FRAME_MS)
+
+        self._window = np.hanning(FRAME_SAMPLES).astype(np.float32)
+        self._filters = _mel_filterbank(self.n_fft, SAMPLE_RATE, self.n_bands)
+        self.templates: List[np.ndarray] = []
+
+        self._ring = np.zeros((1, self.n_bands), dtype=np.float32)
+        self._ring_index = 0
+        self._ring_count = 0
+
+        self.voice_active = False
+        self.last_score = 0.0
+        self._hangover = 0
+        self._frames_since_score = 0
+        self._cooldown = 0
+
+        self.frames_processed = 0
+        self.detections = 0
+        self._cpu_time = 0.0
+
+        if template_dir:
+            self.load_templates(template_dir)
+
+    @classmethod
+    def from_env(cls, vad: Optional[VoiceActivityDetector] = None) -> "WakeWordDetector":
+        """Create a detector configured from environment variables"""
+        return cls(
+            template_dir=os.getenv("WAKE_WORD_TEMPLATE_DIR", "wake_word_templates"),
+            sensitivity=float(os.getenv("WAKE_WORD_SENSITIVITY", "0.5")),
+            vad=vad,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any wake word templates are enrolled"""
+        return bool(self.templates)
+
+    @property
+    def threshold(self) -> float:
+        """Maximum alignment distance accepted as a detection"""
+        return 0.15 + 0.3 * min(max(self.sensitivity, 0.0), 1.0)
+
+    def load_templates(self, template_dir: str) -> int:
+        """Enroll every WAV recording of the wake word in a directory"""
+        if not os.path.isdir(template_dir):
+            logger.warning(f"Wake word template directory not found: {template_dir}")
+            return 0
+
+        for name in sorted(os.listdir(template_dir)):
+            if name.lower().endswith(".wav"):
+                try:
+                    self.add_template(read_wav_pcm(os.path.join(template_dir, name)))
+                except (OSError, wave.Error, ValueError) as e:
+                    logger.warning(f"Skipping wake word template {name}: {e}")
+        return len(self.templates)
+
+    def add_template(self, pcm: bytes):
+        """Enroll one recording (16 kHz mono PCM) of the wake word"""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        n_frames = len(samples) // FRAME_SAMPLES
+        if n_frames < 5:
+            return
+
+        frames = samples[:n_frames * FRAME_SAMPLES].reshape(n_frames, FRAME_SAMPLES).astype(np.float32)
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        loud = np.nonzero(rms > rms.max() * 0.1)[0]
+        frames = frames[loud[0]:loud[-1] + 1]
+
+        self.templates.append(np.stack([self._features(frame) for frame in frames]))
+
+        # The ring holds enough frames for the longest template spoken slowly
+        ring_frames = int(max(len(t) for t in self.templates) * 1.5) + self.score_hop
+        if ring_frames > len(self._ring):
+            self._ring = np.zeros((ring_frames, self.n_bands), dtype=np.float32)
+            self._ring_index = 0
+            self._ring_count = 0
+
+    def reset(self):
+        """Forget buffered audio and detection state"""
+        self._ring_index = 0
+        self._ring_count = 0
+        self._hangover = 0
+        self._cooldown = 0
+        self.voice_active = False
+
+    def process_frame(self, frame: bytes) -> bool:
+        """Feed one 30 ms frame of 16 kHz mono PCM; returns True on a detection"""
+        start = time.thread_time()
+        try:
+            self._update_gate(self.vad.process(frame))
+            return self._process(np.frombuffer(frame, dtype=np.int16).astype(np.float32))
+        finally:
+            self._cpu_time += time.thread_time() - start
+            self.frames_processed += 1
+
+    def _process(self, samples: np.ndarray) -> bool:
+        if len(samples) != FRAME_SAMPLES or not self.templates:
+            return False
+
+        self._ring[self._ring_index] = self._features(samples)
+        self._ring_index = (self._ring_index + 1) % len(self._ring)
+        self._ring_count = min(self._ring_count + 1, len(self._ring))
+
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return False
+        if not self.voice_active:
+            self._frames_since_score = 0
+            return False
+
+        self._frames_since_score += 1
+        if self._frames_since_score < self.score_hop:
+            return False
+        self._frames_since_score = 0
+
+        distance = self._best_distance()
+        self.last_score = 1.0 - distance
+        if distance <= self.threshold:
+            self.detections += 1
+            self._cooldown = self.refractory_frames
+            return True
+        return False
+
+    def _update_gate(self, speech: bool):
+        """Open the scoring gate on voice and hold it across short pauses"""
+        if speech:
+            self.voice_active = True
+            self._hangover = self.hangover_frames
+        elif self._hangover > 0:
+            self._hangover -= 1
+        else:
+            self.voice_active = False
+
+    def _features(self, samples: np.ndarray) -> np.ndarray:
+        """Gain-normalized log-mel vector for one frame"""
+        spectrum = np.abs(np.fft.rfft(samples * self._window, self.n_fft)) ** 2
+        logmel = np.log(self._filters @ spectrum + 1e-6)
+        logmel -= logmel.mean()
+        norm = np.linalg.norm(logmel)
+        return logmel / norm if norm > 0 else logmel
+
+    def _recent_frames(self) -> np.ndarray:
+        """Buffered feature frames in time order"""
+        if self._ring_count < len(self._ring):
+            return self._ring[:self._ring_count]
+        return np.roll(self._ring, -self._ring_index, axis=0)
+
+    def _best_distance(self) -> float:
+        """Smallest alignment distance between any template and the recent audio"""
+        window = self._recent_frames()
+        best = 1.0
+        for template in self.templates:
+            if len(window) < len(template) // 2:
+                continue
+            ends = self._subsequence_dtw(template, window)
+            best = min(best, float(ends[-self.score_hop:].min()))
+        return best
+
+    def _subsequence_dtw(self, template: np.ndarray, window: np.ndarray) -> np.ndarray:
+        """Normalized cost of the template ending at each window position"""
+        cost = 1.0 - template @ window.T
+        previous = cost[0].copy()  # the match may start anywhere in the window
+        for row in cost[1:]:
+            best = previous + self.step_penalty
+            best[1:] = np.minimum(best[1:], previous[:-1])
+            best[2:] = np.minimum(best[2:], previous[:-2] + self.step_penalty)
+            previous = row + best
+        return previous / len(template)
+
+    def stats(self) -> Dict[str, Any]:
+        """Detection counters and CPU use as a share of one core"""
+        audio_seconds = self.frames_processed * FRAME_MS / 1000
+        return {
+            "enabled": self.enabled,
+            "templates": len(self.templates),
+            "sensitivity": self.sensitivity,
+            "detections": self.detections,
+            "frames": self.frames_processed,
+            "noise_floor": round(self.vad.noise_floor, 1),
+            "last_score": round(self.last_score, 3),
+            "cpu_percent": round(100 * self._cpu_time / audio_seconds, 2) if audio_seconds else 0.0,
+        }
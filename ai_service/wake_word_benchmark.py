@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Offline wake word benchmark
+Replays WAV files through the wake word detector and reports false accept/reject rates
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service.wake_word import WakeWordDetector, FRAME_BYTES, FRAME_MS, read_wav_pcm
+
+def list_wavs(directory):
+    """All WAV files in a directory"""
+    if not directory or not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.lower().endswith(".wav")]
+
+def count_detections(detector, pcm):
+    """Feed a recording frame by frame and count detections"""
+    detector.reset()
+    hits = 0
+    for offset in range(0, len(pcm) - FRAME_BYTES + 1, FRAME_BYTES):
+        if detector.process_frame(pcm[offset:offset + FRAME_BYTES]):
+            hits += 1
+    return hits
+
+def run_benchmark(template_dir, positive_dir, negative_dir, sensitivity):
+    """Score one sensitivity setting against the positive and negative sets"""
+    detector = WakeWordDetector(template_dir=template_dir, sensitivity=sensitivity)
+    if not detector.enabled:
+        raise SystemExit(f"No wake word templates found in {template_dir}")
+
+    positives = list_wavs(positive_dir)
+    misses = [path for path in positives if count_detections(detector, read_wav_pcm(path)) == 0]
+
+    negatives = list_wavs(negative_dir)
+    false_accepts = 0
+    negative_seconds = 0.0
+    for path in negatives:
+        pcm = read_wav_pcm(path)
+        negative_seconds += len(pcm) / FRAME_BYTES * FRAME_MS / 1000
+        false_accepts += count_detections(detector, pcm)
+
+    negative_hours = negative_seconds / 3600
+    return {
+        "sensitivity": sensitivity,
+        "threshold": round(detector.threshold, 3),
+        "positives": len(positives),
+        "false_rejects": len(misses),
+        "false_reject_rate": round(len(misses) / len(positives), 3) if positives else None,
+        "negative_hours": round(negative_hours, 3),
+        "false_accepts": false_accepts,
+        "false_accepts_per_hour": round(false_accepts / negative_hours, 2) if negative_hours else None,
+        "cpu_percent": detector.stats()["cpu_percent"],
+        "missed_files": [os.path.basename(path) for path in misses],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--templates", default="wake_word_templates", help="enrolled wake word WAVs")
+    parser.add_argument("--positives", required=True, help="WAVs that each contain the wake word")
+    parser.add_argument("--negatives", help="WAVs of speech/background without the wake word")
+    parser.add_argument("--sensitivity", type=float, nargs="+", default=[0.3, 0.5, 0.7])
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = [run_benchmark(args.templates, args.positives, args.negatives, s) for s in args.sensitivity]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("🎯 Wake word benchmark")
+    print("=" * 60)
+    print(f"{'sens':>5} {'FRR':>7} {'FA/hour':>9} {'FA':>5} {'CPU %':>7}")
+    for r in results:
+        frr = f"{r['false_reject_rate']:.1%}" if r['false_reject_rate'] is not None else "-"
+        fah = f"{r['false_accepts_per_hour']:.2f}" if r['false_accepts_per_hour'] is not None else "-"
+        print(f"{r['sensitivity']:>5.2f} {frr:>7} {fah:>9} {r['false_accepts']:>5} {r['cpu_percent']:>7.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,46 @@ Flask Application Factory
 Main Flask app for Scripture Palpi Christian AI Assistant
 """
 
-from flask import Flask
-from flask_cors import CORS
 import os
 
-def create_app(scripture_palpi_instance=None):
+def create_app():
     """Create and configure the Flask application"""
-    # TODO: Initialize Flask app
-    # TODO: Configure CORS for React Native app
-    # TODO: Set up basic configuration
-    # TODO: Store ScripturePalpi instance in app config
-    # TODO: Register blueprints
-    pass 
\ No newline at end of file
+    # Imported here so the AI worker can use flask_app.services without loading Flask
+    from flask import Flask
+    from flask_cors import CORS
+
+    app = Flask(__name__)
+
+    # React Native app talks to us from the local network
+    CORS(app)
+
+    app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', os.urandom(16).hex())
+
+    from .routes import ai_control, events, metrics, sessions, status, wifi
+    app.register_blueprint(ai_control.bp)
+    app.register_blueprint(events.bp)
+    app.register_blueprint(metrics.bp)
+    app.register_blueprint(sessions.bp)
+    app.register_blueprint(status.bp)
+    app.register_blueprint(wifi.bp)
+
+    from .services.ai_manager import ai_manager
+    from .services.event_bus import event_bus
+    from .services.log_store import log_store
+    log_store.start()
+
+    def route_worker_event(event, data):
+        # Worker logs go to the log store; everything else out on the live event stream
+        if event == "logs":
+            log_store.extend(data.get("records", []))
+        else:
+            event_bus.publish(event, data)
+    ai_manager.add_listener(route_worker_event)
+
+    from .services.wifi_manager import wifi_manager
+    wifi_manager.add_listener(event_bus.publish)
+
+    from .services.metrics_sampler import metrics_sampler
+    metrics_sampler.start()
+
+    return app
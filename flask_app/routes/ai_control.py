@@ -3,41 +3,39 @@ AI Control Routes
 Handles starting, stopping, and controlling the AI service
 """
 
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, jsonify, request
+
+from flask_app.services.ai_manager import ai_manager
 
 bp = Blueprint('ai_control', __name__, url_prefix='/api/ai')
 
+def _result(result):
+    return jsonify(result), 200 if result.get("success") else 503
+
 @bp.route('/start', methods=['POST'])
 def start_ai_service():
     """Start the AI service"""
-    # TODO: Get ScripturePalpi instance from Flask app
-    # TODO: Call start_ai_service() method
-    # TODO: Update Flask config with service status
-    # TODO: Return success/error response
-    pass
+    return _result(ai_manager.start_service())
 
 @bp.route('/stop', methods=['POST'])
 def stop_ai_service():
     """Stop the AI service"""
-    # TODO: Get ScripturePalpi instance from Flask app
-    # TODO: Call stop_ai_service() method
-    # TODO: Update Flask config with service status
-    # TODO: Return success/error response
-    pass
+    return _result(ai_manager.stop_service())
 
 @bp.route('/status', methods=['GET'])
 def get_ai_status():
     """Get AI service status"""
-    # TODO: Get ScripturePalpi instance from Flask app
-    # TODO: Check if AI service is running
-    # TODO: Return current status
-    pass
+    return jsonify(ai_manager.get_status())
 
 @bp.route('/restart', methods=['POST'])
 def restart_ai_service():
     """Restart the AI service"""
-    # TODO: Get ScripturePalpi instance from Flask app
-    # TODO: Stop AI service
-    # TODO: Start AI service again
-    # TODO: Return result
-    pass 
\ No newline at end of file
+    return _result(ai_manager.restart_service())
+
+@bp.route('/command', methods=['POST'])
+def send_ai_command():
+    """Send a control command (status, set_provider, new_conversation, ...) to the AI worker"""
+    body = request.get_json(silent=True) or {}
+    if not body.get("command"):
+        return jsonify({"success": False, "error": "command is required"}), 400
+    return _result(ai_manager.send_command(body["command"], body.get("data")))
@@ -0,0 +1,36 @@
+"""
+Event Routes
+Live stream of what the assistant is doing, as Server-Sent Events
+"""
+
+import os
+
+from flask import Blueprint, Response, stream_with_context
+
+from flask_app.services.event_bus import event_bus
+
+bp = Blueprint('events', __name__, url_prefix='/api/events')
+
+HEARTBEAT_S = float(os.getenv("EVENTS_HEARTBEAT_S", "15"))
+
+@bp.route('', methods=['GET'])
+def stream_events():
+    """State changes, partial transcripts, response text and periodic status"""
+    subscription = event_bus.subscribe()
+
+    def generate():
+        try:
+            # Reconnect quickly if the connection drops
+            yield "retry: 2000\n\n"
+            while True:
+                frame = subscription.get(timeout=HEARTBEAT_S)
+                # A comment line keeps proxies and the phone's network stack from timing out
+                yield frame.encoded if frame is not None else ": keep-alive\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
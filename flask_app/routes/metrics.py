@@ -0,0 +1,87 @@
+"""
+Metrics Routes
+Prometheus text exposition of pipeline latencies and system load
+"""
+
+from typing import Any, Dict, List
+
+from flask import Blueprint, Response
+
+from flask_app.services.ai_manager import ai_manager
+from flask_app.services.event_bus import event_bus
+from flask_app.services.metrics_sampler import metrics_sampler, FIELDS
+
+bp = Blueprint('metrics', __name__)
+
+PREFIX = "palpi"
+
+def _family(lines: List[str], name: str, kind: str, help_text: str):
+    lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+    lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+def _stage_histograms(lines: List[str], latency: Dict[str, Any]):
+    stages = latency.get("stages") or {}
+    if not stages:
+        return
+    bounds = latency["buckets_ms"]
+    name = f"{PREFIX}_stage_duration_ms"
+    _family(lines, "stage_duration_ms", "histogram", "Time spent in each voice pipeline stage")
+    for stage, histogram in sorted(stages.items()):
+        cumulative = 0
+        for bound, count in zip(bounds, histogram["counts"]):
+            cumulative += count
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {histogram["sum_ms"]}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {histogram["count"]}')
+
+def _tts_voices(lines: List[str], tts: Dict[str, Any]):
+    voices = tts.get("voices") or {}
+    if not voices:
+        return
+    _family(lines, "tts_segments_total", "counter", "Sentences synthesized by each Piper voice")
+    for voice, stats in sorted(voices.items()):
+        lines.append(f'{PREFIX}_tts_segments_total{{voice="{voice}",role="{stats["role"]}"}} {stats["segments"]}')
+    _family(lines, "tts_real_time_factor", "gauge", "Running synthesis time per second of speech for each Piper voice")
+    for voice, stats in sorted(voices.items()):
+        lines.append(f'{PREFIX}_tts_real_time_factor{{voice="{voice}",role="{stats["role"]}"}} {stats["rtf"]}')
+
+def _sessions(lines: List[str], session: Dict[str, Any]):
+    if not session:
+        return
+    _family(lines, "sessions_in_memory", "gauge", "User sessions held in memory")
+    lines.append(f"{PREFIX}_sessions_in_memory {session['in_memory']}")
+    _family(lines, "sessions_memory_bytes", "gauge", "Approximate memory used by in-memory user sessions")
+    lines.append(f"{PREFIX}_sessions_memory_bytes {session['memory_bytes']}")
+    _family(lines, "session_switches_total", "counter", "Changes of the active user")
+    lines.append(f"{PREFIX}_session_switches_total {session['switches']}")
+
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Everything in the status snapshots, in Prometheus text format"""
+    status = ai_manager.get_status()
+    lines: List[str] = []
+
+    _family(lines, "ai_worker_up", "gauge", "Whether the AI worker is running and connected")
+    lines.append(f"{PREFIX}_ai_worker_up {int(status['running'] and status['connected'])}")
+    _family(lines, "ai_worker_restarts_total", "counter", "AI worker restarts after a crash")
+    lines.append(f"{PREFIX}_ai_worker_restarts_total {status['restarts']}")
+
+    ai_service = status.get("ai_service") or {}
+    if "turns" in ai_service:
+        _family(lines, "turns_total", "counter", "Conversation turns started")
+        lines.append(f"{PREFIX}_turns_total {ai_service['turns']}")
+    _stage_histograms(lines, ai_service.get("latency") or {})
+    _tts_voices(lines, ai_service.get("tts") or {})
+    _sessions(lines, ai_service.get("session") or {})
+
+    system = metrics_sampler.snapshot()
+    for field in FIELDS:
+        if system.get(field) is not None:
+            _family(lines, f"system_{field}", "gauge", f"Latest sampled {field.replace('_', ' ')}")
+            lines.append(f"{PREFIX}_system_{field} {system[field]}")
+
+    _family(lines, "event_stream_clients", "gauge", "Connected live event stream clients")
+    lines.append(f"{PREFIX}_event_stream_clients {event_bus.stats()['clients']}")
+
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
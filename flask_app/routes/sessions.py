@@ -0,0 +1,41 @@
+"""
+Session Routes
+Chooses which user the assistant is talking with and edits their preferences
+"""
+
+from flask import Blueprint, jsonify, request
+
+from flask_app.services.ai_manager import ai_manager
+
+bp = Blueprint('sessions', __name__, url_prefix='/api/sessions')
+
+def _result(result):
+    return jsonify(result), 200 if result.get("success") else 503
+
+@bp.route('', methods=['GET'])
+def list_users():
+    """Known users and which one is active"""
+    return _result(ai_manager.send_command("list_users"))
+
+@bp.route('/active', methods=['POST'])
+def switch_user():
+    """Make a profile picked in the app the active user"""
+    body = request.get_json(silent=True) or {}
+    if not body.get("user_id"):
+        return jsonify({"success": False, "error": "user_id is required"}), 400
+    return _result(ai_manager.send_command("switch_user", {"user_id": body["user_id"]}))
+
+@bp.route('/identify', methods=['POST'])
+def identify_speaker():
+    """Switch to the user enrolled with a speaker ID label"""
+    body = request.get_json(silent=True) or {}
+    if not body.get("speaker_id"):
+        return jsonify({"success": False, "error": "speaker_id is required"}), 400
+    return _result(ai_manager.send_command("identify_speaker", {"speaker_id": body["speaker_id"]}))
+
+@bp.route('/<user_id>', methods=['PUT'])
+def update_user(user_id):
+    """Create or change a user's name, speaker ID label and preferences"""
+    body = request.get_json(silent=True) or {}
+    data = {key: body[key] for key in ("name", "speaker_id", "preferences") if key in body}
+    return _result(ai_manager.send_command("update_user", {"user_id": user_id, **data}))
@@ -3,30 +3,55 @@ Status Routes
 Provides system status and health information
 """
 
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, jsonify, request
+
+from flask_app.services.ai_manager import ai_manager
+from flask_app.services.event_bus import event_bus
+from flask_app.services.log_store import log_store
+from flask_app.services.metrics_sampler import metrics_sampler
 
 bp = Blueprint('status', __name__, url_prefix='/api/status')
 
 @bp.route('/system', methods=['GET'])
 def get_system_status():
     """Get overall system status"""
-    # TODO: Get CPU usage
-    # TODO: Get memory usage
-    # TODO: Get disk usage
-    # TODO: Get temperature (Raspberry Pi specific)
-    # TODO: Get uptime
-    # TODO: Return system information
-    pass
+    # Sampled in the background - a request never waits on psutil
+    return jsonify(metrics_sampler.snapshot())
+
+@bp.route('/system/history', methods=['GET'])
+def get_system_history():
+    """System metrics over the last 1m, 5m or 1h, for charts"""
+    try:
+        history = metrics_sampler.history(
+            request.args.get('window', '1h'),
+            max_points=request.args.get('points', 360, type=int),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(history)
+
+def _with_latency_summary(status):
+    """Replace the worker's raw latency histograms with per-stage percentiles"""
+    ai_service = dict(status.get("ai_service") or {})
+    latency = ai_service.pop("latency", None)
+    if latency:
+        ai_service["latency_ms"] = {
+            stage: {k: h[k] for k in ("count", "p50", "p95", "p99")}
+            for stage, h in latency.get("stages", {}).items()
+        }
+    return {**status, "ai_service": ai_service}
 
 @bp.route('/services', methods=['GET'])
 def get_services_status():
     """Get status of all services"""
-    # TODO: Check Flask app status
-    # TODO: Check AI service status
     # TODO: Check WiFi status
     # TODO: Check audio devices
-    # TODO: Return services status
-    pass
+    return jsonify({
+        "flask": {"running": True},
+        "system": {k: v for k, v in metrics_sampler.snapshot().items() if k != "rollups"},
+        "ai_service": _with_latency_summary(ai_manager.get_status()),
+        "event_stream": event_bus.stats(),
+    })
 
 @bp.route('/health', methods=['GET'])
 def health_check():
@@ -36,8 +61,15 @@ def health_check():
 
 @bp.route('/logs', methods=['GET'])
 def get_recent_logs():
-    """Get recent application logs"""
-    # TODO: Read from log file
-    # TODO: Parse log entries
-    # TODO: Return recent logs
-    pass 
\ No newline at end of file
+    """Get recent application logs, filtered by level, component, time range or turn"""
+    args = request.args
+    result = log_store.query(
+        level=args.get('level'),
+        component=args.get('component'),
+        since=args.get('since', type=float),
+        until=args.get('until', type=float),
+        turn=args.get('turn', type=int),
+        limit=min(args.get('limit', 100, type=int), 1000),
+    )
+    result["store"] = log_store.stats()
+    return jsonify(result)
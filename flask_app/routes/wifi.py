@@ -3,26 +3,35 @@ WiFi Setup Routes
 Handles WiFi configuration and hotspot management
 """
 
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, jsonify, request
+
+from flask_app.services.wifi_manager import wifi_manager
 
 bp = Blueprint('wifi', __name__, url_prefix='/api/wifi')
 
 @bp.route('/scan', methods=['GET'])
 def scan_wifi_networks():
     """Scan for available WiFi networks"""
-    # TODO: Use iwlist to scan for networks
-    # TODO: Parse network information
-    # TODO: Return list of available networks
-    pass
+    # Answers from the cache; a stale cache (or ?refresh=1) starts a background scan
+    return jsonify(wifi_manager.scan(refresh=request.args.get('refresh') == '1'))
 
 @bp.route('/connect', methods=['POST'])
 def connect_wifi():
     """Connect to a WiFi network"""
-    # TODO: Get SSID and password from request
-    # TODO: Create wpa_supplicant configuration
-    # TODO: Restart networking services
-    # TODO: Return connection result
-    pass
+    body = request.get_json(silent=True) or {}
+    ssid = body.get('ssid')
+    if not ssid:
+        return jsonify({"success": False, "error": "ssid is required"}), 400
+    job = wifi_manager.connect(ssid, body.get('password'))
+    return jsonify({"success": True, "job": job.as_dict()}), 202
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+def get_wifi_job(job_id):
+    """Progress of a scan or connect job"""
+    job = wifi_manager.job(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job)
 
 @bp.route('/hotspot/start', methods=['POST'])
 def start_hotspot():
@@ -44,7 +53,4 @@ def stop_hotspot():
 @bp.route('/status', methods=['GET'])
 def get_wifi_status():
     """Get current WiFi connection status"""
-    # TODO: Get current connection info using iwconfig
-    # TODO: Parse connection details
-    # TODO: Return connection status
-    pass 
\ No newline at end of file
+    return jsonify(wifi_manager.status())
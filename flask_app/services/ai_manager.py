@@ -1,63 +1,258 @@
 """
 AI Manager Service
-Manages communication between Flask app and AI service
+Supervises the AI worker process and talks to it over a local IPC channel
 """
 
 import subprocess
 import os
-import signal
-import psutil
-import json
+import sys
+import socket
+import tempfile
+import threading
 import time
-from typing import Optional, Dict, Any
+import logging
+from typing import Optional, Dict, Any, Callable, List
+
+from flask_app.services.ipc import Connection, IPCPeer, IPCError, listen
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 class AIManager:
-    """Manages the AI service process"""
-    
-    def __init__(self):
-        # TODO: Initialize process variables
-        # TODO: Set AI script path
-        pass
-    
+    """Runs the AI service as a supervised child process"""
+
+    min_backoff_s = 1.0
+    max_backoff_s = 30.0
+    # A worker that stays up this long resets the backoff
+    stable_after_s = 60.0
+    connect_timeout_s = 30.0
+    stop_timeout_s = 5.0
+
+    def __init__(self, socket_path: Optional[str] = None):
+        self.socket_path = socket_path or os.getenv(
+            "AI_WORKER_SOCKET", os.path.join(tempfile.gettempdir(), "scripture_palpi.sock")
+        )
+        self.script_path = os.path.join(PROJECT_ROOT, "main.py")
+
+        self.process: Optional[subprocess.Popen] = None
+        self.peer: Optional[IPCPeer] = None
+        self._server: Optional[socket.socket] = None
+        self._lock = threading.RLock()
+        self._connected = threading.Event()
+        self._wake = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+        self._want_running = False
+        self._backoff_s = self.min_backoff_s
+        self._next_start = 0.0
+        self._started_at = 0.0
+
+        # Everything get_status needs, kept current by worker events and the supervisor
+        self._snapshot: Dict[str, Any] = {
+            "running": False,
+            "connected": False,
+            "pid": None,
+            "restarts": 0,
+            "last_exit_code": None,
+            "started_at": None,
+            "ai_service": {},
+            "updated_at": time.time(),
+        }
+
+    def add_listener(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """Call back with every event the worker pushes"""
+        self._listeners.append(callback)
+
     def start_service(self) -> Dict[str, Any]:
         """Start the AI service"""
-        # TODO: Check if service is already running
-        # TODO: Verify AI script exists
-        # TODO: Start AI service process
-        # TODO: Wait and check if started successfully
-        # TODO: Return result
-        pass
-    
+        with self._lock:
+            self._want_running = True
+            self._ensure_supervisor()
+            if self._alive():
+                return {"success": True, "message": "AI service already running", "pid": self.process.pid}
+            self._next_start = 0.0
+            self._spawn()
+
+        if not self._connected.wait(self.connect_timeout_s):
+            return {"success": False, "error": "AI worker did not connect", "pid": self._snapshot["pid"]}
+        return {"success": True, "message": "AI service started", "pid": self._snapshot["pid"]}
+
     def stop_service(self) -> Dict[str, Any]:
         """Stop the AI service"""
-        # TODO: Check if service is running
-        # TODO: Try graceful termination
-        # TODO: Force kill if needed
-        # TODO: Update status
-        # TODO: Return result
-        pass
-    
+        with self._lock:
+            self._want_running = False
+            if not self._alive():
+                return {"success": True, "message": "AI service not running"}
+            process, peer = self.process, self.peer
+
+        # Let the worker say goodbye and release the audio devices itself
+        if peer is not None:
+            try:
+                peer.request("shutdown", timeout=self.stop_timeout_s)
+            except IPCError as e:
+                logger.warning(f"Graceful AI worker shutdown failed: {e}")
+            # The worker exits once its supervisor hangs up
+            peer.close()
+        try:
+            process.wait(self.stop_timeout_s)
+        except subprocess.TimeoutExpired:
+            process.terminate()
+            try:
+                process.wait(self.stop_timeout_s)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        self._reap(process)
+        return {"success": True, "message": "AI service stopped"}
+
     def restart_service(self) -> Dict[str, Any]:
         """Restart the AI service"""
-        # TODO: Stop service if running
-        # TODO: Wait before restarting
-        # TODO: Start service again
-        # TODO: Return result
-        pass
-    
+        self.stop_service()
+        with self._lock:
+            self._backoff_s = self.min_backoff_s
+        return self.start_service()
+
     def get_status(self) -> Dict[str, Any]:
-        """Get current AI service status"""
-        # TODO: Check if process is actually running
-        # TODO: Update status if process died unexpectedly
-        # TODO: Return current status
-        pass
-    
-    def send_command(self, command: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Send a command to the AI service (future feature)"""
-        # TODO: Check if service is running
-        # TODO: Implement communication with AI service
-        # TODO: Return result
-        pass
+        """Current AI service status from the in-memory snapshot"""
+        with self._lock:
+            status = dict(self._snapshot)
+        if status["started_at"] and status["running"]:
+            status["uptime_s"] = round(time.time() - status["started_at"], 1)
+        return status
+
+    def send_command(self, command: str, data: Dict[str, Any] = None, timeout: float = 5.0) -> Dict[str, Any]:
+        """Send a command to the AI service and wait for its reply"""
+        peer = self.peer
+        if peer is None or peer.closed:
+            return {"success": False, "error": "AI service not running"}
+        try:
+            return {"success": True, "result": peer.request(command, data, timeout=timeout)}
+        except IPCError as e:
+            return {"success": False, "error": str(e)}
+
+    def ping(self) -> Optional[float]:
+        """Control-plane round trip in milliseconds, or None when the worker is unreachable"""
+        peer = self.peer
+        if peer is None:
+            return None
+        start = time.perf_counter()
+        try:
+            peer.request("ping", timeout=1.0)
+        except IPCError:
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    def shutdown(self):
+        """Stop the worker and the supervisor for good"""
+        self.stop_service()
+        with self._lock:
+            server, self._server = self._server, None
+        if server is not None:
+            server.close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+        self._wake.set()
+
+    def _alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def _ensure_supervisor(self):
+        if self._server is None:
+            self._server = listen(self.socket_path)
+            threading.Thread(target=self._accept_loop, args=(self._server,),
+                             name="ai-ipc-accept", daemon=True).start()
+        if self._supervisor is None:
+            self._supervisor = threading.Thread(target=self._supervise, name="ai-supervisor", daemon=True)
+            self._supervisor.start()
+
+    def _spawn(self):
+        """Launch a worker; called with the lock held"""
+        self._connected.clear()
+        command = [sys.executable, self.script_path, "--worker", "--socket", self.socket_path]
+        self.process = subprocess.Popen(command, cwd=PROJECT_ROOT)
+        self._started_at = time.time()
+        self._snapshot.update(running=True, connected=False, pid=self.process.pid,
+                              started_at=self._started_at, updated_at=self._started_at)
+        logger.info(f"AI worker started (pid {self.process.pid})")
+        self._emit("worker", {"running": True, "pid": self.process.pid})
+
+    def _reap(self, process: subprocess.Popen):
+        """Forget a worker that has exited"""
+        with self._lock:
+            if self.process is not process:
+                return
+            self.process = None
+            self._snapshot.update(running=False, connected=False, pid=None,
+                                  last_exit_code=process.returncode, updated_at=time.time())
+            peer, self.peer = self.peer, None
+        if peer is not None:
+            peer.close()
+        self._emit("worker", {"running": False, "exit_code": process.returncode})
+
+    def _supervise(self):
+        """Restart a crashed worker, backing off while it keeps crashing"""
+        while self._server is not None:
+            self._wake.wait(0.5)
+            self._wake.clear()
+            with self._lock:
+                process = self.process
+                if process is not None and process.poll() is not None:
+                    logger.warning(f"AI worker exited with code {process.returncode}")
+                    if self._want_running:
+                        if time.time() - self._started_at >= self.stable_after_s:
+                            self._backoff_s = self.min_backoff_s
+                        self._next_start = time.time() + self._backoff_s
+                        logger.info(f"Restarting AI worker in {self._backoff_s:.0f}s")
+                        self._backoff_s = min(self._backoff_s * 2, self.max_backoff_s)
+                        self._snapshot["restarts"] += 1
+                    self._reap(process)
+                elif self._want_running and process is None and time.time() >= self._next_start:
+                    try:
+                        self._spawn()
+                    except OSError as e:
+                        logger.error(f"Could not start AI worker: {e}")
+                        self._next_start = time.time() + self._backoff_s
+
+    def _accept_loop(self, server: socket.socket):
+        while True:
+            try:
+                sock, _ = server.accept()
+            except OSError:
+                return
+            peer = IPCPeer(Connection(sock), on_event=self._on_event)
+            peer.on_close = lambda p=peer: self._on_disconnect(p)
+            with self._lock:
+                old, self.peer = self.peer, peer
+                self._snapshot.update(connected=True, updated_at=time.time())
+            if old is not None:
+                old.close()
+            peer.start()
+            self._connected.set()
+
+    def _on_disconnect(self, peer: IPCPeer):
+        with self._lock:
+            if self.peer is peer:
+                self.peer = None
+                self._snapshot.update(connected=False, updated_at=time.time())
+        # The worker normally exits right after its socket closes
+        self._wake.set()
+
+    def _on_event(self, event: str, data: Dict[str, Any]):
+        if event == "status":
+            with self._lock:
+                self._snapshot.update(ai_service=data, updated_at=time.time())
+        self._emit(event, data)
+
+    def _emit(self, event: str, data: Dict[str, Any]):
+        for listener in self._listeners:
+            try:
+                listener(event, data)
+            except Exception as e:
+                logger.error(f"AI event listener failed: {e}")
 
 # Global AI manager instance
-ai_manager = AIManager() 
\ No newline at end of file
+ai_manager = AIManager()
@@ -0,0 +1,127 @@
+"""
+Event Bus
+Fans AI worker events out to live app connections without letting a slow client hold anyone up
+"""
+
+import json
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+# Only the newest of these matters - a queued older one is replaced, not kept
+COALESCED_EVENTS = {"status", "partial"}
+# Replayed to a client as soon as it connects
+STICKY_EVENTS = {"state", "status", "session"}
+# Text deltas - queued ones for the same turn are joined into one frame, so none of the answer is lost
+MERGED_EVENTS = {"response"}
+# Which queued frame goes first when a client falls a full queue behind: lowest rank, then oldest
+EVICTION_RANK = {"status": 0, "partial": 0, "response": 2, "state": 2, "turn": 2}
+
+class Frame:
+    """One event, encoded once as a Server-Sent Events message for every client"""
+
+    __slots__ = ("id", "event", "data", "encoded")
+
+    def __init__(self, frame_id: int, event: str, data: Dict[str, Any]):
+        self.id = frame_id
+        self.event = event
+        self.data = data
+        payload = json.dumps(data, separators=(",", ":"), default=str)
+        self.encoded = f"id: {frame_id}\nevent: {event}\ndata: {payload}\n\n"
+
+class Subscription:
+    """A client's bounded queue of frames still to send"""
+
+    def __init__(self, max_frames: int):
+        self.max_frames = max_frames
+        self.dropped = 0
+        self.sent = 0
+        self.connected_at = time.time()
+        self._frames: Deque[Frame] = deque()
+        self._ready = threading.Condition()
+
+    def put(self, frame: Frame):
+        """Queue a frame, dropping stale ones rather than ever blocking the publisher"""
+        with self._ready:
+            if frame.event in COALESCED_EVENTS:
+                for queued in self._frames:
+                    if queued.event == frame.event:
+                        self._frames.remove(queued)
+                        self.dropped += 1
+                        break
+            elif frame.event in MERGED_EVENTS:
+                for queued in self._frames:
+                    if queued.event == frame.event and queued.data.get("turn") == frame.data.get("turn"):
+                        self._frames.remove(queued)
+                        frame = Frame(frame.id, frame.event,
+                                      {**frame.data, "text": queued.data["text"] + frame.data["text"]})
+                        break
+            if len(self._frames) >= self.max_frames:
+                self._frames.remove(min(self._frames, key=lambda queued: EVICTION_RANK.get(queued.event, 1)))
+                self.dropped += 1
+            self._frames.append(frame)
+            self._ready.notify()
+
+    def get(self, timeout: float) -> Optional[Frame]:
+        """Next frame, or None if nothing arrived within timeout"""
+        with self._ready:
+            if not self._frames and not self._ready.wait(timeout):
+                return None
+            if not self._frames:
+                return None
+            self.sent += 1
+            return self._frames.popleft()
+
+    @property
+    def pending(self) -> int:
+        return len(self._frames)
+
+class EventBus:
+    """Publishes events to every subscribed client"""
+
+    def __init__(self, max_frames: int = 64):
+        self.max_frames = max_frames
+        self.published = 0
+        self._ids = itertools.count(1)
+        self._subscriptions: List[Subscription] = []
+        self._sticky: Dict[str, Frame] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.max_frames)
+        with self._lock:
+            for frame in self._sticky.values():
+                subscription.put(frame)
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """Queue an event for every client; never waits on any of them"""
+        frame = Frame(next(self._ids), event, data)
+        with self._lock:
+            self.published += 1
+            if event in STICKY_EVENTS:
+                self._sticky[event] = frame
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.put(frame)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        return {
+            "clients": len(subscriptions),
+            "published": self.published,
+            "dropped": sum(s.dropped for s in subscriptions),
+            "pending": [s.pending for s in subscriptions],
+        }
+
+# Global event bus instance
+event_bus = EventBus()
@@ -0,0 +1,206 @@
+"""
+IPC Channel
+Length-prefixed message framing over a Unix domain socket between Flask and the AI worker
+"""
+
+import os
+import json
+import queue
+import socket
+import struct
+import threading
+import itertools
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Payload length and message type ahead of every compact JSON payload
+HEADER = struct.Struct(">IB")
+MAX_PAYLOAD = 4 * 1024 * 1024
+
+REQUEST = 1
+RESPONSE = 2
+EVENT = 3
+
+class IPCError(Exception):
+    """A request failed, timed out or the peer went away"""
+
+class Connection:
+    """Sends and receives whole frames on a connected socket"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._send_lock = threading.Lock()
+        self._header = bytearray(HEADER.size)
+
+    def send(self, kind: int, payload: Dict[str, Any]):
+        data = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        if len(data) > MAX_PAYLOAD:
+            raise IPCError(f"Message too large ({len(data)} bytes)")
+        with self._send_lock:
+            self.sock.sendall(HEADER.pack(len(data), kind) + data)
+
+    def recv(self) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Next frame, or None once the peer has closed the connection"""
+        if not self._recv_exact(memoryview(self._header)):
+            return None
+        length, kind = HEADER.unpack(self._header)
+        if length > MAX_PAYLOAD:
+            raise IPCError(f"Frame too large ({length} bytes)")
+        payload = bytearray(length)
+        if not self._recv_exact(memoryview(payload)):
+            return None
+        return kind, json.loads(payload)
+
+    def _recv_exact(self, view: memoryview) -> bool:
+        while len(view):
+            received = self.sock.recv_into(view)
+            if not received:
+                return False
+            view = view[received:]
+        return True
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+class IPCPeer:
+    """Request/response calls and push events in both directions over one connection"""
+
+    def __init__(self, connection: Connection,
+                 on_request: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+                 on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                 on_close: Optional[Callable[[], None]] = None):
+        self.connection = connection
+        self.on_request = on_request
+        self.on_event = on_event
+        self.on_close = on_close
+        self.closed = False
+
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, list] = {}
+        self._pending_lock = threading.Lock()
+        # Requests run off the reader thread so a slow command can't hold up responses
+        self._requests: "queue.Queue" = queue.Queue()
+
+    @classmethod
+    def connect(cls, path: str, **handlers) -> "IPCPeer":
+        """Connect to a listening socket and start reading"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(path)
+        peer = cls(Connection(sock), **handlers)
+        peer.start()
+        return peer
+
+    def start(self):
+        threading.Thread(target=self._read_loop, name="ipc-reader", daemon=True).start()
+        threading.Thread(target=self._request_loop, name="ipc-requests", daemon=True).start()
+
+    def request(self, command: str, data: Optional[Dict[str, Any]] = None, timeout: float = 5.0) -> Any:
+        """Send a command and wait for its result"""
+        if self.closed:
+            raise IPCError("Not connected")
+        request_id = next(self._ids)
+        slot = [threading.Event(), None]
+        with self._pending_lock:
+            self._pending[request_id] = slot
+        try:
+            self.connection.send(REQUEST, {"id": request_id, "cmd": command, "data": data or {}})
+            if not slot[0].wait(timeout):
+                raise IPCError(f"'{command}' timed out after {timeout}s")
+        except OSError as e:
+            raise IPCError(f"'{command}' failed: {e}")
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+
+        response = slot[1]
+        if response is None:
+            raise IPCError("Connection closed")
+        if not response.get("ok"):
+            raise IPCError(response.get("error", "unknown error"))
+        return response.get("result")
+
+    def notify(self, event: str, data: Optional[Dict[str, Any]] = None):
+        """Push an event; dropped silently if the peer is gone"""
+        if self.closed:
+            return
+        try:
+            self.connection.send(EVENT, {"event": event, "data": data or {}})
+        except OSError:
+            self._close()
+
+    def _read_loop(self):
+        try:
+            while True:
+                frame = self.connection.recv()
+                if frame is None:
+                    break
+                kind, payload = frame
+                if kind == RESPONSE:
+                    with self._pending_lock:
+                        slot = self._pending.get(payload.get("id"))
+                    if slot is not None:
+                        slot[1] = payload
+                        slot[0].set()
+                elif kind == REQUEST:
+                    self._requests.put(payload)
+                elif kind == EVENT and self.on_event:
+                    try:
+                        self.on_event(payload.get("event"), payload.get("data", {}))
+                    except Exception as e:
+                        logger.error(f"IPC event handler failed: {e}")
+        except (OSError, ValueError, IPCError) as e:
+            if not self.closed:
+                logger.warning(f"IPC connection error: {e}")
+        finally:
+            self._close()
+
+    def _request_loop(self):
+        while True:
+            payload = self._requests.get()
+            if payload is None:
+                return
+            response = {"id": payload.get("id")}
+            try:
+                if self.on_request is None:
+                    raise IPCError("No request handler")
+                response["result"] = self.on_request(payload.get("cmd"), payload.get("data", {}))
+                response["ok"] = True
+            except Exception as e:
+                response.update(ok=False, error=str(e))
+            try:
+                self.connection.send(RESPONSE, response)
+            except OSError:
+                self._close()
+                return
+
+    def _close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.connection.close()
+        self._requests.put(None)
+        with self._pending_lock:
+            for slot in self._pending.values():
+                slot[0].set()
+        if self.on_close:
+            self.on_close()
+
+    def close(self):
+        self._close()
+
+def listen(path: str) -> socket.socket:
+    """Listening Unix socket at path, replacing any stale one"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    return server
@@ -0,0 +1,289 @@
+"""
+Log Store
+Structured JSON logs in compressed, indexed segments with an in-memory tail
+"""
+
+import os
+import glob
+import gzip
+import json
+import queue
+import threading
+import time
+import logging
+import traceback
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def _level_number(name: Optional[str]) -> int:
+    number = logging.getLevelName(name.upper()) if name else 0
+    return number if isinstance(number, int) else 0
+
+def to_record(record: logging.LogRecord, **fields) -> Dict[str, Any]:
+    """A LogRecord as a plain JSON-ready dict"""
+    entry = {
+        "ts": round(record.created, 3),
+        "level": record.levelname,
+        "component": record.name,
+        "message": record.getMessage(),
+        **fields,
+    }
+    if record.exc_info:
+        entry["exception"] = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+    return entry
+
+class LogStore:
+    """Appends never block on disk; a writer thread flushes blocks of records to gzip segments"""
+
+    def __init__(self, directory: str, ring_size: int = 2000, segment_bytes: int = 1024 * 1024,
+                 max_segments: int = 20, block_records: int = 256, flush_interval_s: float = 5.0,
+                 max_unwritten: int = 20000):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.block_records = block_records
+        self.flush_interval_s = flush_interval_s
+
+        self._ring: Deque[Dict[str, Any]] = deque(maxlen=ring_size)
+        self._pending: "queue.Queue" = queue.Queue(maxsize=max_unwritten)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.dropped = 0
+        # Per segment: its path and one index entry per compressed block
+        self._segments: List[Dict[str, Any]] = []
+        self._writer: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._writer is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+        self._writer = threading.Thread(target=self._write_loop, name="log-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, entry: Dict[str, Any]):
+        """Add a record to the tail and queue it for disk"""
+        with self._lock:
+            self._seq += 1
+            entry["seq"] = self._seq
+            self._ring.append(entry)
+        try:
+            self._pending.put_nowait(entry)
+        except queue.Full:
+            # The card has fallen far behind - the record stays in the tail but never reaches disk
+            self.dropped += 1
+
+    def extend(self, entries: List[Dict[str, Any]]):
+        for entry in entries:
+            self.append(entry)
+
+    def close(self):
+        if self._writer is not None:
+            self._pending.put(None)
+            self._writer.join(timeout=5)
+            self._writer = None
+
+    def query(self, level: Optional[str] = None, component: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              turn: Optional[int] = None, limit: int = 100) -> Dict[str, Any]:
+        """Newest matching records in time order, from memory and then from disk as needed"""
+        min_level = _level_number(level)
+
+        def matches(entry: Dict[str, Any]) -> bool:
+            return ((not min_level or _level_number(entry["level"]) >= min_level)
+                    and (component is None or entry["component"].startswith(component))
+                    and (since is None or entry["ts"] >= since)
+                    and (until is None or entry["ts"] <= until)
+                    and (turn is None or entry.get("turn") == turn))
+
+        with self._lock:
+            tail = list(self._ring)
+            segments = list(self._segments)
+        results = [entry for entry in tail if matches(entry)]
+        blocks_read = 0
+
+        # Only go to disk when the tail can't have everything asked for
+        covered = tail and since is not None and tail[0]["ts"] <= since
+        if len(results) < limit and not covered:
+            first_in_memory = tail[0]["seq"] if tail else self._seq + 1
+            for path, block in self._blocks_newest_first(segments):
+                if len(results) >= limit or (since is not None and block["last_ts"] < since):
+                    break
+                if (block["first_seq"] >= first_in_memory
+                        or (until is not None and block["first_ts"] > until)
+                        or (min_level and block["max_level"] < min_level)
+                        or (turn is not None and turn not in block["turns"])):
+                    continue
+                blocks_read += 1
+                older = [e for e in self._read_block(path, block) if e["seq"] < first_in_memory and matches(e)]
+                results = older + results
+
+        return {"records": results[-limit:], "blocks_read": blocks_read}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            segments = list(self._segments)
+            tail = len(self._ring)
+        return {
+            "records": self._seq,
+            "in_memory": tail,
+            "unwritten": self._pending.qsize(),
+            "dropped": self.dropped,
+            "segments": len(segments),
+            "disk_bytes": sum(s["bytes"] for s in segments),
+        }
+
+    @staticmethod
+    def _blocks_newest_first(segments: List[Dict[str, Any]]):
+        for segment in reversed(segments):
+            for block in reversed(segment["blocks"]):
+                yield segment["path"], block
+
+    def _read_block(self, path: str, block: Dict[str, Any]) -> List[Dict[str, Any]]:
+        try:
+            with open(path, "rb") as f:
+                f.seek(block["offset"])
+                data = gzip.decompress(f.read(block["length"]))
+        except (OSError, EOFError) as e:
+            logger.warning(f"Unreadable log block in {path}: {e}")
+            return []
+        return [json.loads(line) for line in data.splitlines() if line]
+
+    def _load_index(self):
+        """Pick up the segments left by earlier runs"""
+        for index_path in sorted(glob.glob(os.path.join(self.directory, "segment-*.idx"))):
+            path = index_path[:-len(".idx")] + ".jsonl.gz"
+            if not os.path.exists(path):
+                continue
+            with open(index_path) as f:
+                blocks = [json.loads(line) for line in f if line.strip()]
+            self._segments.append({"path": path, "blocks": blocks, "bytes": os.path.getsize(path)})
+            if blocks:
+                self._seq = max(self._seq, blocks[-1]["last_seq"])
+
+    def _write_loop(self):
+        block: List[Dict[str, Any]] = []
+        deadline = 0.0
+        while True:
+            try:
+                entry = self._pending.get(timeout=max(0.0, deadline - time.monotonic()) if block else None)
+                if entry is None:
+                    if block:
+                        self._write_block(block)
+                    return
+                if not block:
+                    deadline = time.monotonic() + self.flush_interval_s
+                block.append(entry)
+            except queue.Empty:
+                pass
+
+            # One write per block keeps the SD card from seeing a write per log line
+            if block and (len(block) >= self.block_records or time.monotonic() >= deadline):
+                try:
+                    self._write_block(block)
+                except OSError as e:
+                    logger.error(f"Could not write logs: {e}")
+                block = []
+
+    def _write_block(self, block: List[Dict[str, Any]]):
+        """Append one independently compressed gzip member and its index entry"""
+        data = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in block).encode("utf-8")
+        compressed = gzip.compress(data, mtime=0)
+
+        segment = self._segments[-1] if self._segments else None
+        if segment is None or segment["bytes"] >= self.segment_bytes:
+            segment = self._new_segment()
+
+        entry = {
+            "offset": segment["bytes"],
+            "length": len(compressed),
+            "first_ts": block[0]["ts"],
+            "last_ts": block[-1]["ts"],
+            "first_seq": block[0]["seq"],
+            "last_seq": block[-1]["seq"],
+            "max_level": max(_level_number(e["level"]) for e in block),
+            "turns": sorted({e["turn"] for e in block if e.get("turn") is not None}),
+        }
+        with open(segment["path"], "ab") as f:
+            f.write(compressed)
+        with open(segment["path"][:-len(".jsonl.gz")] + ".idx", "a") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        with self._lock:
+            segment["blocks"].append(entry)
+            segment["bytes"] += len(compressed)
+
+    def _new_segment(self) -> Dict[str, Any]:
+        number = 1
+        if self._segments:
+            number = int(os.path.basename(self._segments[-1]["path"])[8:14]) + 1
+        segment = {"path": os.path.join(self.directory, f"segment-{number:06d}.jsonl.gz"), "blocks": [], "bytes": 0}
+        with self._lock:
+            self._segments.append(segment)
+            expired = self._segments[:-self.max_segments]
+            del self._segments[:-self.max_segments]
+        for old in expired:
+            for path in (old["path"], old["path"][:-len(".jsonl.gz")] + ".idx"):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+        return segment
+
+class StoreHandler(logging.Handler):
+    """Logging handler that appends to a LogStore without touching the disk"""
+
+    def __init__(self, store: LogStore, **fields):
+        super().__init__()
+        self.store = store
+        self.fields = fields
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.store.append(to_record(record, **self.fields))
+        except Exception:
+            self.handleError(record)
+
+class ForwardingHandler(logging.Handler):
+    """Batches records from another process and hands them to send() off the logging thread"""
+
+    def __init__(self, send: Callable[[List[Dict[str, Any]]], None],
+                 turn: Optional[Callable[[], int]] = None, interval_s: float = 0.5, **fields):
+        super().__init__()
+        self.send = send
+        self.turn = turn
+        self.interval_s = interval_s
+        self.fields = fields
+        self._records: "queue.Queue" = queue.Queue(maxsize=5000)
+        threading.Thread(target=self._forward_loop, name="log-forwarder", daemon=True).start()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            fields = dict(self.fields)
+            if self.turn is not None:
+                fields["turn"] = self.turn()
+            self._records.put_nowait(to_record(record, **fields))
+        except queue.Full:
+            pass
+        except Exception:
+            self.handleError(record)
+
+    def _forward_loop(self):
+        while True:
+            batch = [self._records.get()]
+            time.sleep(self.interval_s)
+            while not self._records.empty() and len(batch) < 500:
+                batch.append(self._records.get_nowait())
+            try:
+                self.send(batch)
+            except Exception:
+                pass
+
+# Global log store instance
+log_store = LogStore(
+    os.getenv("LOG_DIR", os.path.expanduser("~/.cache/scripture_palpi/logs")),
+    ring_size=int(os.getenv("LOG_RING_SIZE", "2000")),
+    segment_bytes=int(os.getenv("LOG_SEGMENT_KB", "1024")) * 1024,
+    max_segments=int(os.getenv("LOG_MAX_SEGMENTS", "20")),
+)
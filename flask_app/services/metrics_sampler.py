@@ -0,0 +1,170 @@
+"""
+Metrics Sampler
+Samples system load in the background into a fixed-size time series with rolling summaries
+"""
+
+import os
+import threading
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import psutil
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("cpu_percent", "memory_percent", "memory_used_mb", "disk_percent", "temperature_c", "load_1m")
+WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+THERMAL_ZONE = "/sys/class/thermal/thermal_zone0/temp"
+
+class MetricsSampler:
+    """Keeps the latest system metrics and their history so requests never measure anything"""
+
+    def __init__(self, interval_s: float = 5.0, history_s: float = 3600.0, disk_path: str = "/"):
+        self.interval_s = interval_s
+        self.disk_path = disk_path
+        self.capacity = max(2, int(history_s / interval_s) + 1)
+
+        # Preallocated ring: one row per sample, NaN where a metric is unavailable
+        self._times = np.zeros(self.capacity)
+        self._values = np.full((self.capacity, len(FIELDS)), np.nan)
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self._snapshot: Dict[str, Any] = {"sampling": False}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.boot_time = psutil.boot_time()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        # cpu_percent(None) reports usage since the previous call; this primes it
+        psutil.cpu_percent(interval=None)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest sample and rollups, as computed by the sampler thread"""
+        return self._snapshot
+
+    def history(self, window: str = "1h", max_points: int = 360) -> Dict[str, Any]:
+        """Samples within a window, averaged down to at most max_points for charting"""
+        seconds = WINDOWS.get(window)
+        if seconds is None:
+            raise ValueError(f"Unknown window '{window}' (use {', '.join(WINDOWS)})")
+        with self._lock:
+            times, values = self._ordered()
+        keep = times >= time.time() - seconds
+        times, values = times[keep], values[keep]
+
+        if max_points > 0 and len(times) > max_points:
+            # Equal-sized buckets averaged together
+            edges = np.linspace(0, len(times), max_points + 1).astype(int)
+            times = np.array([times[a:b].mean() for a, b in zip(edges[:-1], edges[1:])])
+            values = np.array([self._column_means(values[a:b]) for a, b in zip(edges[:-1], edges[1:])])
+
+        return {
+            "window": window,
+            "interval_s": self.interval_s,
+            "timestamps": [round(float(t), 1) for t in times],
+            "series": {field: [_number(v) for v in values[:, i]] for i, field in enumerate(FIELDS)},
+        }
+
+    def _sample_loop(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self._record(time.time(), self._measure())
+            except Exception as e:
+                logger.error(f"System metrics sample failed: {e}")
+            self._stop.wait(max(0.0, self.interval_s - (time.monotonic() - started)))
+
+    def _measure(self) -> List[float]:
+        memory = psutil.virtual_memory()
+        try:
+            disk_percent = psutil.disk_usage(self.disk_path).percent
+        except OSError:
+            disk_percent = np.nan
+        try:
+            load_1m = os.getloadavg()[0]
+        except (AttributeError, OSError):
+            load_1m = np.nan
+        return [
+            psutil.cpu_percent(interval=None),
+            memory.percent,
+            memory.used / (1024 * 1024),
+            disk_percent,
+            self._temperature(),
+            load_1m,
+        ]
+
+    def _temperature(self) -> float:
+        """SoC temperature on a Raspberry Pi, NaN elsewhere"""
+        try:
+            with open(THERMAL_ZONE) as f:
+                return int(f.read().strip()) / 1000
+        except (OSError, ValueError):
+            return np.nan
+
+    def _record(self, now: float, sample: List[float]):
+        with self._lock:
+            self._times[self._next] = now
+            self._values[self._next] = sample
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            times, values = self._ordered()
+
+        rollups = {}
+        for name, seconds in WINDOWS.items():
+            window = values[times >= now - seconds]
+            rollups[name] = {field: self._summary(window[:, i]) for i, field in enumerate(FIELDS)}
+
+        latest = {field: _number(value) for field, value in zip(FIELDS, sample)}
+        # Swapped in whole, so readers never see a half-built snapshot
+        self._snapshot = {
+            "sampling": True,
+            "timestamp": round(now, 1),
+            "uptime_s": round(now - self.boot_time),
+            "interval_s": self.interval_s,
+            "samples": self._count,
+            **latest,
+            "rollups": rollups,
+        }
+
+    def _ordered(self):
+        """Samples oldest first; called with the lock held"""
+        if self._count < self.capacity:
+            return self._times[:self._count].copy(), self._values[:self._count].copy()
+        order = np.roll(np.arange(self.capacity), -self._next)
+        return self._times[order], self._values[order]
+
+    @staticmethod
+    def _summary(column: np.ndarray) -> Optional[Dict[str, float]]:
+        column = column[~np.isnan(column)]
+        if not len(column):
+            return None
+        return {"min": _number(column.min()), "avg": _number(column.mean()), "max": _number(column.max())}
+
+    @staticmethod
+    def _column_means(rows: np.ndarray) -> np.ndarray:
+        present = ~np.isnan(rows)
+        counts = present.sum(axis=0)
+        sums = np.where(present, rows, 0.0).sum(axis=0)
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+def _number(value) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else round(value, 2)
+
+# Global metrics sampler instance
+metrics_sampler = MetricsSampler(
+    interval_s=float(os.getenv("METRICS_INTERVAL_S", "5")),
+    history_s=float(os.getenv("METRICS_HISTORY_S", "3600")),
+)
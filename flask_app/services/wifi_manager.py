@@ -0,0 +1,299 @@
+"""
+WiFi Manager Service
+Background WiFi scans and connects with cached results and tracked jobs
+"""
+
+import os
+import re
+import subprocess
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_CELL = re.compile(r"^\s*Cell \d+ - Address: (?P<address>[0-9A-Fa-f:]{17})", re.MULTILINE)
+_ESSID = re.compile(r'ESSID:"(?P<ssid>.*)"')
+_CHANNEL = re.compile(r"Channel:(?P<channel>\d+)")
+_FREQUENCY = re.compile(r"Frequency:(?P<ghz>[\d.]+) GHz")
+_QUALITY = re.compile(r"Quality=(?P<value>\d+)/(?P<max>\d+)")
+_SIGNAL = re.compile(r"Signal level=(?P<dbm>-?\d+) dBm")
+_HEX_ESCAPE = re.compile(r"\\x([0-9A-Fa-f]{2})")
+_HEX_KEY = re.compile(r"[0-9A-Fa-f]+")
+
+def _decode_ssid(raw: str) -> str:
+    """iwlist prints non-printable SSID bytes as \\xNN"""
+    raw_bytes = _HEX_ESCAPE.sub(lambda m: chr(int(m.group(1), 16)), raw).encode("latin-1", "replace")
+    return raw_bytes.decode("utf-8", "replace")
+
+def _security(cell: str) -> str:
+    if "Encryption key:on" not in cell:
+        return "open"
+    if "WPA2" in cell:
+        return "WPA2"
+    if "WPA Version" in cell:
+        return "WPA"
+    return "WEP"
+
+def parse_iwlist(output: str) -> List[Dict[str, Any]]:
+    """Networks from `iwlist <iface> scan`, one per SSID (strongest access point), strongest first"""
+    starts = [m.start() for m in _CELL.finditer(output)] + [len(output)]
+    networks: Dict[str, Dict[str, Any]] = {}
+    for start, end in zip(starts, starts[1:]):
+        cell = output[start:end]
+        essid = _ESSID.search(cell)
+        ssid = _decode_ssid(essid.group("ssid")) if essid else ""
+        if not ssid:
+            continue  # hidden network
+
+        quality = _QUALITY.search(cell)
+        signal = _SIGNAL.search(cell)
+        channel = _CHANNEL.search(cell)
+        frequency = _FREQUENCY.search(cell)
+        network = {
+            "ssid": ssid,
+            "address": _CELL.search(cell).group("address").upper(),
+            "channel": int(channel.group("channel")) if channel else None,
+            "frequency_ghz": float(frequency.group("ghz")) if frequency else None,
+            "quality": round(100 * int(quality.group("value")) / int(quality.group("max"))) if quality else None,
+            "signal_dbm": int(signal.group("dbm")) if signal else None,
+            "security": _security(cell),
+        }
+        network["encrypted"] = network["security"] != "open"
+
+        known = networks.get(ssid)
+        if known is None or (network["quality"] or 0) > (known["quality"] or 0):
+            networks[ssid] = network
+    return sorted(networks.values(), key=lambda n: n["quality"] or 0, reverse=True)
+
+def parse_iwconfig(output: str) -> Dict[str, Any]:
+    """Connection details from `iwconfig <iface>`"""
+    essid = _ESSID.search(output)
+    access_point = re.search(r"Access Point: (?P<address>[0-9A-Fa-f:]{17})", output)
+    bit_rate = re.search(r"Bit Rate[=:](?P<rate>[\d.]+) Mb/s", output)
+    quality = _QUALITY.search(output)
+    signal = _SIGNAL.search(output)
+    frequency = _FREQUENCY.search(output)
+    connected = bool(essid and access_point)
+    return {
+        "connected": connected,
+        "ssid": _decode_ssid(essid.group("ssid")) if connected else None,
+        "access_point": access_point.group("address").upper() if access_point else None,
+        "frequency_ghz": float(frequency.group("ghz")) if frequency else None,
+        "bit_rate_mbps": float(bit_rate.group("rate")) if bit_rate else None,
+        "quality": round(100 * int(quality.group("value")) / int(quality.group("max"))) if quality else None,
+        "signal_dbm": int(signal.group("dbm")) if signal else None,
+    }
+
+def network_settings(ssid: str, password: Optional[str], security: Optional[str] = None) -> List[Tuple[str, str]]:
+    """wpa_cli set_network (name, value) pairs for joining a network"""
+    # wpa_supplicant reads a quoted value as-is up to the last quote, with no escapes: the SSID goes
+    # in hex, which covers any bytes, and the password quoted but otherwise untouched
+    settings = [("ssid", ssid.encode("utf-8").hex())]
+    if not password:
+        if security not in (None, "open"):
+            raise ValueError(f"'{ssid}' uses {security} and needs a password")
+        return settings + [("key_mgmt", "NONE")]
+
+    if security == "WEP":
+        # 5 or 13 characters, or 10 or 26 hex digits
+        if len(password) in (10, 26) and _HEX_KEY.fullmatch(password):
+            key = password
+        elif len(password) in (5, 13):
+            key = f'"{password}"'
+        else:
+            raise ValueError("A WEP key is 5 or 13 characters, or 10 or 26 hex digits")
+        return settings + [("key_mgmt", "NONE"), ("wep_key0", key), ("wep_tx_keyidx", "0")]
+
+    # 8-63 character passphrase, or the 64 hex digit key itself
+    if len(password) == 64 and _HEX_KEY.fullmatch(password):
+        return settings + [("psk", password)]
+    if not 8 <= len(password) <= 63:
+        raise ValueError("A WPA password is 8 to 63 characters")
+    return settings + [("psk", f'"{password}"')]
+
+class WiFiJob:
+    """A scan or connect running in the background"""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.state = "queued"
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("done", "failed")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "error": self.error,
+            "result": self.result,
+            "created_at": round(self.created_at, 1),
+            "finished_at": round(self.finished_at, 1) if self.finished_at else None,
+        }
+
+class WiFiManager:
+    """Runs iwlist/wpa_cli one job at a time off the request threads"""
+
+    command_timeout_s = 20
+    connect_timeout_s = 30
+    max_jobs = 20
+
+    def __init__(self, interface: str = "wlan0", cache_ttl_s: float = 30.0, status_ttl_s: float = 5.0):
+        self.interface = interface
+        self.cache_ttl_s = cache_ttl_s
+        self.status_ttl_s = status_ttl_s
+
+        # The radio can only do one thing at a time
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wifi")
+        self._jobs: "OrderedDict[str, WiFiJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._scan_job: Optional[WiFiJob] = None
+        self._networks: List[Dict[str, Any]] = []
+        self._scanned_at: Optional[float] = None
+        self._status: Dict[str, Any] = {}
+        self._status_at = 0.0
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    def add_listener(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """Call back on every job state change"""
+        self._listeners.append(callback)
+
+    def scan(self, refresh: bool = False) -> Dict[str, Any]:
+        """Cached networks right away, with a background rescan when stale or asked for"""
+        with self._lock:
+            age = time.time() - self._scanned_at if self._scanned_at else None
+            fresh = age is not None and age < self.cache_ttl_s
+            job = self._scan_job if self._scan_job and not self._scan_job.done else None
+            if job is None and (refresh or not fresh):
+                job = self._submit("scan", self._run_scan)
+                self._scan_job = job
+            return {
+                "networks": list(self._networks),
+                "scanned_at": self._scanned_at,
+                "age_s": round(age, 1) if age is not None else None,
+                "fresh": fresh,
+                "job_id": job.id if job else None,
+            }
+
+    def connect(self, ssid: str, password: Optional[str] = None) -> WiFiJob:
+        """Start joining a network; follow progress with job()"""
+        with self._lock:
+            return self._submit("connect", lambda job: self._run_connect(job, ssid, password))
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.as_dict() if job else None
+
+    def status(self) -> Dict[str, Any]:
+        """Current connection, re-read at most every status_ttl_s"""
+        if time.time() - self._status_at >= self.status_ttl_s:
+            try:
+                self._status = {"interface": self.interface, **parse_iwconfig(self._run("iwconfig", self.interface))}
+            except (OSError, subprocess.SubprocessError, RuntimeError) as e:
+                self._status = {"interface": self.interface, "connected": False, "error": str(e)}
+            self._status_at = time.time()
+        return dict(self._status, checked_at=round(self._status_at, 1))
+
+    def _submit(self, kind: str, work: Callable[[WiFiJob], Any]) -> WiFiJob:
+        """Queue a job; called with the lock held"""
+        job = WiFiJob(kind)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        self._executor.submit(self._execute, job, work)
+        return job
+
+    def _execute(self, job: WiFiJob, work: Callable[[WiFiJob], Any]):
+        self._set_state(job, "running")
+        try:
+            job.result = work(job)
+            job.finished_at = time.time()
+            self._set_state(job, "done")
+        except Exception as e:
+            logger.warning(f"WiFi {job.kind} failed: {e}")
+            job.error = str(e)
+            job.finished_at = time.time()
+            self._set_state(job, "failed")
+
+    def _set_state(self, job: WiFiJob, state: str):
+        job.state = state
+        for listener in self._listeners:
+            try:
+                listener("wifi_job", job.as_dict())
+            except Exception as e:
+                logger.error(f"WiFi job listener failed: {e}")
+
+    def _run(self, *command: str) -> str:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=self.command_timeout_s)
+        if completed.returncode != 0:
+            raise RuntimeError(f"{command[0]} failed: {completed.stderr.strip() or completed.returncode}")
+        return completed.stdout
+
+    def _run_scan(self, job: WiFiJob) -> Dict[str, Any]:
+        networks = parse_iwlist(self._run("iwlist", self.interface, "scan"))
+        with self._lock:
+            self._networks = networks
+            self._scanned_at = time.time()
+        return {"count": len(networks)}
+
+    def _wpa(self, *args: str) -> str:
+        output = self._run("wpa_cli", "-i", self.interface, *args).strip()
+        if output.endswith("FAIL"):
+            raise RuntimeError(f"wpa_cli {args[0]} failed")
+        return output
+
+    def _run_connect(self, job: WiFiJob, ssid: str, password: Optional[str]) -> Dict[str, Any]:
+        """Add the network through wpa_supplicant, which reassociates without restarting networking"""
+        self._set_state(job, "configuring")
+        with self._lock:
+            security = next((n["security"] for n in self._networks if n["ssid"] == ssid), None)
+        settings = network_settings(ssid, password, security)
+        network_id = self._wpa("add_network").splitlines()[-1]
+        try:
+            for name, value in settings:
+                self._wpa("set_network", network_id, name, value)
+
+            self._set_state(job, "associating")
+            self._wpa("select_network", network_id)
+
+            deadline = time.monotonic() + self.connect_timeout_s
+            while time.monotonic() < deadline:
+                fields = dict(line.split("=", 1) for line in self._wpa("status").splitlines() if "=" in line)
+                if fields.get("wpa_state") == "COMPLETED":
+                    if job.state != "obtaining_ip":
+                        self._set_state(job, "obtaining_ip")
+                    if fields.get("ip_address"):
+                        # Keep it across reboots, alongside the networks already saved
+                        self._wpa("enable_network", "all")
+                        self._wpa("save_config")
+                        self._status_at = 0.0
+                        return {"ssid": ssid, "ip_address": fields["ip_address"]}
+                time.sleep(0.5)
+            raise TimeoutError(f"Could not join '{ssid}' within {self.connect_timeout_s}s")
+        except Exception:
+            # Don't leave a half-configured network selected, whatever went wrong
+            try:
+                self._wpa("remove_network", network_id)
+                self._wpa("reconfigure")
+            except (OSError, subprocess.SubprocessError, RuntimeError) as e:
+                logger.warning(f"Could not remove the unfinished network {network_id}: {e}")
+            raise
+
+# Global WiFi manager instance
+wifi_manager = WiFiManager(
+    interface=os.getenv("WIFI_INTERFACE", "wlan0"),
+    cache_ttl_s=float(os.getenv("WIFI_SCAN_TTL_S", "30")),
+)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+WiFi parse check
+Runs the iwlist/iwconfig parsers over captured output and builds wpa_cli settings, so both can be checked without a radio
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from flask_app.services.wifi_manager import network_settings, parse_iwlist, parse_iwconfig
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# What the bundled captures must parse to
+EXPECTED_SCAN = [
+    ("Grace Fellowship", "A4:2B:B0:8F:11:3C", 83, -52, "WPA2"),
+    ("Smith Family", "3C:84:6A:10:22:F7", 67, -63, "WPA"),
+    ('Old Router "Basement"', "F0:9F:C2:71:AA:05", 50, -75, "WEP"),
+    ("Parish Guest", "00:1D:7E:42:9A:01", 43, -80, "open"),
+]
+EXPECTED_STATUS = {
+    "iwconfig_connected.txt": {"connected": True, "ssid": "Grace Fellowship", "signal_dbm": -52, "bit_rate_mbps": 65.0},
+    "iwconfig_disconnected.txt": {"connected": False, "ssid": None, "access_point": None},
+}
+
+# (ssid, password, security) and the wpa_cli settings they must produce, or None where they must be refused
+EXPECTED_SETTINGS = [
+    ('Old Router "Basement"', 'back\\slash"quote', "WPA2",
+     [("ssid", "4f6c6420526f757465722022426173656d656e7422"), ("psk", '"back\\slash"quote"')]),
+    ("Café", None, "open", [("ssid", "436166c3a9"), ("key_mgmt", "NONE")]),
+    ("Old Router", "abcde", "WEP", [("ssid", "4f6c6420526f75746572"), ("key_mgmt", "NONE"),
+                                     ("wep_key0", '"abcde"'), ("wep_tx_keyidx", "0")]),
+    ("Old Router", "0123456789", "WEP", [("ssid", "4f6c6420526f75746572"), ("key_mgmt", "NONE"),
+                                          ("wep_key0", "0123456789"), ("wep_tx_keyidx", "0")]),
+    ("Old Router", "too long for WEP", "WEP", None),
+    ("Grace Fellowship", "short", "WPA2", None),
+    ("Grace Fellowship", None, "WPA2", None),
+]
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+def check_fixtures():
+    failures = []
+    networks = parse_iwlist(read(os.path.join(FIXTURES, "iwlist_scan.txt")))
+    parsed = [(n["ssid"], n["address"], n["quality"], n["signal_dbm"], n["security"]) for n in networks]
+    if parsed != EXPECTED_SCAN:
+        failures.append(f"iwlist_scan.txt: got {parsed}")
+
+    for name, expected in EXPECTED_STATUS.items():
+        status = parse_iwconfig(read(os.path.join(FIXTURES, name)))
+        wrong = {k: status.get(k) for k, v in expected.items() if status.get(k) != v}
+        if wrong:
+            failures.append(f"{name}: got {wrong}")
+
+    for *network, expected in EXPECTED_SETTINGS:
+        try:
+            settings = network_settings(*network)
+        except ValueError:
+            settings = None
+        if settings != expected:
+            failures.append(f"settings for {network}: got {settings}")
+    return networks, failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("file", nargs="?", help="captured `iwlist <iface> scan` or `iwconfig` output to parse")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    if args.file:
+        text = read(args.file)
+        result = parse_iwlist(text) if "Scan completed" in text else parse_iwconfig(text)
+        print(json.dumps(result, indent=2))
+        return
+
+    networks, failures = check_fixtures()
+    if args.json:
+        print(json.dumps({"networks": networks, "failures": failures}, indent=2))
+    else:
+        print("📡 WiFi parser check")
+        print("=" * 40)
+        for n in networks:
+            print(f"{n['ssid']:<24} {n['quality']:>3}%  {n['signal_dbm']} dBm  {n['security']}")
+        print("✅ All fixtures parsed as expected" if not failures else "\n".join(f"❌ {f}" for f in failures))
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
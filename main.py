@@ -3,71 +3,484 @@ Main Entry Point - Flask Server + AI Service
 Scripture Palpi - Christian AI Assistant
 """
 
-from flask_app import create_app
-from ai_service.voice_recognition import VoiceRecognition
-from ai_service.ai_integration import AIIntegration
-from ai_service.audio_output import AudioOutput
+from ai_service.startup_profile import timeline
+from ai_service.streaming import SentenceSplitter, LatencyTrace
+from ai_service import instrumentation
+import os
+import argparse
+import json
+import queue
+import logging
 import threading
 import signal
 import sys
-import time
+from typing import Any, Callable, Dict
+
+# The voice pipeline, LLM SDKs, TTS and Flask are imported where they are first
+# needed, so the microphone and wake word can come up before the slow parts load
+
+logger = logging.getLogger("scripture_palpi")
 
 class ScripturePalpi:
-    """Main application class - combines Flask and AI service"""
-    
+    """The voice assistant pipeline, run inside the AI worker process"""
+
     def __init__(self):
-        # TODO: Initialize Flask app
-        # TODO: Initialize AI components
-        # TODO: Set up global state
-        # TODO: Set up signal handlers
-        pass
-    
+        self.voice_recognition = None
+        self.ai_integration = None
+        self.audio_output = None
+
+        self.is_running = False
+        self.ai_thread = None
+        self.turn_count = 0
+        self.last_trace = None
+        self._current_trace = None
+        # Set by the wake word: the next recording is a question worth speculating on
+        self._question_pending = False
+
+        # Turns run on their own thread so the microphone stays live while we talk
+        self._turns: "queue.Queue" = queue.Queue()
+        self._turn_thread = None
+        self._turn_cancel = threading.Event()
+        self._turn_lock = threading.Lock()
+
+        # Set once STT, speakers and the AI clients have finished loading
+        self._ready = threading.Event()
+        self._warm_up_thread = None
+
+        # Pushes live events to the supervisor (and on to the app); a no-op until connected
+        self.publish: Callable[[str, Dict[str, Any]], None] = lambda event, data: None
+
     def initialize_ai_service(self):
-        """Initialize AI service components"""
-        # TODO: Create voice recognition instance
-        # TODO: Create AI integration instance
-        # TODO: Create audio output instance
-        # TODO: Set up wake word detection
-        pass
-    
+        """Bring up the microphone and wake word; everything else loads in the background"""
+        with timeline.stage("import voice_recognition"):
+            from ai_service.voice_recognition import VoiceRecognition
+        with timeline.stage("voice_recognition init"):
+            self.voice_recognition = VoiceRecognition()
+
+        if self._warm_up_thread is None:
+            self._warm_up_thread = threading.Thread(target=self._warm_up, name="warm-up", daemon=True)
+            self._warm_up_thread.start()
+
+        with timeline.stage("microphone"):
+            return self.voice_recognition.initialize_microphone(load_stt=False)
+
+    def _warm_up(self):
+        """Load the STT model, speakers and AI clients in parallel while the wake word is already live"""
+        loaders = [
+            threading.Thread(target=self._load, args=(name, target), name=name, daemon=True)
+            for name, target in (("stt", self._load_stt), ("speakers", self._load_speakers), ("ai", self._load_ai))
+        ]
+        for thread in loaders:
+            thread.start()
+        for thread in loaders:
+            thread.join()
+        sessions = self.ai_integration.sessions if self.ai_integration is not None else None
+        if sessions is not None:
+            sessions.add_listener(self._apply_session)
+            self._apply_session(sessions.active)
+        self._ready.set()
+        timeline.mark("ready")
+        logger.info("AI service fully loaded")
+
+    def _load(self, name: str, target: Callable[[], None]):
+        try:
+            target()
+        except Exception as e:
+            # Turns report the missing part instead of failing one by one
+            logger.error(f"Failed to load {name}: {e}")
+
+    def _load_stt(self):
+        with timeline.stage("stt model"):
+            self.voice_recognition.load_stt()
+
+    def _load_speakers(self):
+        with timeline.stage("import audio_output"):
+            from ai_service.audio_output import AudioOutput
+        with timeline.stage("speakers"):
+            audio_output = AudioOutput()
+            speakers = audio_output.initialize_speakers()
+        self.audio_output = audio_output
+
+        if audio_output.fast_tts is not None:
+            # The voice selector backs off to the fast voice when the CPU is busy
+            from flask_app.services.metrics_sampler import metrics_sampler
+            metrics_sampler.start()
+            audio_output.cpu_load = lambda: metrics_sampler.snapshot().get("cpu_percent")
+
+        if speakers:
+            reference = audio_output.playback_reference if audio_output.sink is not None else None
+            self.voice_recognition.attach_playback(reference, lambda: audio_output.is_speaking)
+            # Phrases every conversation ends up using, rendered in the background
+            threading.Thread(
+                target=audio_output.warm_up_cache,
+                args=(self._warmup_phrases(),),
+                daemon=True,
+            ).start()
+        else:
+            logger.warning("Speakers unavailable - responses will not be spoken")
+
+    def _load_ai(self):
+        with timeline.stage("import ai_integration"):
+            from ai_service.ai_integration import AIIntegration
+        with timeline.stage("ai_integration init"):
+            self.ai_integration = AIIntegration()
+
+    def _apply_session(self, session):
+        """Speak in the active user's voice; the rest of their preferences are read per turn"""
+        if self.audio_output is None:
+            return
+        # Loading a voice the first time takes a moment - the current one keeps talking meanwhile
+        threading.Thread(
+            target=self.audio_output.use_voice, args=(session.preferences.voice,), name="voice-switch", daemon=True,
+        ).start()
+
+    def wait_until_ready(self, timeout: float = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def _warmup_phrases(self):
+        """Phrases to pre-render into the TTS cache at startup"""
+        from ai_service.ai_integration import CHRISTIAN_CLOSING, ERROR_RESPONSE
+        from ai_service.audio_output import DEFAULT_WARMUP_PHRASES
+        configured = os.getenv("TTS_WARMUP_PHRASES")
+        if configured:
+            return configured.split("|")
+        return [*DEFAULT_WARMUP_PHRASES, CHRISTIAN_CLOSING, ERROR_RESPONSE]
+
     def start_ai_service(self):
         """Start AI service in background thread"""
-        # TODO: Start wake word detection loop
-        # TODO: Handle voice input
-        # TODO: Process with AI
-        # TODO: Output speech
-        pass
-    
+        if self.is_running:
+            return True
+        if self.voice_recognition is None and not self.initialize_ai_service():
+            logger.error("AI service not started: no microphone")
+            return False
+
+        if self._turn_thread is None:
+            self._turn_thread = threading.Thread(target=self._turn_loop, daemon=True)
+            self._turn_thread.start()
+
+        self.voice_recognition.on_recording = self._recording_started
+        self.voice_recognition.on_partial = self._handle_partial
+        self.voice_recognition.start_listening(
+            self._handle_command, on_wake=self._handle_wake, on_barge_in=self._handle_barge_in,
+        )
+        self.is_running = True
+        timeline.mark("listening")
+        self._set_state("listening")
+        logger.info("AI service listening for wake word")
+        return True
+
     def stop_ai_service(self):
         """Stop AI service"""
-        # TODO: Stop voice recognition
-        # TODO: Stop audio output
-        # TODO: Clean up resources
-        pass
-    
-    def run(self):
-        """Main application run method"""
-        # TODO: Initialize Flask app
-        # TODO: Initialize AI service
-        # TODO: Start AI service in background thread
-        # TODO: Start Flask server
-        # TODO: Handle graceful shutdown
-        pass
+        if self.voice_recognition is not None:
+            self.voice_recognition.stop_listening()
+        self._turn_cancel.set()
+        if self.audio_output is not None:
+            self.audio_output.stop_speaking()
+            if self.is_running and self.audio_output.play_earcon("goodbye"):
+                self.audio_output.wait_until_done(timeout=1.0)
+        if self.is_running:
+            self._set_state("stopped")
+        self.is_running = False
+        if self.ai_integration is not None and self.ai_integration.sessions is not None:
+            self.ai_integration.sessions.flush()
+
+    def get_status(self):
+        """Current AI service state and performance counters"""
+        status = {
+            "running": self.is_running,
+            "turns": self.turn_count,
+            "last_turn_latency_ms": self.last_trace.as_dict() if self.last_trace else None,
+        }
+        if self.ai_integration is not None:
+            status["provider"] = self.ai_integration.current_provider
+            status["response_cache"] = self.ai_integration.get_cache_stats()
+            status["context"] = self.ai_integration.get_context_stats()
+        if self.audio_output is not None:
+            status["tts_cache"] = self.audio_output.get_cache_stats()
+            status["tts"] = self.audio_output.get_voice_stats()
+            status["barge_in"] = self.audio_output.get_interrupt_stats()
+        if self.voice_recognition is not None:
+            status["voice"] = self.voice_recognition.get_stats()
+        if self.ai_integration is not None:
+            status["speculation"] = self.ai_integration.get_speculation_stats()
+            status["session"] = self.ai_integration.get_session_stats()
+        if self._ready.is_set():
+            status["unavailable"] = self._unavailable()
+        status["latency"] = instrumentation.snapshot()
+        status["startup"] = timeline.marks
+        return status
+
+    def handle_request(self, command: str, data: dict):
+        """Answer a control command from the Flask supervisor"""
+        if command == "ping":
+            return {}
+        if command == "status":
+            return self.get_status()
+        if command == "start":
+            return {"running": self.start_ai_service()}
+        if command in ("stop", "shutdown"):
+            self.stop_ai_service()
+            return {"running": False}
+        if command in ("set_provider", "new_conversation", "test_connection") and self.ai_integration is None:
+            raise RuntimeError("AI service is still starting")
+        if command in ("list_users", "switch_user", "identify_speaker", "update_user"):
+            return self._handle_session_request(command, data or {})
+        if command == "set_provider":
+            self.ai_integration.set_provider(data["provider"])
+            return {"provider": self.ai_integration.current_provider}
+        if command == "new_conversation":
+            self.ai_integration.new_conversation()
+            return {}
+        if command == "test_connection":
+            return self.ai_integration.test_connection()
+        raise ValueError(f"Unknown command: {command}")
+
+    def _handle_session_request(self, command: str, data: dict):
+        """Choose who is being answered and edit their profile"""
+        sessions = self.ai_integration.sessions if self.ai_integration is not None else None
+        if sessions is None:
+            raise RuntimeError("AI service is still starting" if self.ai_integration is None
+                               else "User sessions are disabled")
+        if command == "list_users":
+            return {"active": sessions.active.user_id, "users": sessions.users()}
+        if command == "switch_user":
+            session = sessions.switch(data["user_id"])
+        elif command == "identify_speaker":
+            session = sessions.identify_speaker(data["speaker_id"])
+            if session is None:
+                return {"identified": False, "active": sessions.active.user_id}
+        else:
+            session = sessions.update(data["user_id"], name=data.get("name"), speaker_id=data.get("speaker_id"),
+                                      preferences=data.get("preferences"))
+        self.publish("session", {"active": sessions.active.user_id, "user": session.as_dict()})
+        return session.as_dict()
+
+    def _set_state(self, state: str, **details):
+        """Announce a pipeline state change (listening, wake, transcribing, thinking, speaking)"""
+        self.publish("state", {"state": state, "turn": self.turn_count, **details})
+
+    def _handle_wake(self):
+        """Start the latency trace for a new turn and acknowledge the wake word"""
+        self.turn_count += 1
+        self._current_trace = LatencyTrace(self.turn_count)
+        self._question_pending = True
+        self._set_state("wake")
+        return self.audio_output.play_earcon("wake") if self.audio_output is not None else None
+
+    def _handle_barge_in(self, detected_at: float):
+        """The user spoke over us - drop the rest of the answer"""
+        with self._turn_lock:
+            self._turn_cancel.set()
+            if self.audio_output is not None:
+                self.audio_output.stop_speaking(requested_at=detected_at)
+        logger.info("Barge-in: stopped speaking")
+
+    def _prefetch(self):
+        return self.ai_integration.prefetch if self.ai_integration is not None else None
+
+    def _recording_started(self):
+        self._set_state("transcribing")
+        prefetch = self._prefetch()
+        if prefetch is not None:
+            # Barge-ins and wake phrase spotting record too, but only a question gets speculated on
+            if self._question_pending:
+                prefetch.begin()
+            else:
+                prefetch.cancel()
+        self._question_pending = False
+
+    def _handle_partial(self, text: str):
+        self.publish("partial", {"turn": self.turn_count, "text": text})
+        prefetch = self._prefetch()
+        if prefetch is not None:
+            prefetch.observe_partial(text)
+
+    def _handle_command(self, text: str):
+        """Queue a transcribed command for the turn thread"""
+        trace = self._current_trace or LatencyTrace(self.turn_count)
+        self._current_trace = None
+        self._question_pending = False
+        trace.mark("transcribed")
+
+        # Endpointing just fired: keep the speculative request if it asked the same thing
+        speculation = None
+        event = {"turn": trace.turn_id, "text": text}
+        prefetch = self._prefetch()
+        if prefetch is not None:
+            speculation = prefetch.resolve(text)
+            if prefetch.last is not None:
+                event["speculation"] = prefetch.last
+        self.publish("transcript", event)
+        self._turns.put((text, trace, speculation))
+
+    def _turn_loop(self):
+        """Answer queued commands one at a time"""
+        while True:
+            text, trace, speculation = self._turns.get()
+            # A command heard while still loading waits here rather than being lost
+            self._ready.wait()
+            try:
+                self._run_turn(text, trace, speculation)
+            except Exception as e:
+                logger.error(f"Turn {trace.turn_id} failed: {e}")
+
+    def _speak(self, sentence: str, cancel: threading.Event) -> bool:
+        """Queue a sentence unless the turn was interrupted"""
+        with self._turn_lock:
+            if cancel.is_set():
+                return False
+            self.audio_output.speak_async(sentence)
+            return True
+
+    def _unavailable(self):
+        """Parts that failed to load, without which no turn can run"""
+        parts = (("ai", self.ai_integration), ("speakers", self.audio_output))
+        return [name for name, part in parts if part is None]
+
+    def _run_turn(self, text: str, trace: LatencyTrace, speculation=None):
+        """Stream the AI response into speech one sentence at a time"""
+        missing = self._unavailable()
+        if missing:
+            if speculation is not None:
+                speculation.cancel()
+            logger.error(f"Turn {trace.turn_id} skipped: {', '.join(missing)} failed to load")
+            self._set_state("unavailable", missing=missing)
+            return
+
+        from ai_service.ai_integration import ERROR_RESPONSE
+        cancel = threading.Event()
+        with self._turn_lock:
+            self._turn_cancel = cancel
+
+        splitter = SentenceSplitter()
+        self.audio_output.on_audio_start = lambda: self._audio_started(trace)
+        self._set_state("thinking")
+        self.audio_output.start_thinking()
+        try:
+            for chunk in self.ai_integration.stream_message_to_ai(text, cancel=cancel, speculation=speculation):
+                trace.mark("first_token")
+                self.publish("response", {"turn": trace.turn_id, "text": chunk})
+                if chunk == ERROR_RESPONSE:
+                    self.audio_output.play_earcon("error")
+                for sentence in splitter.feed(chunk):
+                    trace.mark("first_sentence")
+                    self._speak(sentence, cancel)
+            for sentence in splitter.flush():
+                trace.mark("first_sentence")
+                self._speak(sentence, cancel)
+            self.audio_output.wait_until_done()
+        finally:
+            self.audio_output.stop_thinking()
+            self.audio_output.on_audio_start = None
+
+        trace.mark("done")
+        self.last_trace = trace
+        if not cancel.is_set():
+            # Offsets from the wake word, e.g. turn_first_audio is wake-to-first-audio
+            for stage, elapsed in trace.as_dict().items():
+                if stage != "wake":
+                    instrumentation.observe(f"turn_{stage}", elapsed)
+        self.publish("turn", {"turn": trace.turn_id, "interrupted": cancel.is_set(), "latency_ms": trace.as_dict()})
+        self._set_state("listening")
+        logger.info(trace.format() + (" (interrupted)" if cancel.is_set() else ""))
+
+    def _audio_started(self, trace: LatencyTrace):
+        if "first_audio" not in trace.marks:
+            trace.mark("first_audio")
+            self._set_state("speaking")
+
+_palpi = None
 
 def signal_handler(signum, frame):
     """Handle shutdown signals"""
-    # TODO: Stop AI service
-    # TODO: Stop Flask server
-    # TODO: Clean up resources
-    # TODO: Exit gracefully
-    pass
+    if _palpi is not None:
+        _palpi.stop_ai_service()
+    # Raising SystemExit in the main thread also stops the Flask server
+    sys.exit(0)
+
+def run_worker(socket_path: str):
+    """AI worker: run the voice pipeline and report to the supervisor until it hangs up"""
+    from flask_app.services.ipc import IPCPeer
+    from flask_app.services.log_store import ForwardingHandler
+
+    global _palpi
+    _palpi = ScripturePalpi()
+    disconnected = threading.Event()
+    peer = IPCPeer.connect(socket_path, on_request=_palpi.handle_request, on_close=disconnected.set)
+    _palpi.publish = peer.notify
+    # Log records travel to the server's log store in batches, never written from here
+    logging.getLogger().addHandler(ForwardingHandler(
+        lambda records: peer.notify("logs", {"records": records}),
+        turn=lambda: _palpi.turn_count, process="worker",
+    ))
+
+    # Microphone calibration and model setup take a while - keep answering commands meanwhile
+    threading.Thread(target=_palpi.start_ai_service, daemon=True).start()
+
+    interval = float(os.getenv("WORKER_STATUS_INTERVAL_S", "2"))
+    while not disconnected.wait(interval):
+        peer.notify("status", _palpi.get_status())
+    _palpi.stop_ai_service()
+
+def profile_startup(as_json: bool = False):
+    """Start the pipeline without Flask and print where the startup time went"""
+    global _palpi
+    timeline.profile_imports()
+    _palpi = ScripturePalpi()
+    with timeline.stage("start_ai_service"):
+        started = _palpi.start_ai_service()
+    if started or _palpi._warm_up_thread is not None:
+        _palpi.wait_until_ready(timeout=120)
+    _palpi.stop_ai_service()
+
+    if as_json:
+        print(json.dumps(timeline.as_dict(), indent=2))
+    else:
+        print(timeline.format())
+
+def run_server():
+    """Flask control API, supervising the AI worker"""
+    from flask_app import create_app
+    from flask_app.services.ai_manager import ai_manager
+    from flask_app.services.log_store import log_store, StoreHandler
+
+    app = create_app()
+    logging.getLogger().addHandler(StoreHandler(log_store, process="server"))
+    threading.Thread(target=ai_manager.start_service, daemon=True).start()
+
+    port = int(os.getenv("FLASK_PORT", "5000"))
+    try:
+        app.run(host="0.0.0.0", port=port, threaded=True, use_reloader=False)
+    finally:
+        ai_manager.shutdown()
+        log_store.close()
 
 def main():
     """Main application function"""
-    # TODO: Set up signal handlers
-    # TODO: Create ScripturePalpi instance
-    # TODO: Run the application
-    pass
+    parser = argparse.ArgumentParser(description="Scripture Palpi")
+    parser.add_argument("--worker", action="store_true", help="run the AI worker (started by the server)")
+    parser.add_argument("--socket", help="supervisor IPC socket path (worker mode)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="start the voice pipeline, print an import and init timeline, and exit")
+    parser.add_argument("--json", action="store_true", help="machine-readable --profile-startup output")
+    args = parser.parse_args()
+
+    with timeline.stage("load .env"):
+        from dotenv import load_dotenv
+        load_dotenv()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    if args.profile_startup:
+        profile_startup(args.json)
+    elif args.worker:
+        if not args.socket:
+            parser.error("--worker needs --socket")
+        run_worker(args.socket)
+    else:
+        run_server()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()